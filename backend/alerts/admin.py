@@ -1,13 +1,110 @@
+from django.conf import settings
 from django.contrib import admin
-from .models import Employee, Alert
+from django.contrib.admin.views.main import PAGE_VAR
+from django.core.paginator import Paginator
+from django.db import DatabaseError
+from django.utils.functional import cached_property
+from .models import Employee, Alert, AlertCategory, ArchivedAlert, Task
+from .stats import estimated_row_count, timed_count
+from .tasks import enqueue
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Changelist paginator that never scans a large table just to count it.
+    Unfiltered lists use the planner estimate on PostgreSQL; filtered or
+    searched lists count exactly, but on PostgreSQL give up after
+    ADMIN_COUNT_TIMEOUT_MS. The count then only reaches one row past the
+    requested page, so paging stops at the last non-empty page instead of
+    offering pages that a whole-table estimate would invent.
+    """
+
+    def __init__(self, *args, page_number=1, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.page_number = page_number
+
+    @cached_property
+    def count(self):
+        model = self.object_list.model
+        if not self.object_list.query.where:
+            return estimated_row_count(model)[0]
+
+        try:
+            return timed_count(self.object_list, settings.ADMIN_COUNT_TIMEOUT_MS)
+        except DatabaseError:
+            return self._count_through_page()
+
+    def _count_through_page(self) -> int:
+        """Rows before the requested page plus those on it, and one more if any follow."""
+        offset = (max(self.page_number, 1) - 1) * self.per_page
+        page = self.object_list.values_list("pk", flat=True)[offset:offset + self.per_page + 1]
+        return offset + len(page)
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist defaults for tables with millions of rows."""
+
+    paginator = EstimatedCountPaginator
+    # No second, unfiltered COUNT(*) for the "N total" link when filtering
+    show_full_result_count = False
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        try:
+            page_number = int(request.GET.get(PAGE_VAR, 1))
+        except ValueError:
+            page_number = 1
+        return self.paginator(
+            queryset, per_page, orphans, allow_empty_first_page, page_number=page_number
+        )
+
 
 @admin.register(Employee)
-class EmployeeAdmin(admin.ModelAdmin):
+class EmployeeAdmin(LargeTableAdmin):
     list_display = ['id', 'name', 'reports_to']
-    search_fields = ['id', 'name']
+    list_select_related = ['reports_to']
+    # Exact id (primary key) or name prefix (employees_name_idx); also
+    # what the reports_to/employee autocomplete widgets search
+    search_fields = ['id__exact', 'name__startswith']
+    autocomplete_fields = ['reports_to']
+
 
 @admin.register(Alert)
-class AlertAdmin(admin.ModelAdmin):
+class AlertAdmin(LargeTableAdmin):
     list_display = ['id', 'employee', 'severity', 'category', 'status', 'created_at']
-    list_filter = ['severity', 'status', 'category']
-    search_fields = ['id', 'employee__name']
\ No newline at end of file
+    list_select_related = ['employee']
+    # Choice filters need no query; a category filter would SELECT DISTINCT
+    # over the whole table on every page
+    list_filter = ['severity', 'status']
+    # Primary key or alerts_employee_created_idx; no join to employees
+    search_fields = ['id__exact', 'employee__id__exact']
+    autocomplete_fields = ['employee', 'category_ref']
+
+
+@admin.register(AlertCategory)
+class AlertCategoryAdmin(admin.ModelAdmin):
+    # A handful of rows: plain count and list are fine
+    list_display = ['id', 'name']
+    search_fields = ['name']
+
+
+@admin.register(ArchivedAlert)
+class ArchivedAlertAdmin(LargeTableAdmin):
+    list_display = ['id', 'employee', 'severity', 'category', 'created_at', 'archived_at']
+    list_select_related = ['employee']
+    list_filter = ['severity']
+    search_fields = ['id__exact', 'employee__id__exact']
+    autocomplete_fields = ['employee', 'category_ref']
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'status', 'attempts', 'duration_ms', 'run_after', 'finished_at']
+    list_filter = ['status', 'name']
+    readonly_fields = [field.name for field in Task._meta.fields]
+    actions = ['enqueue_again']
+
+    @admin.action(description='Queue selected tasks again')
+    def enqueue_again(self, request, queryset):
+        for selected in queryset:
+            enqueue(selected.name, **selected.kwargs)
+        self.message_user(request, f'Queued {queryset.count()} tasks')
@@ -1,6 +1,20 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class AlertsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'alerts'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
+        from .snapshot import load_snapshot
+
+        # Map the prebuilt hierarchy snapshot now (no queries); its
+        # freshness is checked against the database on first use
+        load_snapshot()
+
+        if settings.LOGGING_QUEUE:
+            from .log_handlers import install_queue_logging
+
+            install_queue_logging(settings.LOGGING_QUEUE_LOGGERS)
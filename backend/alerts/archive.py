@@ -0,0 +1,101 @@
+import heapq
+import logging
+import time
+from datetime import timedelta
+from typing import Iterable, Optional
+from django.db import connection, connections, transaction
+from django.db.models.functions import Collate
+from django.utils import timezone
+from .columnar import alert_columns, bump_alerts_version
+from .models import Alert, ArchivedAlert
+
+logger = logging.getLogger("alerts")
+
+ARCHIVED_FIELDS = ["id", "employee_id", "severity", "category_ref_id", "created_at", "status"]
+
+
+def archive_dismissed_alerts(
+    older_than: timedelta,
+    batch_size: int,
+    max_batches: Optional[int] = None,
+    pause: float = 0.0,
+    now=None,
+) -> int:
+    """
+    Move dismissed alerts created before now - older_than into alerts_archive.
+    Each batch is copied and deleted in its own short transaction, so locks
+    are held for one batch at a time and readers never see an alert in both
+    tables (or in neither).
+    Args:
+        older_than: minimum age (by created_at) of alerts to archive
+        batch_size: rows moved per transaction
+        max_batches: stop after this many batches (None = until done)
+        pause: seconds to sleep between batches to yield to other writers
+        now: reference time (defaults to timezone.now())
+    Returns:
+        Number of alerts archived
+    """
+    cutoff = (now or timezone.now()) - older_than
+    total = 0
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        with transaction.atomic():
+            candidates = Alert.objects.filter(
+                status="dismissed", created_at__lt=cutoff
+            ).order_by("created_at", "id")
+            if connection.features.has_select_for_update_skip_locked:
+                # Skip rows a concurrent request is writing instead of waiting
+                candidates = candidates.select_for_update(skip_locked=True)
+
+            rows = list(candidates.values(*ARCHIVED_FIELDS)[:batch_size])
+            if not rows:
+                break
+
+            ArchivedAlert.objects.bulk_create(
+                [ArchivedAlert(**row) for row in rows], ignore_conflicts=True
+            )
+            Alert.objects.filter(id__in=[row["id"] for row in rows]).delete()
+            version = bump_alerts_version()
+
+        alert_columns.remove((row["id"] for row in rows), version)
+        total += len(rows)
+        batches += 1
+        logger.info(f"archive_dismissed_alerts: batch={batches}, moved={len(rows)}")
+
+        if len(rows) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    return total
+
+
+def merge_order(queryset):
+    """
+    queryset in Alert.Meta.ordering with id compared the way _sort_key
+    compares it (by code point). PostgreSQL orders text by the database
+    collation, under which "A10" may sort before "a1", and heapq.merge would
+    interleave created_at ties out of order. SQLite's default BINARY
+    collation already orders UTF-8 by code point.
+    """
+    if connections[queryset.db].vendor == "postgresql":
+        return queryset.order_by("-created_at", Collate("id", "C"))
+    return queryset.order_by("-created_at", "id")
+
+
+def _sort_key(alert):
+    """Alert.Meta.ordering (created_at DESC, id ASC) for instances or value rows."""
+    if isinstance(alert, dict):
+        return (-alert["created_at"].timestamp(), alert["id"])
+    return (-alert.created_at.timestamp(), alert.id)
+
+
+def merge_alert_streams(*sources: Iterable):
+    """
+    Merge alert streams that are each already in Alert.Meta.ordering, with
+    id ties broken by code point (see merge_order).
+    """
+    if len(sources) == 1:
+        return sources[0]
+    return heapq.merge(*sources, key=_sort_key)
@@ -0,0 +1,74 @@
+import threading
+from typing import Dict, Iterable, List, Tuple
+from django.db import router, transaction
+from django.db.models import F
+from .models import AlertCategory
+
+# AlertCategory rows are append-only (alerts PROTECT them and nothing
+# renames them), so a cached entry never goes stale; a miss reloads
+_lock = threading.Lock()
+_names: Dict[int, str] = {}
+_codes: Dict[str, int] = {}
+
+
+def _store(rows: List[Tuple[int, str]]):
+    with _lock:
+        _names.update(rows)
+        _codes.update((name, code) for code, name in rows)
+
+
+def _reload() -> List[Tuple[int, str]]:
+    """
+    Read every category from the primary (a lagging replica may not have a
+    name just created). Rows read inside a transaction are cached only once
+    it commits: a rollback takes new categories (and codes) with it.
+    """
+    using = router.db_for_write(AlertCategory)
+    rows = list(AlertCategory.objects.using(using).order_by().values_list("id", "name"))
+    if transaction.get_connection(using).in_atomic_block:
+        transaction.on_commit(lambda: _store(rows), using=using)
+    else:
+        _store(rows)
+    return rows
+
+
+def category_name(code: int) -> str:
+    """Category name for an alert's category_ref_id."""
+    name = _names.get(code)
+    if name is None:
+        name = dict(_reload())[code]
+    return name
+
+
+def category_codes(names: Iterable[str], create: bool = False) -> Dict[str, int]:
+    """
+    Codes of the given category names. Unknown names are left out, or
+    inserted first when create is True.
+    """
+    names = set(names)
+    codes = _codes
+    if names - codes.keys():
+        codes = {name: code for code, name in _reload()}
+        missing = names - codes.keys()
+        if missing and create:
+            AlertCategory.objects.using(router.db_for_write(AlertCategory)).bulk_create(
+                [AlertCategory(name=name) for name in missing], ignore_conflicts=True
+            )
+            codes = {name: code for code, name in _reload()}
+    return {name: codes[name] for name in names if name in codes}
+
+
+def clear_category_cache():
+    """Forget cached codes (tests, whose rollbacks do reuse codes)."""
+    with _lock:
+        _names.clear()
+        _codes.clear()
+
+
+def with_category_code(queryset):
+    """
+    Annotate ``category`` as the raw code column, so ``.values(..., "category",
+    ...)`` keeps its column order and needs no join; map the codes with
+    category_name. Only for .values(): on instances it would hit the property.
+    """
+    return queryset.annotate(category=F("category_ref_id"))
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+
+@register()
+def columnar_dependencies(app_configs, **kwargs):
+    """ALERTS_COLUMNAR needs NumPy; without it every request would fall back to the ORM."""
+    from .columnar import np
+
+    if settings.ALERTS_COLUMNAR and np is None:
+        return [
+            Error(
+                "ALERTS_COLUMNAR is on but NumPy is not installed.",
+                hint="pip install -r requirements.txt, or set ALERTS_COLUMNAR=False.",
+                id="alerts.E001",
+            )
+        ]
+    return []
@@ -0,0 +1,115 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger("alerts")
+
+
+class _Call:
+    def __init__(self, generation: int):
+        self.generation = generation
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesce identical concurrent computations within one process.
+    The first caller for a key runs fn(); callers arriving while it runs
+    wait and share its result (or its exception). With fresh_seconds > 0 a
+    finished result is also reused for that long. clear() drops reusable
+    results and detaches in-flight calls, so nothing computed before a
+    write is handed to a request that arrives after it. With wait_seconds
+    set, a caller that has waited that long for a stuck call runs fn()
+    itself instead.
+    Only threads of the same process share work (threaded servers such as
+    gunicorn --threads or runserver).
+    """
+
+    # Expired fresh results are pruned once this many keys are held
+    MAX_FRESH_KEYS = 1024
+
+    def __init__(self, fresh_seconds: float = 0.0, wait_seconds: Optional[float] = None):
+        self.fresh_seconds = fresh_seconds
+        self.wait_seconds = wait_seconds
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._fresh: Dict[Hashable, Tuple[float, Any]] = {}
+        self._generation = 0
+        self._counts = {"requests": 0, "executed": 0, "coalesced": 0, "fresh_hits": 0,
+                        "wait_timeouts": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Returns:
+            (result, shared): shared is False only for the caller that ran fn
+        """
+        with self._lock:
+            self._counts["requests"] += 1
+
+            fresh = self._fresh.get(key)
+            if fresh is not None and fresh[0] > time.monotonic():
+                self._counts["fresh_hits"] += 1
+                return fresh[1], True
+
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call(self._generation)
+                self._counts["executed"] += 1
+            else:
+                self._counts["coalesced"] += 1
+
+        if not leader:
+            if not call.done.wait(self.wait_seconds):
+                with self._lock:
+                    self._counts["coalesced"] -= 1
+                    self._counts["executed"] += 1
+                    self._counts["wait_timeouts"] += 1
+                logger.warning(f"SingleFlight: gave up waiting {self.wait_seconds}s for {key!r}")
+                return fn(), False
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                if (
+                    call.error is None
+                    and self.fresh_seconds > 0
+                    and call.generation == self._generation
+                ):
+                    self._store_fresh(key, call.result)
+            call.done.set()
+
+        return call.result, False
+
+    def _store_fresh(self, key: Hashable, result: Any):
+        now = time.monotonic()
+        if len(self._fresh) >= self.MAX_FRESH_KEYS:
+            self._fresh = {k: v for k, v in self._fresh.items() if v[0] > now}
+        self._fresh[key] = (now + self.fresh_seconds, result)
+
+    def clear(self):
+        """Forget fresh results and stop new callers joining running calls."""
+        with self._lock:
+            self._generation += 1
+            self._calls = {}
+            self._fresh = {}
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters since start, plus the share of requests that ran no queries."""
+        with self._lock:
+            stats = dict(self._counts)
+        saved = stats["coalesced"] + stats["fresh_hits"]
+        stats["saved_ratio"] = round(saved / stats["requests"], 4) if stats["requests"] else 0.0
+        return stats
@@ -0,0 +1,394 @@
+import itertools
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import F
+from .categories import category_codes, category_name
+from .models import Alert, AlertsVersion, Employee
+from .snapshot import hierarchy_stamp
+from .utils import get_employee_subtree
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+logger = logging.getLogger("alerts")
+
+ROW_FIELDS = ["id", "employee_id", "severity", "category", "created_at", "status"]
+# Same columns as stored: the category code instead of its name
+_LOAD_FIELDS = ["id", "employee_id", "severity", "category_ref_id", "created_at", "status"]
+SEVERITIES = [value for value, _ in Alert.SEVERITY_CHOICES]
+STATUSES = [value for value, _ in Alert.STATUS_CHOICES]
+ID_MAX_LENGTH = Alert._meta.get_field("id").max_length
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+LOAD_CHUNK_SIZE = 5000
+ALERTS_ROW = 1
+
+
+# A-Z -> a-z only, like SQLite's LIKE
+_ASCII_LOWER = {code: code + 32 for code in range(ord("A"), ord("Z") + 1)}
+_code_point_order: Dict[str, bool] = {}
+
+
+def _fold_ascii(text: str) -> str:
+    return text.translate(_ASCII_LOWER)
+
+
+def _fold_upper(text: str) -> str:
+    # Character by character, like PostgreSQL's UPPER(): "ß" stays "ß"
+    return "".join(upper if len(upper := c.upper()) == 1 else c for c in text)
+
+
+def name_folder(vendor: str) -> Callable[[str], str]:
+    """How vendor's employee__name__icontains compares case (SQLite: ASCII only)."""
+    return _fold_ascii if vendor == "sqlite" else _fold_upper
+
+
+def ids_in_code_point_order(using: str) -> bool:
+    """
+    Whether ORDER BY id on using sorts by code point, as lexsort does:
+    SQLite's BINARY collation does, PostgreSQL only with a C/POSIX database
+    collation (see archive.merge_order). Cached per alias.
+    """
+    if using not in _code_point_order:
+        connection = connections[using]
+        ordered = connection.vendor == "sqlite"
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT datcollate FROM pg_database WHERE datname = current_database()"
+                )
+                ordered = cursor.fetchone()[0] in ("C", "POSIX")
+        _code_point_order[using] = ordered
+    return _code_point_order[using]
+
+
+def alerts_version() -> int:
+    """Current AlertsVersion (0 before the first counted write)."""
+    return AlertsVersion.objects.filter(pk=ALERTS_ROW).values_list("version", flat=True).first() or 0
+
+
+def bump_alerts_version() -> Optional[int]:
+    """
+    Count a write to the alerts table (or to employee names) and return the
+    new version, or None with ALERTS_COLUMNAR off (no copies to invalidate).
+    Call inside the writing transaction: on PostgreSQL the row lock then
+    orders concurrent writers, so each sees the version its own write made.
+    Alert.save(), Alert.objects bulk writes and archival call it; only raw
+    SQL on alerts must call it itself.
+    """
+    if not settings.ALERTS_COLUMNAR:
+        return None
+    with transaction.atomic():
+        counter = AlertsVersion.objects.filter(pk=ALERTS_ROW)
+        if not counter.update(version=F("version") + 1):
+            _, created = AlertsVersion.objects.get_or_create(pk=ALERTS_ROW, defaults={"version": 1})
+            if not created:
+                counter.update(version=F("version") + 1)  # A concurrent writer created it
+        return counter.values_list("version", flat=True).get()
+
+
+def _epoch_us(value: datetime) -> int:
+    return (value - EPOCH) // MICROSECOND
+
+
+class ColumnarAlerts:
+    """
+    The hot alerts table held in memory as NumPy columns, one row per alert:
+        employee  int32   index into employee_ids / employee_names
+        severity  int8    index into SEVERITIES
+        status    int8    index into STATUSES
+        category  int16   AlertCategory code (category_ref_id)
+        created   int64   created_at as epoch microseconds
+        ids       U<n>    alert IDs, fixed width (Alert.id max_length)
+        live      bool    False once the alert left the table (archived)
+    Rows never move: writers update them in place or append. A query is a
+    boolean mask over the columns, so its cost is one vectorized pass over
+    the table plus the rows it returns.
+
+    Writes made in this process are applied as they happen (Alert.save()
+    through alerts.signals, ingest and archival explicitly). Every write
+    also bumps the shared AlertsVersion; a request that finds it (or the
+    hierarchy stamp) moved past this copy's reloads first, so writes from
+    other processes are visible on the next request.
+    """
+
+    # Everything load() swaps in
+    STATE = (
+        "loaded_at", "stale", "stamp", "version", "size", "_columns", "_row_of",
+        "employee_ids", "employee_names", "_employee_index", "_folded_names", "_fold",
+    )
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # One reload at a time; queries keep using the current copy meanwhile
+        self._load_lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Drop everything; the next query reloads from the database."""
+        with self._lock:
+            self.loaded_at: Optional[float] = None
+            self.stale = False
+            self.stamp = None
+            self.version: Optional[int] = None
+            self.size = 0
+            self._columns: Dict[str, Any] = {}
+            self._row_of: Dict[str, int] = {}
+            self.employee_ids: List[str] = []
+            self.employee_names: List[str] = []
+            self._employee_index: Dict[str, int] = {}
+            self._folded_names: List[str] = []
+            self._fold: Callable[[str], str] = _fold_upper
+
+    @property
+    def loaded(self) -> bool:
+        return self.loaded_at is not None
+
+    def load(self):
+        """
+        Read the employees and the whole hot alerts table into new columns,
+        then swap them in. Only the swap takes the lock.
+        """
+        start = time.perf_counter()
+        fresh = ColumnarAlerts()
+        fresh._read()
+        with self._lock:
+            for name in self.STATE:
+                setattr(self, name, getattr(fresh, name))
+
+        logger.info(
+            f"Columnar alerts loaded: rows={self.size}, employees={len(self.employee_ids)}, "
+            f"ms={(time.perf_counter() - start) * 1000:.0f}"
+        )
+
+    def _read(self):
+        """Fill this (private, unshared) copy from the database, chunk by chunk."""
+        # Stamps first: a write racing the read leaves them behind, forcing a reload
+        self.stamp = hierarchy_stamp()
+        self.version = alerts_version()
+        self._fold = name_folder(connections[router.db_for_read(Alert)].vendor)
+        for employee_id, name in Employee.objects.order_by("id").values_list("id", "name"):
+            self._add_employee(employee_id, name)
+
+        self._allocate(max(Alert.objects.count(), 1024))
+        rows = Alert.objects.order_by().values_list(*_LOAD_FIELDS).iterator(LOAD_CHUNK_SIZE)
+        while chunk := list(itertools.islice(rows, LOAD_CHUNK_SIZE)):
+            # An alert of an employee created after the read waits for the reload
+            # that employee's hierarchy stamp bump triggers
+            chunk = [row for row in chunk if row[1] in self._employee_index]
+            end = self.size + len(chunk)
+            if end > len(self._columns["ids"]):
+                self._allocate(max(end, 2 * len(self._columns["ids"])))
+            self._write(range(self.size, end), chunk)
+            self._row_of.update((row[0], i) for i, row in enumerate(chunk, self.size))
+            self.size = end
+        self.loaded_at = time.monotonic()
+
+    def _add_employee(self, employee_id: str, name: str):
+        self._employee_index[employee_id] = len(self.employee_ids)
+        self.employee_ids.append(employee_id)
+        self.employee_names.append(name)
+        self._folded_names.append(self._fold(name))
+
+    def _allocate(self, capacity: int):
+        old, size = self._columns, self.size
+        self._columns = {
+            "employee": np.zeros(capacity, dtype=np.int32),
+            "severity": np.zeros(capacity, dtype=np.int8),
+            "status": np.zeros(capacity, dtype=np.int8),
+            "category": np.zeros(capacity, dtype=np.int16),
+            "created": np.zeros(capacity, dtype=np.int64),
+            "ids": np.zeros(capacity, dtype=f"U{ID_MAX_LENGTH}"),
+            "live": np.zeros(capacity, dtype=bool),
+        }
+        for name, column in old.items():
+            self._columns[name][:size] = column[:size]
+
+    def _write(self, positions: Iterable[int], rows: List[tuple]):
+        """Store _LOAD_FIELDS tuples at positions (same length)."""
+        positions = np.fromiter(positions, dtype=np.int64, count=len(rows))
+        if not len(rows):
+            return
+        ids, employees, severities, categories, created, statuses = zip(*rows)
+        columns = self._columns
+        columns["ids"][positions] = ids
+        columns["employee"][positions] = [self._employee_index[e] for e in employees]
+        columns["severity"][positions] = [SEVERITIES.index(s) for s in severities]
+        columns["status"][positions] = [STATUSES.index(s) for s in statuses]
+        columns["category"][positions] = categories
+        columns["created"][positions] = [_epoch_us(c) for c in created]
+        columns["live"][positions] = True
+
+    def _applies(self, version: Optional[int]) -> bool:
+        """Whether a local write that made version follows this copy directly."""
+        if version is not None and self.version == version - 1:
+            self.version = version
+            return True
+        # Another write came in between: reload instead of guessing the order
+        self.stale = True
+        return False
+
+    def upsert(self, rows: Iterable[Dict[str, Any]], version: Optional[int] = None):
+        """
+        Apply committed inserts/updates (dicts with ROW_FIELDS) that made
+        version (see bump_alerts_version). No-op until loaded. A row for an
+        employee this copy has not seen, or a version gap, marks it stale.
+        """
+        if not self.loaded:
+            return
+        with self._lock:
+            if not self.loaded or not self._applies(version):
+                return
+            rows = list(rows)
+            codes = category_codes({row["category"] for row in rows})
+            # position -> row; a repeated id keeps its last version
+            changes: Dict[int, tuple] = {}
+            end = self.size
+            for row in rows:
+                if row["employee_id"] not in self._employee_index:
+                    self.stale = True
+                    continue
+                position = self._row_of.get(row["id"])
+                if position is None:
+                    position = self._row_of[row["id"]] = end
+                    end += 1
+                changes[position] = tuple(
+                    codes[row[field]] if field == "category" else row[field] for field in ROW_FIELDS
+                )
+
+            if end > len(self._columns["ids"]):
+                self._allocate(max(end, 2 * len(self._columns["ids"])))
+            self._write(changes.keys(), list(changes.values()))
+            self.size = end
+
+    def remove(self, alert_ids: Iterable[str], version: Optional[int] = None):
+        """Apply committed deletes (e.g. archival) that made version. No-op until loaded."""
+        if not self.loaded:
+            return
+        with self._lock:
+            if not self.loaded or not self._applies(version):
+                return
+            for alert_id in alert_ids:
+                position = self._row_of.pop(alert_id, None)
+                if position is not None:
+                    self._columns["live"][position] = False
+
+    def _current(self) -> bool:
+        return (
+            self.loaded
+            and not self.stale
+            and (self.stamp, self.version) == (hierarchy_stamp(), alerts_version())
+        )
+
+    def ensure_current(self):
+        """Load, or reload if stale or the alerts or employees changed anywhere."""
+        if self._current():
+            return
+        with self._load_lock:
+            if not self._current():  # Unless another thread just reloaded
+                self.load()
+
+    def query(self, employee_ids: Iterable[str], filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Alerts of employee_ids matching filters (see parse_alert_filters;
+        include_archived is not supported), in Alert.Meta.ordering. Rows are
+        .values()-style dicts with ROW_FIELDS and employee__name.
+        """
+        with self._lock:
+            columns = {name: column[:self.size] for name, column in self._columns.items()}
+
+            # Employee-level conditions collapse into one membership bitmap
+            member = np.zeros(len(self.employee_ids), dtype=bool)
+            member[[self._employee_index[e] for e in employee_ids if e in self._employee_index]] = True
+            if filters["q"]:
+                # employee__name__icontains
+                needle = self._fold(filters["q"])
+                for i in np.flatnonzero(member):
+                    if needle not in self._folded_names[i]:
+                        member[i] = False
+
+            mask = member[columns["employee"]] & columns["live"]
+            if filters["severity"]:
+                codes = [SEVERITIES.index(s) for s in filters["severity"]]
+                mask &= np.isin(columns["severity"], codes)
+            if filters["status"]:
+                codes = [STATUSES.index(s) for s in filters["status"]]
+                mask &= np.isin(columns["status"], codes)
+            if filters["category"]:
+                codes = list(category_codes(filters["category"]).values())
+                mask &= np.isin(columns["category"], codes)
+            if filters["created_after"]:
+                mask &= columns["created"] >= _epoch_us(filters["created_after"])
+            if filters["created_before"]:
+                mask &= columns["created"] < _epoch_us(filters["created_before"])
+
+            # created_at DESC, id ASC; lexsort's last key is the primary one
+            selected = np.flatnonzero(mask)
+            ids = columns["ids"][selected]
+            created = columns["created"][selected]
+            order = np.lexsort((ids, -created))
+            selected, ids, created = selected[order], ids[order], created[order]
+
+            employees = columns["employee"][selected].tolist()
+            severities = columns["severity"][selected].tolist()
+            statuses = columns["status"][selected].tolist()
+            categories = columns["category"][selected].tolist()
+            employee_ids, names = self.employee_ids, self.employee_names
+
+            return [
+                {
+                    "id": alert_id,
+                    "employee_id": employee_ids[employee],
+                    "employee__name": names[employee],
+                    "severity": SEVERITIES[severity],
+                    "category": category_name(category),
+                    "created_at": EPOCH + timedelta(microseconds=us),
+                    "status": STATUSES[status],
+                }
+                for alert_id, employee, severity, category, us, status in zip(
+                    ids.tolist(), employees, severities, categories, created.tolist(), statuses
+                )
+            ]
+
+
+# One copy per process, shared by its request threads
+alert_columns = ColumnarAlerts()
+_warned_missing = False
+_warned_collation = False
+
+
+def columnar_alerts(manager_id: str, filters: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+    """
+    get_alerts rows from the columnar copy, or None when the ORM must answer:
+    ALERTS_COLUMNAR is off, NumPy is not installed, include_archived, a
+    non-ASCII q (case folding is collation-specific), or a database whose
+    id order is not code point order (ties on created_at would differ).
+    """
+    global _warned_missing, _warned_collation
+    if not settings.ALERTS_COLUMNAR or filters["include_archived"]:
+        return None
+    if filters["q"] and not filters["q"].isascii():
+        return None
+    if np is None:
+        if not _warned_missing:
+            _warned_missing = True
+            logger.warning("ALERTS_COLUMNAR is on but NumPy is not installed; using the ORM")
+        return None
+    if not ids_in_code_point_order(router.db_for_read(Alert)):
+        if not _warned_collation:
+            _warned_collation = True
+            logger.warning(
+                "ALERTS_COLUMNAR is on but alert ids don't sort by code point; using the ORM"
+            )
+        return None
+
+    alert_columns.ensure_current()
+    employees = get_employee_subtree(manager_id, filters["scope"], filters["max_depth"])
+    return alert_columns.query(employees, filters)
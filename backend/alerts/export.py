@@ -0,0 +1,95 @@
+import csv
+import io
+import logging
+from datetime import timezone as dt_timezone
+from typing import Dict, Iterable, Iterator, List
+from .archive import merge_alert_streams
+from .categories import category_name, with_category_code
+
+logger = logging.getLogger("alerts")
+
+# CSV header; employee_name is joined in, category mapped from its code,
+# everything else is an Alert column
+EXPORT_COLUMNS = [
+    "id",
+    "employee_id",
+    "employee_name",
+    "severity",
+    "category",
+    "created_at",
+    "status",
+]
+_VALUE_FIELDS = [
+    "id",
+    "employee_id",
+    "employee__name",
+    "severity",
+    "category",
+    "created_at",
+    "status",
+]
+
+
+def _format_datetime(value) -> str:
+    """Same rendering as the API: UTC ISO-8601 with a Z suffix."""
+    value = value.astimezone(dt_timezone.utc).isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def iter_export_rows(sources: List, chunk_size: int) -> Iterator[Dict]:
+    """
+    Alert value rows from each queryset (as built by alert_querysets, so
+    already in merge order), fetched chunk_size at a time (server-side
+    cursors on PostgreSQL) and merged in the API's stable created_at DESC,
+    id ASC order.
+    """
+    streams = [
+        with_category_code(qs)
+        .values(*_VALUE_FIELDS)
+        .iterator(chunk_size=chunk_size)
+        for qs in sources
+    ]
+    return merge_alert_streams(*streams)
+
+
+def iter_csv(rows: Iterable[Dict], rows_per_chunk: int = 500) -> Iterator[str]:
+    """
+    Encode rows as CSV text. The header is yielded on its own so the response
+    starts immediately; after that rows are grouped rows_per_chunk at a time.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def drain():
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    writer.writerow(EXPORT_COLUMNS)
+    yield drain()
+
+    count = 0
+    for row in rows:
+        writer.writerow(
+            [
+                row["id"],
+                row["employee_id"],
+                row["employee__name"],
+                row["severity"],
+                category_name(row["category"]),
+                _format_datetime(row["created_at"]),
+                row["status"],
+            ]
+        )
+        count += 1
+        if count % rows_per_chunk == 0:
+            yield drain()
+
+    tail = drain()
+    if tail:
+        yield tail
+
+    logger.info(f"export_alerts: rows={count}")
@@ -0,0 +1,189 @@
+from datetime import datetime, time, timezone as dt_timezone
+from typing import Any, Dict, List, Mapping, Optional
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from .archive import merge_order
+from .categories import category_codes
+from .models import Alert, ArchivedAlert
+
+VALID_SCOPES = {"direct", "subtree", "depth"}
+VALID_SEVERITIES = {"low", "medium", "high"}
+VALID_STATUSES = {"open", "dismissed"}
+VALID_FIELDS = {"id", "employee", "severity", "category", "created_at", "status"}
+VALID_SHAPES = {"nested", "normalized"}
+BOOLEAN_VALUES = {"true": True, "false": False, "1": True, "0": False}
+
+
+class InvalidFilter(Exception):
+    """Raised when a query parameter fails validation.
+
+    The message is the exact ``detail`` returned to the client.
+    """
+
+
+def _parse_csv(value: Optional[str]) -> List[str]:
+    if not value:
+        return []
+    return [s.strip() for s in value.split(",")]
+
+
+def _parse_timestamp(value: Optional[str], name: str) -> Optional[datetime]:
+    """Parse an ISO-8601 datetime or date (midnight UTC); naive values are UTC."""
+    if not value:
+        return None
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            parsed = datetime.combine(day, time.min) if day else None
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise InvalidFilter(f"invalid {name}")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    return parsed
+
+
+def parse_depth(
+    value: Optional[str], name: str, default: Optional[int], maximum: Optional[int] = None
+) -> Optional[int]:
+    """Parse a positive tree depth (1 = direct reports), at most maximum."""
+    if value is None or value == "":
+        return default
+    try:
+        depth = int(value)
+    except (TypeError, ValueError):
+        raise InvalidFilter(f"invalid {name}")
+    if depth < 1 or (maximum is not None and depth > maximum):
+        raise InvalidFilter(f"invalid {name}")
+    return depth
+
+
+def parse_alert_filters(params: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Validate the shared alert query params (everything except manager_id).
+    Args:
+        params: request.GET or any mapping with the same keys
+    Returns:
+        Dict with scope, max_depth, severity, status, category, q,
+        include_archived, created_after and created_before
+    Raises:
+        InvalidFilter: with the API error detail for the first invalid param
+    """
+    scope = params.get("scope", "direct")
+    if scope not in VALID_SCOPES:
+        raise InvalidFilter("invalid scope")
+
+    # Only scope=depth is bounded; direct and subtree ignore max_depth
+    max_depth = None
+    if scope == "depth":
+        max_depth = parse_depth(params.get("max_depth"), "max_depth", default=None)
+        if max_depth is None:
+            raise InvalidFilter("max_depth is required")
+
+    severity = _parse_csv(params.get("severity"))
+    if not all(s in VALID_SEVERITIES for s in severity):
+        raise InvalidFilter("invalid severity")
+
+    status = _parse_csv(params.get("status"))
+    if not all(s in VALID_STATUSES for s in status):
+        raise InvalidFilter("invalid status")
+
+    # Names from the alert_categories table (cached per process)
+    category = _parse_csv(params.get("category"))
+    if len(category_codes(category)) != len(set(category)):
+        raise InvalidFilter("invalid category")
+
+    include_archived = BOOLEAN_VALUES.get(
+        str(params.get("include_archived", "false")).lower()
+    )
+    if include_archived is None:
+        raise InvalidFilter("invalid include_archived")
+
+    created_after = _parse_timestamp(params.get("created_after"), "created_after")
+    created_before = _parse_timestamp(params.get("created_before"), "created_before")
+    if created_after and created_before and created_after >= created_before:
+        raise InvalidFilter("created_after must be before created_before")
+
+    return {
+        "scope": scope,
+        "max_depth": max_depth,
+        "severity": severity,
+        "status": status,
+        "category": category,
+        "q": params.get("q") or "",
+        "include_archived": include_archived,
+        "created_after": created_after,
+        "created_before": created_before,
+    }
+
+
+def parse_response_options(params: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Validate the response-shaping query params.
+    Args:
+        params: request.GET or any mapping with the same keys
+    Returns:
+        Dict with fields (list, or None for all), shape and include_distance
+    Raises:
+        InvalidFilter: with the API error detail for the first invalid param
+    """
+    fields = None
+    if "fields" in params:
+        fields = [f for f in _parse_csv(params.get("fields")) if f]
+        if not fields or not all(f in VALID_FIELDS for f in fields):
+            raise InvalidFilter("invalid fields")
+
+    shape = params.get("shape", "nested")
+    if shape not in VALID_SHAPES:
+        raise InvalidFilter("invalid shape")
+
+    include_distance = BOOLEAN_VALUES.get(
+        str(params.get("include_distance", "false")).lower()
+    )
+    if include_distance is None:
+        raise InvalidFilter("invalid include_distance")
+
+    return {"fields": fields, "shape": shape, "include_distance": include_distance}
+
+
+def apply_alert_filters(alerts, filters: Dict[str, Any]):
+    """Apply severity/status/category/q filters to an Alert or ArchivedAlert queryset."""
+    if filters["severity"]:
+        alerts = alerts.filter(severity__in=filters["severity"])
+
+    # Status defaults to all
+    if filters["status"]:
+        alerts = alerts.filter(status__in=filters["status"])
+
+    # Compared by code on the alert row, no join to alert_categories
+    if filters["category"]:
+        alerts = alerts.filter(category_ref_id__in=category_codes(filters["category"]).values())
+
+    # Half-open window [created_after, created_before), served by the
+    # (employee, -created_at) index as a range scan per employee
+    if filters["created_after"]:
+        alerts = alerts.filter(created_at__gte=filters["created_after"])
+
+    if filters["created_before"]:
+        alerts = alerts.filter(created_at__lt=filters["created_before"])
+
+    if filters["q"]:
+        alerts = alerts.filter(employee__name__icontains=filters["q"])
+
+    return alerts
+
+
+def alert_querysets(employees, filters: Dict[str, Any]) -> List:
+    """
+    Filtered querysets for alerts of the given employees (an ID subquery),
+    each already in Alert.Meta.ordering: the hot table, then the archive when
+    include_archived.
+    """
+    querysets = [Alert.objects.filter(employee_id__in=employees)]
+    if not filters["include_archived"]:
+        return [apply_alert_filters(querysets[0], filters)]
+    querysets.append(ArchivedAlert.objects.filter(employee_id__in=employees))
+    # Merged in Python: order ids the way the merge compares them
+    return [merge_order(apply_alert_filters(qs, filters)) for qs in querysets]
@@ -0,0 +1,241 @@
+import logging
+import uuid
+from itertools import chain, islice
+from typing import Any, Dict, Iterable, List, Optional
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from .filters import apply_alert_filters
+from .models import Alert, Employee, InboxEntry, ManagerInbox
+from .snapshot import ensure_hierarchy_stamp, hierarchy_stamp
+from .utils import scope_subquery
+
+logger = logging.getLogger("alerts")
+
+BUILD_BATCH_SIZE = 5000
+
+
+def subtree_sizes() -> Dict[str, int]:
+    """
+    Number of employees below each manager, from one edge query: every
+    employee walks up its reporting chain, counting itself once for each
+    manager on the way (cycle-safe). O(n * depth).
+    """
+    parent = dict(Employee.objects.order_by().values_list("id", "reports_to_id"))
+    sizes: Dict[str, int] = {}
+    for employee_id, manager_id in parent.items():
+        seen = {employee_id}
+        while manager_id is not None and manager_id not in seen:
+            seen.add(manager_id)
+            sizes[manager_id] = sizes.get(manager_id, 0) + 1
+            manager_id = parent.get(manager_id)
+    return sizes
+
+
+def _open_alerts(manager_id: str):
+    """(id, created_at) of the open alerts a manager's inbox should hold."""
+    return (
+        Alert.objects.filter(employee_id__in=scope_subquery(manager_id, "subtree"), status="open")
+        .order_by()
+        .values_list("id", "created_at")
+    )
+
+
+def rebuild_inbox(manager_id: str, subtree_size: int) -> int:
+    """Replace one manager's inbox in a single transaction; returns its entry count."""
+    # A new inbox is committed empty and unreadable (version -1) first, so
+    # writers racing the build already fan out to it
+    ManagerInbox.objects.get_or_create(
+        manager_id=manager_id,
+        defaults={
+            "subtree_size": subtree_size,
+            "hierarchy_token": uuid.uuid4(),
+            "hierarchy_version": -1,
+            "built_at": timezone.now(),
+        },
+    )
+    with transaction.atomic():
+        # Exclusive until commit; writers share-lock it (see _lock_inboxes),
+        # so their entry changes land entirely before or after this build
+        inbox = ManagerInbox.objects.select_for_update().get(manager_id=manager_id)
+        # Stamp next: a hierarchy change racing the build leaves it stale, never wrong
+        inbox.hierarchy_token, inbox.hierarchy_version = ensure_hierarchy_stamp()
+        inbox.subtree_size = subtree_size
+        inbox.built_at = timezone.now()
+        inbox.save()
+        InboxEntry.objects.filter(manager=inbox).delete()
+
+        entries = 0
+        rows = _open_alerts(manager_id).iterator(chunk_size=BUILD_BATCH_SIZE)
+        while batch := list(islice(rows, BUILD_BATCH_SIZE)):
+            InboxEntry.objects.bulk_create(
+                InboxEntry(manager=inbox, alert_id=alert_id, created_at=created_at)
+                for alert_id, created_at in batch
+            )
+            entries += len(batch)
+    return entries
+
+
+def rebuild_inboxes(min_subtree: int, manager_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Give every manager with at least min_subtree employees below them an up
+    to date inbox, and drop the inboxes of managers below the threshold
+    (all of them when min_subtree is 0). manager_ids limits the rebuild to
+    those managers.
+    Returns:
+        {"built": {manager_id: entries}, "removed": count}
+    """
+    sizes = subtree_sizes()
+    heavy = {m for m, size in sizes.items() if min_subtree > 0 and size >= min_subtree}
+
+    removed = 0
+    if manager_ids is None:
+        removed, _ = ManagerInbox.objects.exclude(manager_id__in=heavy).delete()
+        targets = sorted(heavy)
+    else:
+        targets = [m for m in manager_ids if m in heavy]
+
+    built = {}
+    for manager_id in targets:
+        built[manager_id] = rebuild_inbox(manager_id, sizes[manager_id])
+        logger.info(f"Inbox rebuilt: manager={manager_id}, entries={built[manager_id]}")
+    return {"built": built, "removed": removed}
+
+
+def repair_inbox(manager_id: str, sizes: Dict[str, int]) -> Optional[int]:
+    """
+    Rebuild a drifted inbox, or drop it when its manager is now below
+    MANAGER_INBOX_MIN_SUBTREE (sizes as from subtree_sizes()).
+    Returns:
+        The rebuilt entry count, or None when the inbox was dropped
+    """
+    min_subtree = settings.MANAGER_INBOX_MIN_SUBTREE
+    size = sizes.get(manager_id, 0)
+    if min_subtree <= 0 or size < min_subtree:
+        ManagerInbox.objects.filter(manager_id=manager_id).delete()
+        logger.info(f"Inbox dropped: manager={manager_id}, subtree={size}")
+        return None
+    return rebuild_inbox(manager_id, size)
+
+
+def inbox_drift(inbox: ManagerInbox) -> Dict[str, Any]:
+    """
+    Compare an inbox with what it should hold.
+    Returns:
+        {"stale": built for another hierarchy, "missing": alert IDs,
+        "extra": alert IDs} (entries with a wrong created_at are in both)
+    """
+    expected = set(_open_alerts(inbox.manager_id))
+    actual = set(inbox.entries.values_list("alert_id", "created_at"))
+    return {
+        "stale": (inbox.hierarchy_token, inbox.hierarchy_version) != hierarchy_stamp(),
+        "missing": sorted(alert_id for alert_id, _ in expected - actual),
+        "extra": sorted(alert_id for alert_id, _ in actual - expected),
+    }
+
+
+def drifted_inboxes():
+    """(inbox, drift) for every inbox that is stale or out of step, by manager."""
+    for inbox in ManagerInbox.objects.order_by("manager_id"):
+        drift = inbox_drift(inbox)
+        if drift["stale"] or drift["missing"] or drift["extra"]:
+            yield inbox, drift
+
+
+def inbox_alerts(manager_id: str, filters: Dict[str, Any]):
+    """
+    Filtered Alert queryset read from manager_id's inbox, or None when the
+    inbox can't answer: inboxes are off (MANAGER_INBOX_MIN_SUBTREE = 0),
+    the request is not scope=subtree&status=open on the hot table, or the
+    manager has no inbox built for the current hierarchy.
+    """
+    if settings.MANAGER_INBOX_MIN_SUBTREE <= 0:
+        return None
+    if filters["scope"] != "subtree" or set(filters["status"]) != {"open"}:
+        return None
+    if filters["include_archived"]:
+        return None
+
+    inbox = ManagerInbox.objects.filter(manager_id=manager_id).values_list(
+        "hierarchy_token", "hierarchy_version"
+    ).first()
+    if inbox is None or inbox != hierarchy_stamp():
+        return None
+
+    # Range scan on inbox_manager_created_idx, already in Alert.Meta.ordering
+    alerts = Alert.objects.filter(inbox_entries__manager_id=manager_id).order_by(
+        "-inbox_entries__created_at", "inbox_entries__alert_id"
+    )
+    return apply_alert_filters(alerts, filters)
+
+
+def inbox_managers_of(employee_ids: Iterable[str]) -> Dict[str, List[str]]:
+    """
+    Managers with an inbox above each employee, in one recursive query up
+    the reporting chains. UNION makes it terminate on cycles.
+    """
+    ids = list(employee_ids)
+    table = Employee._meta.db_table
+    parent = Employee._meta.get_field("reports_to").column
+    inboxes = ManagerInbox._meta.db_table
+    placeholders = ", ".join(["%s"] * len(ids))
+    sql = (
+        f"WITH RECURSIVE up(employee, manager) AS ("
+        f"SELECT id, {parent} FROM {table} WHERE id IN ({placeholders}) AND {parent} IS NOT NULL "
+        f"UNION "
+        f"SELECT u.employee, e.{parent} FROM up u JOIN {table} e ON e.id = u.manager "
+        f"WHERE e.{parent} IS NOT NULL"
+        f") SELECT up.employee, up.manager FROM up "
+        f"JOIN {inboxes} i ON i.manager_id = up.manager WHERE up.manager <> up.employee"
+    )
+    managers: Dict[str, List[str]] = {}
+    with connection.cursor() as cursor:
+        cursor.execute(sql, ids)
+        for employee_id, manager_id in cursor.fetchall():
+            managers.setdefault(employee_id, []).append(manager_id)
+    return managers
+
+
+def _lock_inboxes(manager_ids: Iterable[str]):
+    """
+    Share-lock the inbox rows a write fans out to, until it commits.
+    Writers don't block each other; rebuild_inbox holds its row exclusively.
+    SQLite serializes writers anyway.
+    """
+    ids = sorted(set(manager_ids))
+    if not ids or connection.vendor != "postgresql":
+        return
+    placeholders = ", ".join(["%s"] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT manager_id FROM {ManagerInbox._meta.db_table} "
+            f"WHERE manager_id IN ({placeholders}) ORDER BY manager_id FOR SHARE",
+            ids,
+        )
+
+
+def sync_inbox_entries(alerts: Iterable[Dict[str, Any]]):
+    """
+    Fan out written alerts (dicts with id, employee_id, status, created_at)
+    to the inboxes above them: their old entries are dropped and open alerts
+    get one entry per inbox manager. Call inside the writing transaction.
+    """
+    if settings.MANAGER_INBOX_MIN_SUBTREE <= 0:
+        return
+    alerts = list(alerts)
+    if not alerts or not ManagerInbox.objects.exists():
+        return
+
+    open_alerts = [alert for alert in alerts if alert["status"] == "open"]
+    managers: Dict[str, List[str]] = {}
+    if open_alerts:
+        managers = inbox_managers_of({alert["employee_id"] for alert in open_alerts})
+    old_entries = InboxEntry.objects.filter(alert_id__in=[alert["id"] for alert in alerts])
+    _lock_inboxes(chain(old_entries.values_list("manager_id", flat=True), *managers.values()))
+    old_entries.delete()
+
+    InboxEntry.objects.bulk_create(
+        InboxEntry(manager_id=manager_id, alert_id=alert["id"], created_at=alert["created_at"])
+        for alert in open_alerts
+        for manager_id in managers.get(alert["employee_id"], ())
+    )
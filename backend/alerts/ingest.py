@@ -0,0 +1,224 @@
+import json
+import logging
+from datetime import timezone as dt_timezone
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from .categories import category_codes
+from .models import Employee, Alert, AlertCategory, ArchivedAlert
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+    _DecodeError = orjson.JSONDecodeError
+except ImportError:  # pragma: no cover - optional speedup
+    _loads = json.loads
+    _DecodeError = ValueError
+
+logger = logging.getLogger("alerts")
+
+SEVERITIES = {value for value, _ in Alert.SEVERITY_CHOICES}
+STATUSES = {value for value, _ in Alert.STATUS_CHOICES}
+ID_MAX_LENGTH = Alert._meta.get_field("id").max_length
+CATEGORY_MAX_LENGTH = AlertCategory._meta.get_field("name").max_length
+UPDATE_FIELDS = ["employee", "severity", "category_ref", "created_at", "status"]
+
+
+class InvalidRow(ValueError):
+    """Raised for an NDJSON line that is not a valid alert; message is the detail."""
+
+
+def _required_str(row: Dict[str, Any], key: str, max_length: int) -> str:
+    value = row.get(key)
+    if not isinstance(value, str) or not value or len(value) > max_length:
+        raise InvalidRow(f"invalid {key}")
+    return value
+
+
+def parse_alert_row(line: bytes) -> Dict[str, Any]:
+    """
+    Parse and validate one NDJSON line against the Alert model.
+    Returns:
+        Dict of Alert field values (employee existence is checked per batch)
+    Raises:
+        InvalidRow: with the error detail for the line
+    """
+    try:
+        row = _loads(line)
+    except _DecodeError:
+        raise InvalidRow("invalid json")
+    if not isinstance(row, dict):
+        raise InvalidRow("invalid json")
+
+    alert = {
+        "id": _required_str(row, "id", ID_MAX_LENGTH),
+        "employee_id": _required_str(row, "employee_id", ID_MAX_LENGTH),
+        "category": _required_str(row, "category", CATEGORY_MAX_LENGTH),
+    }
+
+    if row.get("severity") not in SEVERITIES:
+        raise InvalidRow("invalid severity")
+    alert["severity"] = row["severity"]
+
+    alert["status"] = row.get("status", "open")
+    if alert["status"] not in STATUSES:
+        raise InvalidRow("invalid status")
+
+    created_at = row.get("created_at")
+    try:
+        created_at = parse_datetime(created_at) if isinstance(created_at, str) else None
+    except ValueError:
+        created_at = None
+    if created_at is None:
+        raise InvalidRow("invalid created_at")
+    if timezone.is_naive(created_at):
+        created_at = timezone.make_aware(created_at, dt_timezone.utc)
+    alert["created_at"] = created_at
+
+    return alert
+
+
+def iter_lines(stream, max_line_bytes: int) -> Iterator[Tuple[int, bytes]]:
+    """
+    Yield (line_number, line) from a file-like stream without reading it
+    all into memory. Blank lines are skipped; over-long lines are yielded
+    as b"" so they are rejected without being buffered.
+    """
+    line_number = 0
+    while True:
+        line = stream.readline(max_line_bytes + 1)
+        if not line:
+            return
+        line_number += 1
+
+        if len(line) > max_line_bytes and not line.endswith(b"\n"):
+            # Drain the rest of the over-long line
+            while line and not line.endswith(b"\n"):
+                line = stream.readline(max_line_bytes)
+            yield line_number, b""
+            continue
+
+        if line.strip():
+            yield line_number, line
+
+
+def _upsert_batch(rows: List[Tuple[int, Dict[str, Any]]], errors: list) -> Tuple[int, int]:
+    """Upsert one batch of parsed rows; returns (accepted, rejected)."""
+    rejected = 0
+
+    employee_ids = {alert["employee_id"] for _, alert in rows}
+    known = set(Employee.objects.filter(id__in=employee_ids).values_list("id", flat=True))
+    archived = set(
+        ArchivedAlert.objects.filter(id__in={alert["id"] for _, alert in rows}).values_list(
+            "id", flat=True
+        )
+    )
+
+    # Last occurrence of an id wins; ON CONFLICT can't touch a row twice
+    latest: Dict[str, Dict[str, Any]] = {}
+    upserted_lines = []
+    for line_number, alert in rows:
+        if alert["employee_id"] not in known:
+            errors.append((line_number, "employee not found"))
+            rejected += 1
+        elif alert["id"] in archived:
+            errors.append((line_number, "alert is archived"))
+            rejected += 1
+        else:
+            latest[alert["id"]] = alert
+            upserted_lines.append(line_number)
+
+    # New category names are interned up front, outside the batch transaction
+    codes = category_codes({alert["category"] for alert in latest.values()}, create=True)
+
+    try:
+        with transaction.atomic():
+            Alert.objects.bulk_create(
+                [
+                    Alert(
+                        category_ref_id=codes[alert["category"]],
+                        **{field: value for field, value in alert.items() if field != "category"},
+                    )
+                    for alert in latest.values()
+                ],
+                update_conflicts=True,
+                unique_fields=["id"],
+                update_fields=UPDATE_FIELDS,
+            )  # Fans out to inboxes and columnar copies (see AlertQuerySet)
+    except DatabaseError as e:
+        logger.error(f"Ingest batch failed: {str(e)}")
+        errors.extend((line_number, "batch failed") for line_number in upserted_lines)
+        return 0, len(rows)
+
+    return len(rows) - rejected, rejected
+
+
+def ingest_alerts(
+    lines: Iterable[Tuple[int, bytes]], batch_size: int, max_errors: int, max_batches: int
+) -> Dict[str, Any]:
+    """
+    Validate NDJSON alert lines and upsert them in batches, each in its own
+    transaction. Memory is bounded by batch_size rows plus max_errors error
+    and max_batches batch entries, whatever the size of the stream.
+    Args:
+        lines: (line_number, line) pairs, e.g. from iter_lines
+        batch_size: lines per bulk upsert
+        max_errors: error details kept for the response (counts are exact)
+        max_batches: per-batch entries kept for the response (batch_count is exact)
+    Returns:
+        {"accepted", "rejected", "batch_count", "batches": [{batch,
+        first_line, last_line, accepted, rejected}], "errors": [{line, detail}]}
+    """
+    summary = {"accepted": 0, "rejected": 0, "batch_count": 0, "batches": [], "errors": []}
+
+    def flush(parsed, errors, first_line, last_line):
+        # errors already holds this batch's parse failures
+        invalid = len(errors)
+        accepted, rejected = _upsert_batch(parsed, errors) if parsed else (0, 0)
+        rejected += invalid
+
+        summary["accepted"] += accepted
+        summary["rejected"] += rejected
+        summary["batch_count"] += 1
+        if len(summary["batches"]) < max_batches:
+            summary["batches"].append(
+                {
+                    "batch": summary["batch_count"],
+                    "first_line": first_line,
+                    "last_line": last_line,
+                    "accepted": accepted,
+                    "rejected": rejected,
+                }
+            )
+        room = max_errors - len(summary["errors"])
+        if room > 0:
+            errors.sort(key=lambda error: error[0])
+            summary["errors"].extend(
+                {"line": line_number, "detail": detail} for line_number, detail in errors[:room]
+            )
+
+    parsed: List[Tuple[int, Dict[str, Any]]] = []
+    errors: List[Tuple[int, str]] = []
+    first_line = None
+    line_number = 0
+
+    for line_number, line in lines:
+        if first_line is None:
+            first_line = line_number
+        try:
+            if not line:
+                raise InvalidRow("line too long")
+            parsed.append((line_number, parse_alert_row(line)))
+        except InvalidRow as e:
+            errors.append((line_number, str(e)))
+
+        if len(parsed) + len(errors) >= batch_size:
+            flush(parsed, errors, first_line, line_number)
+            parsed, errors, first_line = [], [], None
+
+    if first_line is not None:
+        flush(parsed, errors, first_line, line_number)
+
+    return summary
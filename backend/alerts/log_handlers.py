@@ -0,0 +1,89 @@
+import atexit
+import logging
+import os
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Iterable, List
+
+# (queue_handler, target handlers, listener) per handler set
+_installed: List[Dict] = []
+_hooks_registered = False
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a ``rate`` fraction of records at or below ``max_level``.
+    Records above max_level (warnings and errors by default) are always kept.
+    Attach to a logger in settings.LOGGING for per-logger sampling:
+
+        "filters": {"sample": {"()": "alerts.log_handlers.SamplingFilter", "rate": 0.1}}
+    """
+
+    def __init__(self, rate: float = 1.0, max_level="INFO"):
+        super().__init__()
+        self.rate = rate
+        self.max_level = (
+            max_level if isinstance(max_level, int) else logging.getLevelName(max_level)
+        )
+
+    def filter(self, record):
+        if self.rate >= 1 or record.levelno > self.max_level:
+            return True
+        return random.random() < self.rate
+
+
+def install_queue_logging(logger_names: Iterable[str]):
+    """
+    Move the handlers of each named logger behind a QueueHandler.
+    The caller's thread only enqueues the record; a QueueListener thread per
+    distinct handler set does the formatting and file I/O. Handler levels
+    are still respected. Safe to call more than once.
+    """
+    if _installed:
+        return
+
+    groups: Dict[tuple, Dict] = {}
+    for name in logger_names:
+        logger = logging.getLogger(name)
+        handlers = tuple(h for h in logger.handlers if not isinstance(h, QueueHandler))
+        if not handlers:
+            continue
+
+        group = groups.get(handlers)
+        if group is None:
+            group = {"handler": QueueHandler(queue.SimpleQueue()), "targets": handlers}
+            groups[handlers] = group
+            _installed.append(group)
+
+        for handler in handlers:
+            logger.removeHandler(handler)
+        logger.addHandler(group["handler"])
+
+    _start_listeners()
+
+    global _hooks_registered
+    if not _hooks_registered:
+        _hooks_registered = True
+        atexit.register(stop_queue_logging)
+        # Listener threads do not survive fork (e.g. gunicorn --preload)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=_start_listeners)
+
+
+def _start_listeners():
+    for group in _installed:
+        # A fresh queue: one inherited across fork may hold a locked mutex
+        group["handler"].queue = queue.SimpleQueue()
+        group["listener"] = QueueListener(
+            group["handler"].queue, *group["targets"], respect_handler_level=True
+        )
+        group["listener"].start()
+
+
+def stop_queue_logging():
+    """Flush queued records and stop the listener threads."""
+    for group in _installed:
+        listener = group.pop("listener", None)
+        if listener is not None:
+            listener.stop()
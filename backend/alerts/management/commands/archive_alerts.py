@@ -0,0 +1,44 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from alerts.archive import archive_dismissed_alerts
+
+
+class Command(BaseCommand):
+    help = 'Move old dismissed alerts from the alerts table into alerts_archive'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than-days',
+            type=int,
+            default=settings.ALERT_ARCHIVE_MIN_AGE_DAYS,
+            help='Archive dismissed alerts created more than this many days ago',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.ALERT_ARCHIVE_BATCH_SIZE,
+            help='Alerts moved per transaction',
+        )
+        parser.add_argument(
+            '--max-batches',
+            type=int,
+            default=None,
+            help='Stop after this many batches (default: until nothing is left)',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.0,
+            help='Seconds to sleep between batches',
+        )
+
+    def handle(self, *args, **options):
+        archived = archive_dismissed_alerts(
+            older_than=timedelta(days=options['older_than_days']),
+            batch_size=options['batch_size'],
+            max_batches=options['max_batches'],
+            pause=options['pause'],
+        )
+
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} dismissed alerts'))
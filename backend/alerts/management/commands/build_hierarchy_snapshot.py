@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from alerts.snapshot import build_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Write the memory-mapped reporting graph snapshot that workers load on boot'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            '-o',
+            default=settings.HIERARCHY_SNAPSHOT_PATH,
+            help='Snapshot path (default: HIERARCHY_SNAPSHOT_PATH)',
+        )
+
+    def handle(self, *args, **options):
+        if not options['output']:
+            raise CommandError('HIERARCHY_SNAPSHOT_PATH is empty; pass --output')
+
+        info = build_snapshot(options['output'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {options['output']}: {info['employees']} employees, "
+            f"{info['cycle_members']} on reporting cycles, "
+            f"hierarchy v{info['version']}, {info['bytes']} bytes"
+        ))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from alerts.inbox import drifted_inboxes, repair_inbox, subtree_sizes
+
+
+class Command(BaseCommand):
+    help = 'Compare every manager inbox with the alerts table and report drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix',
+            action='store_true',
+            help='Rebuild stale or drifted inboxes, dropping those below the threshold',
+        )
+
+    def handle(self, *args, **options):
+        drifted = 0
+        sizes = None
+        for inbox, drift in drifted_inboxes():
+            drifted += 1
+            self.stdout.write(
+                f"{inbox.manager_id}: stale={drift['stale']}, "
+                f"missing={len(drift['missing'])} {drift['missing'][:10]}, "
+                f"extra={len(drift['extra'])} {drift['extra'][:10]}"
+            )
+            if options['fix']:
+                sizes = sizes if sizes is not None else subtree_sizes()
+                entries = repair_inbox(inbox.manager_id, sizes)
+                if entries is None:
+                    self.stdout.write(f"{inbox.manager_id}: dropped, below the threshold")
+                else:
+                    self.stdout.write(f"{inbox.manager_id}: rebuilt with {entries} entries")
+
+        if drifted and not options['fix']:
+            raise CommandError(f'{drifted} inboxes drifted; rerun with --fix')
+        self.stdout.write(self.style.SUCCESS(f'Checked inboxes: {drifted} drifted'))
@@ -0,0 +1,43 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from alerts.tasks import TASKS, enqueue
+
+
+class Command(BaseCommand):
+    help = 'Queue a background task for run_worker (e.g. from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', help=f"Task name: {', '.join(sorted(TASKS))}")
+        parser.add_argument(
+            '--kwargs',
+            default='{}',
+            help='Task arguments as a JSON object',
+        )
+        parser.add_argument(
+            '--delay',
+            type=float,
+            default=0.0,
+            help='Seconds before the task becomes due',
+        )
+        parser.add_argument(
+            '--no-dedupe',
+            action='store_true',
+            help='Queue even if an identical task is already pending',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            kwargs = json.loads(options['kwargs'])
+        except ValueError as e:
+            raise CommandError(f'--kwargs is not valid JSON: {str(e)}')
+        if not isinstance(kwargs, dict):
+            raise CommandError('--kwargs must be a JSON object')
+
+        try:
+            queued = enqueue(
+                options['name'], delay=options['delay'], dedupe=not options['no_dedupe'], **kwargs
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(f'Queued {queued}'))
@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from alerts.export import iter_csv, iter_export_rows
+from alerts.filters import InvalidFilter, alert_querysets, parse_alert_filters
+from alerts.models import Employee
+from alerts.utils import scope_subquery
+
+# Command options passed through to parse_alert_filters, as query params
+FILTER_OPTIONS = [
+    'scope',
+    'max_depth',
+    'severity',
+    'status',
+    'category',
+    'q',
+    'include_archived',
+    'created_after',
+    'created_before',
+]
+
+
+class Command(BaseCommand):
+    help = "Stream a manager's alerts as CSV (same filters as GET /api/alerts)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('manager_id', help='Manager employee ID')
+        parser.add_argument('--output', '-o', default='-', help='CSV file path (default: stdout)')
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=settings.ALERT_EXPORT_CHUNK_SIZE,
+            help='Rows fetched per cursor round trip',
+        )
+        for name in FILTER_OPTIONS:
+            parser.add_argument(f"--{name.replace('_', '-')}", dest=name)
+
+    def handle(self, *args, **options):
+        manager_id = options['manager_id']
+        if not Employee.objects.filter(id=manager_id).exists():
+            raise CommandError('manager not found')
+
+        params = {name: options[name] for name in FILTER_OPTIONS if options[name] is not None}
+        try:
+            filters = parse_alert_filters(params)
+        except InvalidFilter as e:
+            raise CommandError(str(e))
+
+        employees = scope_subquery(manager_id, filters['scope'], filters['max_depth'])
+        sources = alert_querysets(employees, filters)
+        chunks = iter_csv(iter_export_rows(sources, options['chunk_size']))
+
+        if options['output'] == '-':
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+
+        with open(options['output'], 'w', newline='', encoding='utf-8') as f:
+            for chunk in chunks:
+                f.write(chunk)
+        self.stderr.write(
+            self.style.SUCCESS(f"Exported alerts for {manager_id} to {options['output']}")
+        )
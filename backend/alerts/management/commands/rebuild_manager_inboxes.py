@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from alerts.inbox import rebuild_inboxes
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized open-alert inboxes of the largest managers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-subtree',
+            type=int,
+            default=settings.MANAGER_INBOX_MIN_SUBTREE,
+            help='Employees below a manager needed for an inbox (default: '
+                 'MANAGER_INBOX_MIN_SUBTREE; 0 removes every inbox)',
+        )
+        parser.add_argument(
+            '--manager',
+            action='append',
+            dest='managers',
+            help='Only rebuild this manager (repeatable); other inboxes are kept',
+        )
+
+    def handle(self, *args, **options):
+        result = rebuild_inboxes(options['min_subtree'], options['managers'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {len(result['built'])} inboxes "
+            f"({sum(result['built'].values())} entries), removed {result['removed']}"
+        ))
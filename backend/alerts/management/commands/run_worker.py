@@ -0,0 +1,58 @@
+import signal
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from alerts.tasks import Worker, task_stats
+
+
+class Command(BaseCommand):
+    help = 'Run queued background tasks (snapshot and inbox rebuilds, archival)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=settings.TASK_WORKER_THREADS,
+            help='Tasks run concurrently by this worker',
+        )
+        parser.add_argument(
+            '--poll',
+            type=float,
+            default=settings.TASK_POLL_SECONDS,
+            help='Seconds between queue checks when idle',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once no task is due instead of waiting for more',
+        )
+        parser.add_argument(
+            '--stats',
+            action='store_true',
+            help='Print task counts and timings and exit',
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            for name, entry in sorted(task_stats().items()):
+                timing = ''
+                if entry.get('avg_ms') is not None:
+                    timing = f", avg {entry['avg_ms']:.1f}ms, max {entry['max_ms']:.1f}ms"
+                self.stdout.write(
+                    f"{name}: {entry['pending']} pending, {entry['running']} running, "
+                    f"{entry['done']} done, {entry['failed']} failed{timing}"
+                )
+            return
+
+        worker = Worker(threads=options['threads'], poll_seconds=options['poll'])
+        # Finish running tasks on Ctrl-C / SIGTERM instead of abandoning them
+        previous = {
+            sig: signal.signal(sig, lambda *_: worker.stop())
+            for sig in (signal.SIGINT, signal.SIGTERM)
+        }
+        try:
+            processed = worker.run(once=options['once'])
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+
+        self.stdout.write(self.style.SUCCESS(f'Worker stopped after {processed} tasks'))
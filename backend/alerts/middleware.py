@@ -0,0 +1,247 @@
+import cProfile
+import logging
+import random
+import threading
+import time
+import zlib
+from contextlib import ExitStack
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from .profiling import QueryRecorder, rotate_profiles, write_profile
+from .routers import (
+    LAST_WRITE_COOKIE,
+    LAST_WRITE_HEADER,
+    last_write_stamp,
+    pin_to_primary,
+    replica_configured,
+    wrote_recently,
+)
+
+logger = logging.getLogger("alerts")
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional, gzip is always available
+    brotli = None
+
+
+def _accepted_encodings(header: str) -> set:
+    """Parse Accept-Encoding into the set of codings with a non-zero q-value."""
+    accepted = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding)
+    return accepted
+
+
+def _gzip_compressor(level: int):
+    # wbits=31 writes a gzip header/trailer around the deflate stream
+    return zlib.compressobj(level, zlib.DEFLATED, 31)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress responses with brotli (when installed) or gzip.
+    Like Django's GZipMiddleware, but with a configurable size threshold and
+    compression levels from settings.RESPONSE_COMPRESSION. Sets
+    Vary: Accept-Encoding so caches key on the client's encodings.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        config = settings.RESPONSE_COMPRESSION
+        self.min_size = config["MIN_SIZE"]
+        self.gzip_level = config["GZIP_LEVEL"]
+        self.brotli_quality = config["BROTLI_QUALITY"]
+
+    def process_response(self, request, response):
+        # It's not worth compressing short responses
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        # Avoid compressing twice
+        if response.has_header("Content-Encoding"):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        accepted = _accepted_encodings(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if brotli is not None and "br" in accepted:
+            encoding = "br"
+        elif "gzip" in accepted:
+            encoding = "gzip"
+        else:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                return response
+            response.streaming_content = self._compress_stream(
+                response.streaming_content, encoding
+            )
+            # Compressed size is unknown until the stream ends
+            del response.headers["Content-Length"]
+        else:
+            compressed = self._compress(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # A strong ETag no longer matches the encoded bytes (RFC 9110 8.8.1)
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+
+        return response
+
+    def _compress(self, content: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(content, quality=self.brotli_quality)
+        compressor = _gzip_compressor(self.gzip_level)
+        return compressor.compress(content) + compressor.flush()
+
+    def _compress_stream(self, chunks, encoding: str):
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=self.brotli_quality)
+            for chunk in chunks:
+                data = compressor.process(chunk) + compressor.flush()
+                if data:
+                    yield data
+            yield compressor.finish()
+            return
+
+        compressor = _gzip_compressor(self.gzip_level)
+        for chunk in chunks:
+            # Sync-flush so each chunk reaches the client as soon as it is produced
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+class ReplicaPinningMiddleware:
+    """
+    Read-your-writes for ReadReplicaRouter.
+    Requests that write (unsafe methods) read from the primary too. A
+    successful write stamps the response (cookie and LAST_WRITE_HEADER);
+    requests carrying a stamp younger than REPLICA_STICKY_SECONDS read from
+    the primary, so that client's refetch right after a dismiss never sees
+    the replica's stale "open" status, whichever worker serves it. Other
+    clients keep reading from the replica.
+    """
+
+    SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+    def __init__(self, get_response):
+        if not replica_configured():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        writes = request.method not in self.SAFE_METHODS
+
+        with pin_to_primary(writes or wrote_recently(request)):
+            response = self.get_response(request)
+
+        if writes and response.status_code < 400:
+            stamp = last_write_stamp()
+            response[LAST_WRITE_HEADER] = stamp
+            response.set_cookie(
+                LAST_WRITE_COOKIE, stamp, max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True, samesite="Lax",
+            )
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Profile selected views (PROFILING_VIEWS) with cProfile and record their
+    SQL, writing a .prof and a .txt summary to PROFILING_DIR.
+    A request is profiled when a staff user sends the PROFILING_HEADER
+    header, or at random with PROFILING_SAMPLE_RATE. With
+    PROFILING_ENABLED off the middleware removes itself at startup and
+    costs nothing. Keep it last in MIDDLEWARE: it runs the view itself.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.views = set(settings.PROFILING_VIEWS)
+        # One profile at a time per process; cProfile can't nest across threads
+        self._busy = threading.Lock()
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        if match is None or match.url_name not in self.views or not self._wanted(request):
+            return None
+        if not self._busy.acquire(blocking=False):
+            return None
+
+        try:
+            return self._profile(match.url_name, request, view_func, view_args, view_kwargs)
+        finally:
+            self._busy.release()
+
+    def _wanted(self, request) -> bool:
+        if request.META.get(settings.PROFILING_HEADER):
+            user = getattr(request, "user", None)
+            if user is not None and user.is_staff:
+                return True
+        rate = settings.PROFILING_SAMPLE_RATE
+        return rate > 0 and random.random() < rate
+
+    def _profile(self, view_name, request, view_func, view_args, view_kwargs):
+        profiler = cProfile.Profile()
+        with ExitStack() as stack:
+            captured = {alias: QueryRecorder() for alias in settings.DATABASES}
+            for alias, recorder in captured.items():
+                stack.enter_context(connections[alias].execute_wrapper(recorder))
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                response = view_func(request, *view_args, **view_kwargs)
+                # DRF responses render lazily; include the encoding in the profile
+                if hasattr(response, "render") and callable(response.render):
+                    response = response.render()
+            finally:
+                profiler.disable()
+            elapsed = time.perf_counter() - start
+
+        try:
+            directory = settings.PROFILING_DIR
+            profile_id = write_profile(
+                directory,
+                view_name,
+                profiler,
+                {alias: recorder.queries for alias, recorder in captured.items()},
+                request,
+                response,
+                elapsed,
+            )
+            rotate_profiles(directory, settings.PROFILING_MAX_BYTES)
+        except OSError as e:
+            logger.error(f"Profile not written: {str(e)}")
+            return response
+
+        response["X-Profile-Id"] = profile_id
+        logger.info(f"Profiled {view_name}: {profile_id} ({elapsed * 1000:.1f}ms)")
+        return response
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedAlert',
+            fields=[
+                ('id', models.CharField(max_length=10, primary_key=True, serialize=False)),
+                ('severity', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High')], max_length=10)),
+                ('category', models.CharField(max_length=50)),
+                ('created_at', models.DateTimeField()),
+                ('status', models.CharField(choices=[('open', 'Open'), ('dismissed', 'Dismissed')], default='dismissed', max_length=10)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'alerts_archive',
+                'ordering': ['-created_at', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['status', 'created_at'], name='alerts_status_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedalert',
+            name='employee',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_alerts', to='alerts.employee'),
+        ),
+    ]
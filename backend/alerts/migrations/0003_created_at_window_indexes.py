@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0002_archived_alert'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['employee', '-created_at'], name='alerts_employee_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedalert',
+            index=models.Index(fields=['employee', '-created_at'], name='archive_employee_created_idx'),
+        ),
+        migrations.AlterField(
+            model_name='alert',
+            name='employee',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to='alerts.employee'),
+        ),
+        migrations.AlterField(
+            model_name='archivedalert',
+            name='employee',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='archived_alerts', to='alerts.employee'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0003_created_at_window_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='alert',
+            index=models.Index(fields=['-created_at', 'id'], name='alerts_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedalert',
+            index=models.Index(fields=['-created_at', 'id'], name='archive_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['name'], name='employees_name_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:19
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0004_admin_changelist_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HierarchyVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.UUIDField(default=uuid.uuid4, editable=False)),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'hierarchy_version',
+            },
+        ),
+    ]
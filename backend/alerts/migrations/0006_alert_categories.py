@@ -0,0 +1,91 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def intern_categories(apps, schema_editor):
+    """Create one AlertCategory per distinct name and point every alert at it."""
+    # The database being migrated, not wherever the router sends reads
+    db = schema_editor.connection.alias
+    AlertCategory = apps.get_model('alerts', 'AlertCategory')
+    models_with_category = [apps.get_model('alerts', 'Alert'), apps.get_model('alerts', 'ArchivedAlert')]
+
+    names = set()
+    for model in models_with_category:
+        names.update(model.objects.using(db).order_by().values_list('category', flat=True).distinct())
+
+    for name in sorted(names):
+        category = AlertCategory.objects.using(db).create(name=name)
+        # One UPDATE per category (a handful), not per alert
+        for model in models_with_category:
+            model.objects.using(db).filter(category=name).update(category_ref=category)
+
+
+def restore_category_names(apps, schema_editor):
+    db = schema_editor.connection.alias
+    AlertCategory = apps.get_model('alerts', 'AlertCategory')
+    for category in AlertCategory.objects.using(db).all():
+        for model_name in ('Alert', 'ArchivedAlert'):
+            model = apps.get_model('alerts', model_name)
+            model.objects.using(db).filter(category_ref=category).update(category=category.name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0005_hierarchy_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertCategory',
+            fields=[
+                ('id', models.SmallAutoField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=50, unique=True)),
+            ],
+            options={
+                'db_table': 'alert_categories',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='alert',
+            name='category_ref',
+            field=models.ForeignKey(db_column='category_id', db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='alerts.alertcategory', verbose_name='category'),
+        ),
+        migrations.AddField(
+            model_name='archivedalert',
+            name='category_ref',
+            field=models.ForeignKey(db_column='category_id', db_index=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='alerts.alertcategory', verbose_name='category'),
+        ),
+        # Nullable before the copy, so unapplying can re-add the column empty
+        # and refill it before it becomes NOT NULL again
+        migrations.AlterField(
+            model_name='alert',
+            name='category',
+            field=models.CharField(max_length=50, null=True),
+        ),
+        migrations.AlterField(
+            model_name='archivedalert',
+            name='category',
+            field=models.CharField(max_length=50, null=True),
+        ),
+        migrations.RunPython(intern_categories, restore_category_names),
+        migrations.RemoveField(
+            model_name='alert',
+            name='category',
+        ),
+        migrations.RemoveField(
+            model_name='archivedalert',
+            name='category',
+        ),
+        migrations.AlterField(
+            model_name='alert',
+            name='category_ref',
+            field=models.ForeignKey(db_column='category_id', db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='alerts.alertcategory', verbose_name='category'),
+        ),
+        migrations.AlterField(
+            model_name='archivedalert',
+            name='category_ref',
+            field=models.ForeignKey(db_column='category_id', db_index=False, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='alerts.alertcategory', verbose_name='category'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0006_alert_categories'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ManagerInbox',
+            fields=[
+                ('manager', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='inbox', serialize=False, to='alerts.employee')),
+                ('subtree_size', models.IntegerField()),
+                ('hierarchy_token', models.UUIDField()),
+                ('hierarchy_version', models.BigIntegerField()),
+                ('built_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'manager_inboxes',
+            },
+        ),
+        migrations.CreateModel(
+            name='InboxEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('alert', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_entries', to='alerts.alert')),
+                ('manager', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='alerts.managerinbox')),
+            ],
+            options={
+                'db_table': 'manager_inbox_entries',
+                'indexes': [models.Index(fields=['manager', '-created_at', 'alert'], name='inbox_manager_created_idx')],
+                'constraints': [models.UniqueConstraint(fields=('manager', 'alert'), name='inbox_entry_unique')],
+            },
+        ),
+    ]
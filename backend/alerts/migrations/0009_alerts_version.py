@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('alerts', '0008_tasks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AlertsVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'alerts_version',
+            },
+        ),
+    ]
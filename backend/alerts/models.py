@@ -1,4 +1,44 @@
-from django.db import models
+import uuid
+from django.db import models, router, transaction
+from django.dispatch import Signal
+
+# Sent (sender=Employee) whenever the reporting graph may have changed:
+# creates, deletes and reports_to edits, including bulk ones. alerts.signals
+# bumps the hierarchy version on it.
+hierarchy_changed = Signal()
+
+HIERARCHY_FIELDS = {'reports_to', 'reports_to_id'}
+
+# Sent (sender=Alert) inside the transaction of a bulk write that skips
+# post_save: with objs (bulk_create, every value written as given) or
+# alert_ids (rows to re-read). alerts.signals treats it like Alert.save().
+alerts_written = Signal()
+
+
+class EmployeeQuerySet(models.QuerySet):
+    """
+    Bulk writes send no post_save, so the ones that can move the reporting
+    graph send hierarchy_changed themselves.
+    """
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        if rows and HIERARCHY_FIELDS & kwargs.keys():
+            hierarchy_changed.send(sender=self.model)
+        return rows
+
+    def bulk_create(self, objs, *args, **kwargs):
+        created = super().bulk_create(objs, *args, **kwargs)
+        if created:
+            hierarchy_changed.send(sender=self.model)
+        return created
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        if rows and HIERARCHY_FIELDS & set(fields):
+            hierarchy_changed.send(sender=self.model)
+        return rows
+
 
 class Employee(models.Model):
     id = models.CharField(max_length=10, primary_key=True)
@@ -13,12 +53,136 @@ class Employee(models.Model):
 
     class Meta:
         db_table = 'employees'
+        indexes = [
+            # Prefix search (name__startswith) in the admin and its autocomplete;
+            # the opclass makes LIKE 'x%' indexable on PostgreSQL
+            models.Index(fields=['name'], name='employees_name_idx', opclasses=['varchar_pattern_ops']),
+        ]
+
+    objects = EmployeeQuerySet.as_manager()
 
     def __str__(self):
         return f"{self.id} - {self.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored manager so save() can tell a reparent from a rename
+        if 'reports_to_id' in instance.__dict__:
+            instance._stored_reports_to_id = instance.reports_to_id
+        return instance
+
+    def reports_to_changed(self) -> bool:
+        """Whether reports_to differs from the stored row (True when unknown)."""
+        stored = self.__dict__.get('_stored_reports_to_id', models.NOT_PROVIDED)
+        return stored is models.NOT_PROVIDED or stored != self.reports_to_id
+
+
+class AlertCategory(models.Model):
+    """
+    Interned alert category names. Alerts store the small integer code;
+    rows are never renamed or deleted, so code -> name is cached per
+    process (see alerts.categories).
+    """
+
+    id = models.SmallAutoField(primary_key=True)
+    name = models.CharField(max_length=50, unique=True)
+
+    class Meta:
+        db_table = 'alert_categories'
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
+def resolve_categories(objs):
+    """
+    Turn the category names assigned to objs (see CategoryMixin) into
+    category_ref_id codes, creating unknown AlertCategory rows. Call it in
+    the transaction that writes objs, so the new rows commit with them.
+    """
+    from .categories import category_codes
+
+    pending = [obj for obj in objs if obj.__dict__.get('_category', (0, None))[0] is None]
+    if not pending:
+        return
+    codes = category_codes({obj._category[1] for obj in pending}, create=True)
+    for obj in pending:
+        name = obj._category[1]
+        obj.category_ref_id = codes[name]
+        obj._category = (codes[name], name)
+
+
+class CategoryQuerySet(models.QuerySet):
+    def _write_db(self):
+        # self.db is the read alias until Django's own write method runs
+        return self._db or router.db_for_write(self.model, **self._hints)
 
-class Alert(models.Model):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        with transaction.atomic(using=self._write_db(), savepoint=False):
+            resolve_categories(objs)
+            return super().bulk_create(objs, *args, **kwargs)
+
+
+class AlertQuerySet(CategoryQuerySet):
+    """
+    Bulk writes send no post_save, so they send alerts_written: manager
+    inboxes and columnar copies follow them as they follow Alert.save().
+    """
+
+    def bulk_create(self, objs, *args, ignore_conflicts=False, **kwargs):
+        using = self._write_db()
+        with transaction.atomic(using=using, savepoint=False):
+            created = super().bulk_create(objs, *args, ignore_conflicts=ignore_conflicts, **kwargs)
+            if created and ignore_conflicts:
+                # Conflicting rows kept their stored values
+                ids = [obj.pk for obj in created]
+                alerts_written.send(sender=self.model, alert_ids=ids, using=using)
+            elif created:
+                alerts_written.send(sender=self.model, objs=created, using=using)
+        return created
+
+    def update(self, **kwargs):
+        using = self._write_db()
+        with transaction.atomic(using=using, savepoint=False):
+            ids = list(self.using(using).values_list('id', flat=True))
+            rows = super().update(**kwargs)
+            if rows:
+                alerts_written.send(sender=self.model, alert_ids=ids, using=using)
+        return rows
+
+
+class CategoryMixin:
+    """
+    ``category`` as the name string, read from the cached code -> name map
+    (no join). Assigning a name only records it; save() and bulk_create()
+    resolve it to a code inside their write transaction.
+    """
+
+    @property
+    def category(self):
+        from .categories import category_name
+
+        code, name = self.__dict__.get('_category', (0, None))
+        if name is not None and code in (None, self.category_ref_id):
+            return name
+        return category_name(self.category_ref_id)
+
+    @category.setter
+    def category(self, name):
+        # (code, name); the code is None until resolve_categories()
+        self._category = (None, name)
+
+    def save(self, *args, using=None, **kwargs):
+        using = using or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using, savepoint=False):
+            resolve_categories([self])
+            super().save(*args, using=using, **kwargs)
+
+
+class Alert(CategoryMixin, models.Model):
     SEVERITY_CHOICES = [
         ('low', 'Low'),
         ('medium', 'Medium'),
@@ -31,15 +195,181 @@ class Alert(models.Model):
     ]
 
     id = models.CharField(max_length=10, primary_key=True)
-    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='alerts')
+    # Indexed by alerts_employee_created_idx below
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='alerts', db_index=False)
     severity = models.CharField(max_length=10, choices=SEVERITY_CHOICES)
-    category = models.CharField(max_length=50)
+    # Category filters always come with an employee scope, so no index of its own
+    category_ref = models.ForeignKey(
+        AlertCategory, on_delete=models.PROTECT, db_column='category_id', related_name='+', db_index=False,
+        verbose_name='category',
+    )
     created_at = models.DateTimeField()
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='open')
 
+    objects = AlertQuerySet.as_manager()
+
     class Meta:
         db_table = 'alerts'
         ordering = ['-created_at', 'id']
+        indexes = [
+            # Range scans on created_at within each employee, already in sort order
+            models.Index(fields=['employee', '-created_at'], name='alerts_employee_created_idx'),
+            # Lets archive_alerts find old dismissed alerts without a full scan
+            models.Index(fields=['status', 'created_at'], name='alerts_status_created_idx'),
+            # Unfiltered admin changelist: first page in Meta.ordering without a sort
+            models.Index(fields=['-created_at', 'id'], name='alerts_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.id} - {self.employee.name} ({self.severity})"
+
+
+class ArchivedAlert(CategoryMixin, models.Model):
+    """Dismissed alert moved out of the hot alerts table by archive_alerts."""
+
+    id = models.CharField(max_length=10, primary_key=True)
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name='archived_alerts', db_index=False)
+    severity = models.CharField(max_length=10, choices=Alert.SEVERITY_CHOICES)
+    category_ref = models.ForeignKey(
+        AlertCategory, on_delete=models.PROTECT, db_column='category_id', related_name='+', db_index=False,
+        verbose_name='category',
+    )
+    created_at = models.DateTimeField()
+    status = models.CharField(max_length=10, choices=Alert.STATUS_CHOICES, default='dismissed')
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    objects = CategoryQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'alerts_archive'
+        ordering = ['-created_at', 'id']
+        indexes = [
+            models.Index(fields=['employee', '-created_at'], name='archive_employee_created_idx'),
+            models.Index(fields=['-created_at', 'id'], name='archive_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.id} - {self.employee.name} ({self.severity}, archived)"
+
+
+class HierarchyVersion(models.Model):
+    """
+    Single row stamping the reporting graph: version is bumped on every
+    Employee save/delete (see alerts.signals), token identifies the
+    database. Hierarchy snapshots record both to detect staleness.
+    """
+
+    token = models.UUIDField(default=uuid.uuid4, editable=False)
+    version = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'hierarchy_version'
+
+    def __str__(self):
+        return f"hierarchy v{self.version}"
+
+
+class AlertsVersion(models.Model):
+    """
+    Single row counting writes to the alerts table (and to employee names).
+    Each process's columnar copy (see alerts.columnar) compares it on every
+    request and reloads when another process has written.
+    """
+
+    version = models.BigIntegerField(default=0)
+
+    class Meta:
+        db_table = 'alerts_version'
+
+    def __str__(self):
+        return f"alerts v{self.version}"
+
+
+class ManagerInbox(models.Model):
+    """
+    A manager whose open subtree alerts are materialized as InboxEntry rows
+    (see alerts.inbox). Only read while the hierarchy stamp it was built
+    against is still current.
+    """
+
+    manager = models.OneToOneField(Employee, on_delete=models.CASCADE, primary_key=True, related_name='inbox')
+    subtree_size = models.IntegerField()
+    hierarchy_token = models.UUIDField()
+    hierarchy_version = models.BigIntegerField()
+    built_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'manager_inboxes'
+
+    def __str__(self):
+        return f"inbox {self.manager_id} (v{self.hierarchy_version})"
+
+
+class InboxEntry(models.Model):
+    """Pointer from a manager's inbox to one open alert in their subtree."""
+
+    # Indexed by inbox_manager_created_idx below
+    manager = models.ForeignKey(ManagerInbox, on_delete=models.CASCADE, related_name='entries', db_index=False)
+    alert = models.ForeignKey(Alert, on_delete=models.CASCADE, related_name='inbox_entries')
+    # Copy of alert.created_at, so a page is read in order from the index
+    created_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'manager_inbox_entries'
+        constraints = [
+            models.UniqueConstraint(fields=['manager', 'alert'], name='inbox_entry_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['manager', '-created_at', 'alert'], name='inbox_manager_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.manager_id} -> {self.alert_id}"
+
+
+class Task(models.Model):
+    """
+    One queued background job (see alerts.tasks), run by `manage.py
+    run_worker`. At most one pending task per dedupe_key.
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    name = models.CharField(max_length=100)
+    kwargs = models.JSONField(default=dict, blank=True)
+    dedupe_key = models.CharField(max_length=200, null=True, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+    run_after = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Refreshed by the worker while the task runs (see requeue_stale_tasks)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Wall time of the last attempt
+    duration_ms = models.FloatField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        db_table = 'tasks'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dedupe_key'],
+                condition=models.Q(status='pending'),
+                name='task_pending_dedupe',
+            ),
+        ]
+        indexes = [
+            # Claim query: oldest due pending task
+            models.Index(fields=['status', 'run_after', 'id'], name='task_claim_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.id} - {self.employee.name} ({self.severity})"
\ No newline at end of file
+        return f"{self.name} #{self.pk} ({self.status})"
@@ -0,0 +1,95 @@
+import io
+import os
+import pstats
+import time
+import uuid
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+from typing import Dict, List
+
+# Functions listed in each summary, by cumulative time
+SUMMARY_FUNCTIONS = 40
+
+
+class QueryRecorder:
+    """
+    connection.execute_wrapper() hook recording every statement as
+    {"sql", "time"} (seconds), the shape of connection.queries, without
+    needing DEBUG or the debug cursor.
+    """
+
+    def __init__(self):
+        self.queries: List[dict] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            if not many:
+                # With the parameters filled in, as the database saw them
+                sql = context["connection"].ops.last_executed_query(context["cursor"], sql, params)
+            self.queries.append({"sql": sql, "time": f"{elapsed:.6f}"})
+
+
+def write_profile(
+    directory: Path,
+    view_name: str,
+    profiler,
+    queries: Dict[str, List[dict]],
+    request,
+    response,
+    elapsed: float,
+) -> str:
+    """
+    Write <id>.prof (pstats data, open with snakeviz or `python -m pstats`)
+    and <id>.txt (request, SQL and hottest functions) into directory.
+    Args:
+        queries: captured queries per database alias
+    Returns:
+        The profile id (file stem)
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now(dt_timezone.utc).strftime("%Y%m%dT%H%M%S")
+    profile_id = f"{stamp}-{view_name}-{uuid.uuid4().hex[:8]}"
+
+    profiler.dump_stats(directory / f"{profile_id}.prof")
+
+    total_queries = sum(len(captured) for captured in queries.values())
+    sql_seconds = sum(float(q["time"]) for captured in queries.values() for q in captured)
+
+    summary = io.StringIO()
+    summary.write(f"{request.method} {request.get_full_path()}\n")
+    summary.write(f"status={response.status_code} elapsed_ms={elapsed * 1000:.1f}\n")
+    summary.write(f"queries={total_queries} sql_ms={sql_seconds * 1000:.1f}\n\n")
+
+    for alias, captured in queries.items():
+        for q in captured:
+            summary.write(f"[{alias}] {float(q['time']) * 1000:.2f}ms  {q['sql']}\n")
+    summary.write("\n")
+
+    stats = pstats.Stats(profiler, stream=summary)
+    stats.sort_stats("cumulative").print_stats(SUMMARY_FUNCTIONS)
+
+    (directory / f"{profile_id}.txt").write_text(summary.getvalue(), encoding="utf-8")
+    return profile_id
+
+
+def rotate_profiles(directory: Path, max_bytes: int):
+    """Delete the oldest profile files until the directory fits in max_bytes."""
+    files = []
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.name.endswith((".prof", ".txt")):
+            stat = entry.stat()
+            files.append((stat.st_mtime, entry.name, stat.st_size))
+
+    total = sum(size for _, _, size in files)
+    for _, name, size in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(directory / name)
+        except FileNotFoundError:  # Removed by another worker
+            pass
+        total -= size
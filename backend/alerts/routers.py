@@ -0,0 +1,79 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from django.conf import settings
+
+REPLICA_ALIAS = "replica"
+PRIMARY_ALIAS = "default"
+
+# Time of the client's last successful write (epoch seconds). Set on the
+# response to every write; sent back as a cookie by browsers on the same
+# site, or echoed in the request header by cross-origin API clients.
+LAST_WRITE_COOKIE = "alerts_last_write"
+LAST_WRITE_HEADER = "X-Alerts-Last-Write"
+
+_pinned = ContextVar("alerts_pinned_to_primary", default=False)
+
+
+def replica_configured() -> bool:
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def last_write_stamp(now: Optional[float] = None) -> str:
+    return f"{time.time() if now is None else now:.3f}"
+
+
+def wrote_recently(request, now: Optional[float] = None) -> bool:
+    """
+    Whether this client wrote within REPLICA_STICKY_SECONDS, judged by the
+    stamp it sent back. Per client, so one writer never pins other readers;
+    a forged stamp can only pin the sender's own reads to the primary.
+    """
+    value = request.headers.get(LAST_WRITE_HEADER) or request.COOKIES.get(LAST_WRITE_COOKIE)
+    try:
+        wrote_at = float(value)
+    except (TypeError, ValueError):
+        return False
+    age = (time.time() if now is None else now) - wrote_at
+    # Small negative ages: clock skew between workers
+    return -1.0 <= age < settings.REPLICA_STICKY_SECONDS
+
+
+def pinned_to_primary() -> bool:
+    return _pinned.get()
+
+
+@contextmanager
+def pin_to_primary(pinned: bool = True):
+    """Route reads in this block (this thread/task only) to the primary."""
+    token = _pinned.set(pinned)
+    try:
+        yield
+    finally:
+        _pinned.reset(token)
+
+
+class ReadReplicaRouter:
+    """
+    Send reads to the "replica" alias and writes to "default".
+    Without a replica alias every query goes to "default". Reads are pinned
+    to the primary while ReplicaPinningMiddleware says so (write requests,
+    and any request shortly after a write) for read-your-writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not replica_configured() or _pinned.get():
+            return PRIMARY_ALIAS
+        return REPLICA_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica is populated by replication (or copying the file)
+        return db != REPLICA_ALIAS
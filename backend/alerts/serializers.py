@@ -1,5 +1,9 @@
 from rest_framework import serializers
 from .models import Employee, Alert
+from .archive import merge_alert_streams
+from .categories import category_name, with_category_code
+
+ALERT_FIELDS = ["id", "employee", "severity", "category", "created_at", "status"]
 
 
 class EmployeeSerializer(serializers.ModelSerializer):
@@ -11,10 +15,126 @@ class EmployeeSerializer(serializers.ModelSerializer):
 
 
 class AlertSerializer(serializers.ModelSerializer):
-    """Alert serializer with nested employee."""
+    """Alert serializer with nested employee.
+
+    Pass ``fields=[...]`` to render a sparse fieldset, and a
+    ``{"distances": {employee_id: distance}}`` context to add ``distance``.
+    """
 
     employee = EmployeeSerializer(read_only=True)
 
     class Meta:
         model = Alert
-        fields = ["id", "employee", "severity", "category", "created_at", "status"]
+        fields = ALERT_FIELDS
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop("fields", None)
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+        if self.context.get("distances") is not None:
+            self.fields["distance"] = serializers.SerializerMethodField()
+
+    def get_distance(self, alert):
+        return self.context["distances"].get(alert.employee_id)
+
+
+def serialize_alerts_normalized(alerts, fields=None, distances=None):
+    """
+    Normalized alert payload: alerts reference ``employee_id`` and each
+    employee appears once in the ``employees`` map.
+    Reads plain rows with .values() instead of building model instances, so
+    per-employee work happens once per distinct employee, not once per alert.
+    Args:
+        alerts: Alert queryset, or a list of ordered querysets to merge
+                (e.g. hot and archived alerts)
+        fields: optional sparse fieldset from ALERT_FIELDS
+        distances: optional {employee_id: distance}, added to each alert
+    Returns:
+        {"alerts": [...], "employees": {employee_id: {"id", "name"}}}
+    """
+    querysets = alerts if isinstance(alerts, (list, tuple)) else [alerts]
+    fields = fields or ALERT_FIELDS
+    include_employee = "employee" in fields
+    columns = ["employee_id" if f == "employee" else f for f in fields]
+    if include_employee:
+        columns.append("employee__name")
+
+    # Merging needs the sort key on every row, and distance the employee,
+    # even when not requested
+    extra_columns = []
+    if len(querysets) > 1:
+        extra_columns = [c for c in ("created_at", "id") if c not in columns]
+    if distances is not None and "employee_id" not in columns:
+        extra_columns.append("employee_id")
+
+    # category comes back as its code, mapped from the cached table below
+    include_category = "category" in columns
+    if include_category:
+        querysets = [with_category_code(qs) for qs in querysets]
+
+    rows = merge_alert_streams(*(qs.values(*columns, *extra_columns) for qs in querysets))
+
+    employees = {}
+    result = []
+    for row in rows:
+        if distances is not None:
+            row["distance"] = distances.get(row["employee_id"])
+        for column in extra_columns:
+            del row[column]
+        if include_category:
+            row["category"] = category_name(row["category"])
+        if include_employee:
+            name = row.pop("employee__name")
+            if row["employee_id"] not in employees:
+                employees[row["employee_id"]] = {"id": row["employee_id"], "name": name}
+        result.append(row)
+
+    return {"alerts": result, "employees": employees}
+
+
+_created_at_field = serializers.DateTimeField()
+
+
+def serialize_alert_rows(rows, fields=None, distances=None, shape="nested"):
+    """
+    Same payloads as AlertSerializer (nested) or serialize_alerts_normalized,
+    built from .values()-style dicts that already hold every ALERT_FIELDS
+    column plus employee__name (e.g. from the columnar alert copy).
+    """
+    fields = fields or ALERT_FIELDS
+
+    if shape == "normalized":
+        columns = ["employee_id" if f == "employee" else f for f in fields]
+        employees = {}
+        result = []
+        for row in rows:
+            alert = {column: row[column] for column in columns}
+            if distances is not None:
+                alert["distance"] = distances.get(row["employee_id"])
+            if "employee" in fields and row["employee_id"] not in employees:
+                employees[row["employee_id"]] = {
+                    "id": row["employee_id"], "name": row["employee__name"]
+                }
+            result.append(alert)
+        return {"alerts": result, "employees": employees}
+
+    # Nested: ALERT_FIELDS order, as the serializer keeps it for sparse fieldsets
+    fields = [f for f in ALERT_FIELDS if f in fields]
+    result = []
+    for row in rows:
+        alert = {}
+        for field in fields:
+            if field == "employee":
+                alert["employee"] = {"id": row["employee_id"], "name": row["employee__name"]}
+            elif field == "created_at":
+                alert["created_at"] = _created_at_field.to_representation(row["created_at"])
+            else:
+                alert[field] = row[field]
+        if distances is not None:
+            alert["distance"] = distances.get(row["employee_id"])
+        result.append(alert)
+    return result
@@ -0,0 +1,85 @@
+from itertools import islice
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .categories import category_name, with_category_code
+from .columnar import ROW_FIELDS, alert_columns, bump_alerts_version
+from .inbox import sync_inbox_entries
+from .models import HIERARCHY_FIELDS, Alert, Employee, alerts_written, hierarchy_changed
+from .snapshot import bump_hierarchy_version
+from .tasks import enqueue_hierarchy_rebuilds
+
+# Alerts fanned out (and re-read) per query after a bulk write
+BULK_CHUNK_SIZE = 500
+
+
+@receiver(hierarchy_changed, sender=Employee, dispatch_uid="alerts_hierarchy_changed")
+def reporting_graph_changed(sender, **kwargs):
+    """Invalidate snapshots and inboxes, and queue their rebuild."""
+    bump_hierarchy_version()
+    enqueue_hierarchy_rebuilds()
+
+
+@receiver(post_save, sender=Employee, dispatch_uid="alerts_employee_saved")
+def employee_saved(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Only new employees and reparents move the reporting graph. A rename
+    leaves snapshots and inboxes valid; only the columnar copies hold names.
+    """
+    reparented = (update_fields is None or HIERARCHY_FIELDS & set(update_fields)) and (
+        instance.reports_to_changed()
+    )
+    if created or reparented:
+        hierarchy_changed.send(sender=Employee)
+    else:
+        bump_alerts_version()
+    instance._stored_reports_to_id = instance.reports_to_id
+
+
+@receiver(post_delete, sender=Employee, dispatch_uid="alerts_employee_deleted")
+def employee_deleted(sender, **kwargs):
+    hierarchy_changed.send(sender=Employee)
+
+
+def _row(alert: Alert):
+    row = {field: getattr(alert, field) for field in ROW_FIELDS}
+    # created_at may still be the string it was assigned
+    row["created_at"] = Alert._meta.get_field("created_at").to_python(row["created_at"])
+    return row
+
+
+def _read_rows(alert_ids, using):
+    alerts = Alert.objects.using(using).filter(id__in=alert_ids)
+    rows = with_category_code(alerts).values(*ROW_FIELDS)
+    return [{**row, "category": category_name(row["category"])} for row in rows]
+
+
+@receiver(post_save, sender=Alert, dispatch_uid="alerts_alert_saved")
+def alert_saved(sender, instance, **kwargs):
+    """
+    Keep derived copies in step with Alert.save() (e.g. dismiss): manager
+    inboxes in the same transaction, this process's columnar copy on commit.
+    """
+    row = _row(instance)
+    sync_inbox_entries([row])
+    version = bump_alerts_version()
+    if alert_columns.loaded:
+        transaction.on_commit(lambda: alert_columns.upsert([row], version))
+
+
+@receiver(alerts_written, sender=Alert, dispatch_uid="alerts_alerts_written")
+def alerts_bulk_written(sender, using, objs=None, alert_ids=None, **kwargs):
+    """alert_saved for AlertQuerySet's bulk writes, BULK_CHUNK_SIZE alerts at a time."""
+    if settings.MANAGER_INBOX_MIN_SUBTREE <= 0 and not settings.ALERTS_COLUMNAR:
+        return  # Nothing derived to keep in step
+    written = iter(objs if objs is not None else alert_ids)
+    rows = []
+    while chunk := list(islice(written, BULK_CHUNK_SIZE)):
+        chunk_rows = [_row(obj) for obj in chunk] if objs is not None else _read_rows(chunk, using)
+        sync_inbox_entries(chunk_rows)
+        rows.extend(chunk_rows)
+
+    version = bump_alerts_version()
+    if alert_columns.loaded:
+        transaction.on_commit(lambda: alert_columns.upsert(rows, version), using=using)
@@ -0,0 +1,309 @@
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import uuid
+from array import array
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from .models import Employee, HierarchyVersion
+
+logger = logging.getLogger("alerts")
+
+HIERARCHY_ROW = 1
+
+MAGIC = b"ALHSNAP1"
+FORMAT_VERSION = 1
+# magic, format, employee count, hierarchy version, database token, then the
+# byte offsets of id_offsets, id_blob, parent, child_offsets, children,
+# cycle, and the id_blob length
+HEADER = struct.Struct("<8sIIQ16s7Q")
+ALIGN = 8
+
+
+def hierarchy_stamp() -> Optional[Tuple[uuid.UUID, int]]:
+    """(token, version) of the reporting graph, or None before the first stamp."""
+    return HierarchyVersion.objects.filter(pk=HIERARCHY_ROW).values_list(
+        "token", "version"
+    ).first()
+
+
+def bump_hierarchy_version():
+    """
+    Record a change to the reporting graph. Called on hierarchy_changed
+    (see alerts.signals), which Employee creates, deletes, reparents and
+    EmployeeQuerySet's bulk writes send. Raw SQL must call it itself.
+    """
+    if not HierarchyVersion.objects.filter(pk=HIERARCHY_ROW).update(version=F("version") + 1):
+        HierarchyVersion.objects.get_or_create(pk=HIERARCHY_ROW, defaults={"version": 1})
+
+
+def ensure_hierarchy_stamp() -> Tuple[uuid.UUID, int]:
+    """hierarchy_stamp(), creating the row on first use."""
+    row, _ = HierarchyVersion.objects.get_or_create(pk=HIERARCHY_ROW)
+    return row.token, row.version
+
+
+def build_snapshot(path: Path) -> Dict[str, int]:
+    """
+    Write the reporting graph to path as a snapshot (atomically replaced).
+    Layout after the header, each section 8-byte aligned, little-endian:
+        id_offsets  u32[n+1]  byte ranges of the sorted IDs in id_blob
+        id_blob     utf-8     employee IDs in sorted order; index = position
+        parent      i32[n]    parent index, -1 for none
+        child_offsets u32[n+1], children u32[m]  children of i (CSR)
+        cycle       u8[n]     1 if the employee is on a reporting cycle
+    Returns:
+        {"employees", "cycle_members", "version", "bytes"}
+    """
+    with transaction.atomic():
+        # Stamp first: a change racing the read leaves the snapshot stale, never wrong
+        token, version = ensure_hierarchy_stamp()
+        rows = sorted(Employee.objects.order_by().values_list("id", "reports_to_id"))
+
+    ids = [employee_id for employee_id, _ in rows]
+    index = {employee_id: i for i, employee_id in enumerate(ids)}
+    count = len(ids)
+
+    parent = array("i", (index.get(p, -1) if p is not None else -1 for _, p in rows))
+
+    child_offsets = array("I", [0]) * (count + 1)
+    for p in parent:
+        if p >= 0:
+            child_offsets[p + 1] += 1
+    for i in range(count):
+        child_offsets[i + 1] += child_offsets[i]
+    children = array("I", [0]) * child_offsets[count]
+    fill = array("I", child_offsets)
+    for i, p in enumerate(parent):
+        if p >= 0:
+            children[fill[p]] = i
+            fill[p] += 1
+
+    cycle = _cycle_members(parent)
+
+    encoded = [employee_id.encode("utf-8") for employee_id in ids]
+    id_offsets = array("I", [0]) * (count + 1)
+    for i, raw in enumerate(encoded):
+        id_offsets[i + 1] = id_offsets[i] + len(raw)
+    id_blob = b"".join(encoded)
+
+    if sys.byteorder != "little":  # pragma: no cover - the format is little-endian
+        for arr in (id_offsets, parent, child_offsets, children):
+            arr.byteswap()
+
+    sections = [id_offsets.tobytes(), id_blob, parent.tobytes(), child_offsets.tobytes(),
+                children.tobytes(), bytes(cycle)]
+    offsets = []
+    position = HEADER.size
+    for section in sections:
+        position += -position % ALIGN
+        offsets.append(position)
+        position += len(section)
+
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, count, version, token.bytes, *offsets, len(id_blob))
+
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        for offset, section in zip(offsets, sections):
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(section)
+        f.flush()
+        os.fsync(f.fileno())
+    # Workers that mapped the old file keep reading it until they reload
+    os.replace(tmp_path, path)
+
+    return {
+        "employees": count,
+        "cycle_members": sum(cycle),
+        "version": version,
+        "bytes": position,
+    }
+
+
+def _cycle_members(parent: array) -> bytearray:
+    """Mark nodes on a cycle of the parent-pointer graph in O(n)."""
+    count = len(parent)
+    cycle = bytearray(count)
+    state = bytearray(count)  # 0 unvisited, 1 on the current path, 2 done
+    for start in range(count):
+        if state[start]:
+            continue
+        path: List[int] = []
+        node = start
+        while node >= 0 and state[node] == 0:
+            state[node] = 1
+            path.append(node)
+            node = parent[node]
+        if node >= 0 and state[node] == 1:
+            # Walked back into this path: node and everything after it loop
+            for member in path[path.index(node):]:
+                cycle[member] = 1
+        for member in path:
+            state[member] = 2
+    return cycle
+
+
+class HierarchySnapshot:
+    """
+    Read-only, memory-mapped view of a snapshot file. Pages come from the
+    OS page cache, so every worker on a host shares one copy.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self.inode = os.fstat(f.fileno()).st_ino
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, fmt, count, version, token, o_ids, o_blob, o_parent,
+         o_child_offsets, o_children, o_cycle, blob_len) = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            self._mmap.close()
+            raise ValueError(f"{self.path} is not a hierarchy snapshot")
+
+        self.count = count
+        self.version = version
+        self.token = uuid.UUID(bytes=token)
+
+        buf = memoryview(self._mmap)
+        self._id_offsets = buf[o_ids:o_ids + 4 * (count + 1)].cast("I")
+        self._id_blob = buf[o_blob:o_blob + blob_len]
+        self._parent = buf[o_parent:o_parent + 4 * count].cast("i")
+        self._child_offsets = buf[o_child_offsets:o_child_offsets + 4 * (count + 1)].cast("I")
+        edges = self._child_offsets[count] if count else 0
+        self._children = buf[o_children:o_children + 4 * edges].cast("I")
+        self._cycle = buf[o_cycle:o_cycle + count]
+
+    def close(self):
+        for view in (self._id_offsets, self._id_blob, self._parent, self._child_offsets,
+                     self._children, self._cycle):
+            view.release()
+        self._mmap.close()
+
+    def matches(self, stamp: Optional[Tuple[uuid.UUID, int]]) -> bool:
+        return stamp is not None and stamp == (self.token, self.version)
+
+    def id_at(self, i: int) -> str:
+        return str(self._id_blob[self._id_offsets[i]:self._id_offsets[i + 1]], "utf-8")
+
+    def index_of(self, employee_id: str) -> Optional[int]:
+        """Binary search over the sorted IDs."""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.id_at(mid) < employee_id:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self.id_at(lo) == employee_id:
+            return lo
+        return None
+
+    def parent(self, i: int) -> int:
+        return self._parent[i]
+
+    def children(self, i: int):
+        return self._children[self._child_offsets[i]:self._child_offsets[i + 1]]
+
+    def on_cycle(self, i: int) -> bool:
+        return bool(self._cycle[i])
+
+    def distances(
+        self, manager_id: str, scope: str, max_depth: Optional[int] = None
+    ) -> Dict[int, int]:
+        """
+        Same walk as utils._walk over snapshot indexes: employee index ->
+        distance below manager_id, cycle-safe, manager excluded.
+        """
+        root = self.index_of(manager_id)
+        if root is None:
+            return {}
+        if scope == "direct":
+            max_depth = 1
+        elif scope == "subtree":
+            max_depth = None
+
+        distances: Dict[int, int] = {}
+        visited: Set[int] = {root}
+        level = [root]
+        depth = 0
+        while level and (max_depth is None or depth < max_depth):
+            depth += 1
+            next_level = []
+            for current in level:
+                for report in self.children(current):
+                    if report not in visited:
+                        visited.add(report)
+                        distances[report] = depth
+                        next_level.append(report)
+            level = next_level
+        return distances
+
+    def subtree(self, manager_id: str, scope: str, max_depth: Optional[int] = None) -> Set[str]:
+        """get_employee_subtree(manager_id, scope, max_depth), from the snapshot."""
+        return {self.id_at(i) for i in self.distances(manager_id, scope, max_depth)}
+
+
+_lock = threading.Lock()
+_loaded: Optional[HierarchySnapshot] = None
+_warned_version: Optional[int] = None
+
+
+def load_snapshot() -> Optional[HierarchySnapshot]:
+    """
+    The process's mapped snapshot at HIERARCHY_SNAPSHOT_PATH, or None if
+    there is none. Re-mapped when the file has been replaced by a rebuild.
+    No database access, so it is safe to call from AppConfig.ready().
+    """
+    global _loaded
+    path = settings.HIERARCHY_SNAPSHOT_PATH
+    if not path:
+        return None
+    try:
+        inode = os.stat(path).st_ino
+    except FileNotFoundError:
+        return None
+
+    with _lock:
+        if _loaded is None or _loaded.path != Path(path) or _loaded.inode != inode:
+            try:
+                snapshot = HierarchySnapshot(path)
+            except (OSError, ValueError, struct.error) as e:
+                logger.error(f"Hierarchy snapshot not loaded: {str(e)}")
+                return None
+            # The old mapping is left to the GC: views handed out may still use it
+            _loaded = snapshot
+        return _loaded
+
+
+def fresh_snapshot() -> Optional[HierarchySnapshot]:
+    """The mapped snapshot if it matches the database's hierarchy stamp (one query)."""
+    global _warned_version
+    snapshot = load_snapshot()
+    if snapshot is None:
+        return None
+    if snapshot.matches(hierarchy_stamp()):
+        return snapshot
+    if _warned_version != snapshot.version:
+        _warned_version = snapshot.version
+        logger.warning(
+            f"Hierarchy snapshot v{snapshot.version} is stale; "
+            f"run build_hierarchy_snapshot. Using the database meanwhile."
+        )
+    return None
+
+
+def reset_snapshot():
+    """Forget the mapped snapshot (tests, or after changing the path)."""
+    global _loaded, _warned_version
+    with _lock:
+        _loaded = None
+        _warned_version = None
@@ -0,0 +1,105 @@
+import logging
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connections, router, transaction
+from django.utils import timezone
+from .models import Employee, Alert, ArchivedAlert
+
+logger = logging.getLogger("alerts")
+
+STATS_CACHE_KEY = "alerts:stats:row-counts"
+
+
+def ping_database(timeout_ms: int) -> str:
+    """
+    Run ``SELECT 1`` on the read database, bounded by timeout_ms where the
+    backend supports a statement timeout (PostgreSQL). SQLite waits at most
+    its busy_timeout.
+    Returns:
+        The database alias that answered
+    """
+    alias = router.db_for_read(Employee)
+    connection = connections[alias]
+
+    if connection.vendor == "postgresql":
+        with transaction.atomic(using=alias), connection.cursor() as cursor:
+            cursor.execute("SET LOCAL statement_timeout = %s", [timeout_ms])
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+    else:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+    return alias
+
+
+def timed_count(queryset, timeout_ms: int) -> int:
+    """
+    queryset.count(), cancelled after timeout_ms on PostgreSQL (raises
+    DatabaseError). Other backends count without a limit.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return queryset.count()
+    with transaction.atomic(using=queryset.db), connection.cursor() as cursor:
+        cursor.execute("SET LOCAL statement_timeout = %s", [timeout_ms])
+        return queryset.count()
+
+
+def estimated_row_count(model):
+    """
+    Planner estimate on PostgreSQL (no table scan), exact COUNT(*) elsewhere.
+    A PostgreSQL table that was never analyzed has no estimate yet: it is
+    counted exactly within ADMIN_COUNT_TIMEOUT_MS, else estimated from the
+    statistics collector's live tuple count.
+    Returns:
+        (count, estimated)
+    """
+    alias = router.db_for_read(model)
+    connection = connections[alias]
+
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 until the table has been vacuumed/analyzed
+        if row and row[0] >= 0:
+            return row[0], True
+
+        try:
+            return timed_count(model.objects.using(alias), settings.ADMIN_COUNT_TIMEOUT_MS), False
+        except DatabaseError:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT COALESCE(SUM(n_live_tup), 0) FROM pg_stat_user_tables WHERE relid = %s::regclass",
+                    [model._meta.db_table],
+                )
+                return cursor.fetchone()[0], True
+
+    return model.objects.using(alias).count(), False
+
+
+def table_row_counts():
+    """
+    Row counts for the stats endpoint, cached for HEALTH_STATS_CACHE_SECONDS
+    so probes and dashboards never trigger repeated full scans.
+    """
+    stats = cache.get(STATS_CACHE_KEY)
+    if stats is not None:
+        return stats
+
+    counts = {
+        "employees": estimated_row_count(Employee),
+        "alerts": estimated_row_count(Alert),
+        "archived_alerts": estimated_row_count(ArchivedAlert),
+    }
+    stats = {name: count for name, (count, _) in counts.items()}
+    stats["estimated"] = any(estimated for _, estimated in counts.values())
+    stats["refreshed_at"] = timezone.now()
+
+    cache.set(STATS_CACHE_KEY, stats, timeout=settings.HEALTH_STATS_CACHE_SECONDS)
+    logger.info(f"table_row_counts refreshed: estimated={stats['estimated']}")
+    return stats
@@ -0,0 +1,310 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import timedelta
+from typing import Any, Callable, Dict, Iterable, Optional
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, connections, transaction
+from django.db.models import Avg, Count, F, Max, Q
+from django.utils import timezone
+from .archive import archive_dismissed_alerts
+from .inbox import drifted_inboxes, rebuild_inboxes, repair_inbox, subtree_sizes
+from .models import Task
+from .snapshot import build_snapshot
+
+logger = logging.getLogger("alerts")
+
+TASKS: Dict[str, Callable[..., Any]] = {}
+
+
+def task(name: str):
+    """Register a function as a background task under name."""
+
+    def register(fn):
+        TASKS[name] = fn
+        return fn
+
+    return register
+
+
+def dedupe_key(name: str, kwargs: Dict[str, Any]) -> str:
+    payload = json.dumps(kwargs, sort_keys=True, default=str).encode()
+    return f"{name}:{hashlib.sha1(payload).hexdigest()}"
+
+
+def enqueue(name: str, delay: float = 0.0, dedupe: bool = True, **kwargs) -> Task:
+    """
+    Queue a registered task and return its row. With dedupe (the default)
+    an identical task that is still pending is returned instead of adding
+    another, so a burst of enqueues runs once. Call inside the writing
+    transaction: the task only becomes visible to workers on commit.
+    """
+    if name not in TASKS:
+        raise ValueError(f"unknown task: {name}")
+    key = dedupe_key(name, kwargs) if dedupe else None
+
+    for _ in range(2):
+        if key is not None:
+            pending = Task.objects.filter(dedupe_key=key, status="pending").first()
+            if pending is not None:
+                return pending
+        try:
+            with transaction.atomic():
+                return Task.objects.create(
+                    name=name,
+                    kwargs=kwargs,
+                    dedupe_key=key,
+                    max_attempts=settings.TASK_MAX_ATTEMPTS,
+                    run_after=timezone.now() + timedelta(seconds=delay),
+                )
+        except IntegrityError:
+            continue  # A concurrent enqueue won: return its row
+    raise RuntimeError(f"could not enqueue {name}")
+
+
+def claim_task(now=None) -> Optional[Task]:
+    """
+    Mark the oldest due pending task running and return it, or None.
+    The status compare-and-set makes concurrent workers (threads or
+    processes) claim each task once without row locks.
+    """
+    while True:
+        now = now or timezone.now()
+        task_id = (
+            Task.objects.filter(status="pending", run_after__lte=now)
+            .order_by("run_after", "id")
+            .values_list("id", flat=True)
+            .first()
+        )
+        if task_id is None:
+            return None
+        claimed = Task.objects.filter(id=task_id, status="pending").update(
+            status="running", started_at=now, heartbeat_at=now, finished_at=None,
+            attempts=F("attempts") + 1,
+        )
+        if claimed:
+            return Task.objects.get(id=task_id)
+
+
+def _retry_or_fail(task: Task, error: str, duration_ms: Optional[float] = None) -> str:
+    """Put a failed attempt back in the queue with backoff, or fail the task."""
+    now = timezone.now()
+    fields = {"last_error": error, "duration_ms": duration_ms}
+    if task.name in TASKS and task.attempts < task.max_attempts:
+        backoff = settings.TASK_RETRY_BACKOFF_SECONDS * 2 ** (task.attempts - 1)
+        try:
+            with transaction.atomic():
+                Task.objects.filter(id=task.id, status="running").update(
+                    status="pending", run_after=now + timedelta(seconds=backoff), **fields
+                )
+            return "pending"
+        except IntegrityError:
+            # An identical task was queued meanwhile and will do the work
+            fields["last_error"] = f"{error} (retry superseded by pending duplicate)"
+    Task.objects.filter(id=task.id, status="running").update(
+        status="failed", finished_at=now, **fields
+    )
+    return "failed"
+
+
+def run_task(task: Task) -> str:
+    """Run a claimed task and record its outcome and timing; returns the new status."""
+    fn = TASKS.get(task.name)
+    start = time.perf_counter()
+    try:
+        if fn is None:
+            raise LookupError(f"unknown task: {task.name}")
+        result = fn(**task.kwargs)
+    except Exception as e:
+        duration_ms = (time.perf_counter() - start) * 1000
+        status = _retry_or_fail(task, f"{type(e).__name__}: {str(e)}", duration_ms)
+        logger.error(
+            f"Task {task.name} #{task.id} failed (attempt {task.attempts}/{task.max_attempts}, "
+            f"{duration_ms:.1f}ms): {str(e)} -> {status}"
+        )
+        return status
+
+    duration_ms = (time.perf_counter() - start) * 1000
+    Task.objects.filter(id=task.id, status="running").update(
+        status="done", finished_at=timezone.now(), duration_ms=duration_ms,
+        result=result, last_error="",
+    )
+    logger.info(f"Task {task.name} #{task.id} done in {duration_ms:.1f}ms")
+    return "done"
+
+
+def requeue_stale_tasks(stale_seconds: float) -> int:
+    """
+    Retry (or fail) running tasks whose heartbeat is older than
+    stale_seconds, e.g. because their worker was killed mid-task. Returns
+    how many were found.
+    """
+    cutoff = timezone.now() - timedelta(seconds=stale_seconds)
+    stale = list(
+        Task.objects.filter(status="running").filter(
+            Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+        )
+    )
+    for stale_task in stale:
+        status = _retry_or_fail(stale_task, f"no heartbeat for {stale_seconds:.0f}s")
+        logger.warning(f"Task {stale_task.name} #{stale_task.id} was stale -> {status}")
+    return len(stale)
+
+
+def task_stats() -> Dict[str, Dict[str, Any]]:
+    """Per task name: count by status, plus mean/max duration of done runs (ms)."""
+    stats: Dict[str, Dict[str, Any]] = {}
+    for row in Task.objects.order_by().values("name", "status").annotate(
+        count=Count("id"), avg_ms=Avg("duration_ms"), max_ms=Max("duration_ms")
+    ):
+        entry = stats.setdefault(row["name"], {"pending": 0, "running": 0, "done": 0, "failed": 0})
+        entry[row["status"]] = row["count"]
+        if row["status"] == "done":
+            entry["avg_ms"] = row["avg_ms"]
+            entry["max_ms"] = row["max_ms"]
+    return stats
+
+
+class Worker:
+    """
+    Claims due tasks and runs them on a thread pool until stopped; with
+    once=True, until the queue has nothing due. One worker per process;
+    several processes may share the queue. Every heartbeat_seconds it
+    refreshes its running tasks' heartbeat_at and requeues tasks whose
+    heartbeat is older than stale_seconds (their worker is gone).
+    """
+
+    def __init__(
+        self,
+        threads: int = 1,
+        poll_seconds: float = 1.0,
+        heartbeat_seconds: Optional[float] = None,
+        stale_seconds: Optional[float] = None,
+    ):
+        self.threads = threads
+        self.poll_seconds = poll_seconds
+        self.heartbeat_seconds = (
+            settings.TASK_HEARTBEAT_SECONDS if heartbeat_seconds is None else heartbeat_seconds
+        )
+        self.stale_seconds = settings.TASK_STALE_SECONDS if stale_seconds is None else stale_seconds
+        self._stop = threading.Event()
+
+    def stop(self):
+        """Stop claiming new tasks; running ones are finished."""
+        self._stop.set()
+
+    @staticmethod
+    def _run(claimed: Task) -> str:
+        try:
+            return run_task(claimed)
+        except Exception as e:
+            # Recording the outcome failed, so the row is still running. Its
+            # heartbeat stops with this future; a worker requeues it once stale
+            logger.error(f"Task {claimed.name} #{claimed.id} lost: {str(e)}")
+            return "running"
+        finally:
+            # Pool threads each hold their own connection
+            connections.close_all()
+
+    def _beat(self, task_ids: Iterable[int]):
+        """Refresh the heartbeat of this worker's running tasks, then requeue stale ones."""
+        try:
+            task_ids = list(task_ids)
+            if task_ids:
+                Task.objects.filter(id__in=task_ids, status="running").update(
+                    heartbeat_at=timezone.now()
+                )
+            requeue_stale_tasks(self.stale_seconds)
+        except DatabaseError as e:
+            logger.error(f"Worker heartbeat failed: {str(e)}")
+
+    def run(self, once: bool = False) -> int:
+        """Process tasks; returns how many were run."""
+        processed = 0
+        inflight: Dict[Future, int] = {}
+        next_beat = 0.0
+        with ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="task") as pool:
+            while not self._stop.is_set():
+                if time.monotonic() >= next_beat:
+                    self._beat(inflight.values())
+                    next_beat = time.monotonic() + self.heartbeat_seconds
+
+                while len(inflight) < self.threads and (next_task := claim_task()):
+                    inflight[pool.submit(self._run, next_task)] = next_task.id
+
+                if not inflight:
+                    if once:
+                        break
+                    self._stop.wait(self.poll_seconds)
+                    continue
+                finished, _ = wait(inflight, timeout=self.poll_seconds, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    del inflight[future]
+                processed += len(finished)
+
+            # Stopping: keep beating until the running tasks finish
+            while inflight:
+                self._beat(inflight.values())
+                finished, _ = wait(inflight, timeout=self.heartbeat_seconds)
+                for future in finished:
+                    del inflight[future]
+                processed += len(finished)
+        return processed
+
+
+def enqueue_hierarchy_rebuilds():
+    """
+    After a reporting graph change: rebuild the snapshot and the manager
+    inboxes, each once per burst of changes (see TASK_HIERARCHY_DELAY_SECONDS).
+    """
+    if not settings.BACKGROUND_TASKS:
+        return
+    delay = settings.TASK_HIERARCHY_DELAY_SECONDS
+    if settings.HIERARCHY_SNAPSHOT_PATH:
+        enqueue("build_hierarchy_snapshot", delay=delay)
+    if settings.MANAGER_INBOX_MIN_SUBTREE > 0:
+        enqueue("rebuild_manager_inboxes", delay=delay)
+
+
+@task("build_hierarchy_snapshot")
+def build_hierarchy_snapshot_task():
+    """Rewrite HIERARCHY_SNAPSHOT_PATH; workers re-map the new file."""
+    if not settings.HIERARCHY_SNAPSHOT_PATH:
+        return None
+    return build_snapshot(settings.HIERARCHY_SNAPSHOT_PATH)
+
+
+@task("rebuild_manager_inboxes")
+def rebuild_manager_inboxes_task(manager_ids=None):
+    """Rebuild inboxes (only manager_ids', if given) at MANAGER_INBOX_MIN_SUBTREE."""
+    return rebuild_inboxes(settings.MANAGER_INBOX_MIN_SUBTREE, manager_ids)
+
+
+@task("reconcile_manager_inboxes")
+def reconcile_manager_inboxes_task():
+    """Repair the inboxes that drifted from the alerts table (check_manager_inboxes --fix)."""
+    sizes = None
+    repaired = {}
+    dropped = []
+    for inbox, _ in drifted_inboxes():
+        sizes = sizes if sizes is not None else subtree_sizes()
+        entries = repair_inbox(inbox.manager_id, sizes)
+        if entries is None:
+            dropped.append(inbox.manager_id)
+        else:
+            repaired[inbox.manager_id] = entries
+    return {"repaired": repaired, "dropped": dropped}
+
+
+@task("archive_alerts")
+def archive_alerts_task(older_than_days=None, batch_size=None):
+    """archive_alerts with the ALERT_ARCHIVE_* defaults."""
+    days = settings.ALERT_ARCHIVE_MIN_AGE_DAYS if older_than_days is None else older_than_days
+    archived = archive_dismissed_alerts(
+        older_than=timedelta(days=days),
+        batch_size=batch_size or settings.ALERT_ARCHIVE_BATCH_SIZE,
+    )
+    return {"archived": archived}
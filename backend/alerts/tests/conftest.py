@@ -0,0 +1,71 @@
+import pytest
+from rest_framework.test import APIClient
+from alerts.categories import clear_category_cache
+from alerts.models import Employee, Alert
+
+# Same org as seed_data.json: E1 > E2 > {E3 > E5, E4, E9 > E10},
+# plus the E6 -> E7 -> E8 -> E6 reporting cycle.
+SEED_EMPLOYEES = [
+    ("E1", "Taylor Reed", None),
+    ("E2", "Alex Morgan", "E1"),
+    ("E3", "Jordan Lee", "E2"),
+    ("E4", "Casey Kim", "E2"),
+    ("E5", "Riley Chen", "E3"),
+    ("E6", "Sam Patel", "E7"),
+    ("E7", "Jamie Singh", "E8"),
+    ("E8", "Morgan Diaz", "E6"),
+    ("E9", "Avery Brooks", "E2"),
+    ("E10", "Quinn Park", "E9"),
+]
+
+SEED_ALERTS = [
+    ("A1", "E3", "high", "retention", "2025-09-01T09:00:00Z", "open"),
+    ("A2", "E4", "medium", "engagement", "2025-09-02T09:00:00Z", "open"),
+    ("A3", "E5", "low", "workload", "2025-09-03T09:00:00Z", "open"),
+    ("A4", "E5", "high", "retention", "2025-09-04T09:00:00Z", "open"),
+    ("A5", "E9", "medium", "engagement", "2025-09-05T09:00:00Z", "open"),
+    ("A6", "E10", "high", "retention", "2025-09-06T09:00:00Z", "dismissed"),
+    ("A7", "E3", "low", "workload", "2025-09-07T09:00:00Z", "open"),
+    ("A8", "E6", "medium", "engagement", "2025-09-08T09:00:00Z", "open"),
+    ("A9", "E7", "high", "retention", "2025-09-09T09:00:00Z", "open"),
+    ("A10", "E8", "low", "workload", "2025-09-10T09:00:00Z", "open"),
+    ("A11", "E4", "high", "retention", "2025-09-11T09:00:00Z", "open"),
+    ("A12", "E9", "low", "workload", "2025-09-12T09:00:00Z", "open"),
+    ("A13", "E10", "medium", "engagement", "2025-09-13T09:00:00Z", "open"),
+    ("A14", "E2", "low", "workload", "2025-09-14T09:00:00Z", "open"),
+]
+
+
+@pytest.fixture(autouse=True)
+def _category_cache():
+    # Rolled-back tests reuse AlertCategory codes for other names
+    clear_category_cache()
+    yield
+    clear_category_cache()
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def seed_org(db):
+    """Create the seed_data.json employees and alerts."""
+    for emp_id, name, _ in SEED_EMPLOYEES:
+        Employee.objects.create(id=emp_id, name=name)
+
+    # Second pass to avoid FK constraints
+    for emp_id, _, reports_to in SEED_EMPLOYEES:
+        if reports_to:
+            Employee.objects.filter(id=emp_id).update(reports_to_id=reports_to)
+
+    for alert_id, employee_id, severity, category, created_at, alert_status in SEED_ALERTS:
+        Alert.objects.create(
+            id=alert_id,
+            employee_id=employee_id,
+            severity=severity,
+            category=category,
+            created_at=created_at,
+            status=alert_status,
+        )
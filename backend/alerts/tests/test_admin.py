@@ -0,0 +1,133 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from alerts import admin as admin_module
+from alerts.admin import EstimatedCountPaginator
+from alerts.models import Employee, Alert, ArchivedAlert
+
+CHANGELISTS = [
+    "admin:alerts_employee_changelist",
+    "admin:alerts_alert_changelist",
+    "admin:alerts_archivedalert_changelist",
+]
+
+
+@pytest.fixture
+def admin_client(client, db):
+    user = get_user_model().objects.create_superuser("admin", "admin@example.com", "pw")
+    client.force_login(user)
+    return client
+
+
+def _add_rows(start, count):
+    """count employees, each reporting to E1 and with one hot and one archived alert."""
+    now = timezone.now()
+    ids = range(start, start + count)
+    Employee.objects.bulk_create(
+        [Employee(id=f"X{n}", name=f"Extra {n}", reports_to_id="E1") for n in ids]
+    )
+    for model in (Alert, ArchivedAlert):
+        model.objects.bulk_create(
+            [
+                model(
+                    id=f"{model.__name__[0]}X{n}",
+                    employee_id=f"X{n}",
+                    severity="low",
+                    category="workload",
+                    created_at=now,
+                    status="dismissed",
+                )
+                for n in ids
+            ]
+        )
+
+
+def _changelist_queries(admin_client, url_name, **params):
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(reverse(url_name), params)
+    assert response.status_code == 200
+    return len(queries)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name", CHANGELISTS)
+def test_changelist_query_count_is_constant(
+    admin_client, seed_org, url_name, django_capture_on_commit_callbacks
+):
+    _add_rows(0, 5)
+    # Warm the category cache (filled on commit, which the test transaction never does)
+    with django_capture_on_commit_callbacks(execute=True):
+        _changelist_queries(admin_client, url_name)
+    few = _changelist_queries(admin_client, url_name)
+
+    _add_rows(5, 60)
+    many = _changelist_queries(admin_client, url_name)
+
+    assert few == many
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url_name", CHANGELISTS)
+def test_filtered_changelist_skips_full_count(admin_client, seed_org, url_name):
+    _add_rows(0, 5)
+
+    with CaptureQueriesContext(connection) as queries:
+        admin_client.get(reverse(url_name), {"q": "X1"})
+
+    counts = [q["sql"] for q in queries.captured_queries if "COUNT(" in q["sql"]]
+    assert len(counts) == 1  # The filtered page count only
+
+
+@pytest.mark.django_db
+def test_search_uses_exact_and_prefix_lookups(admin_client, seed_org):
+    response = admin_client.get(reverse("admin:alerts_employee_changelist"), {"q": "Jord"})
+    assert response.context["cl"].result_count == 1  # Jordan Lee, by name prefix
+
+    response = admin_client.get(reverse("admin:alerts_alert_changelist"), {"q": "E5"})
+    assert {a.id for a in response.context["cl"].result_list} == {"A3", "A4"}
+
+
+@pytest.mark.django_db
+def test_change_forms_do_not_load_every_employee(admin_client, seed_org):
+    _add_rows(0, 30)
+
+    for url in (
+        reverse("admin:alerts_alert_change", args=["A1"]),
+        reverse("admin:alerts_employee_change", args=["E3"]),
+    ):
+        response = admin_client.get(url)
+        assert response.status_code == 200
+        # Autocomplete renders only the selected option
+        assert response.content.count(b"<option") <= 10
+
+
+@pytest.mark.django_db
+def test_estimated_count_paginator_counts_exactly_on_sqlite(seed_org):
+    assert EstimatedCountPaginator(Alert.objects.all(), 5).count == 14
+    assert EstimatedCountPaginator(Alert.objects.filter(status="open"), 5).count == 13
+
+
+@pytest.mark.django_db
+def test_timed_out_count_pages_only_through_the_requested_page(seed_org, monkeypatch):
+    def timeout(queryset, timeout_ms):
+        raise DatabaseError("canceling statement due to statement timeout")
+
+    monkeypatch.setattr(admin_module, "timed_count", timeout)
+    few = Alert.objects.filter(employee_id="E5")  # A3, A4
+
+    assert EstimatedCountPaginator(few, 5).count == 2  # Not the table estimate
+    assert EstimatedCountPaginator(Alert.objects.filter(status="open"), 5).count == 6  # More follow
+    assert EstimatedCountPaginator(Alert.objects.filter(status="open"), 5, page_number=3).count == 13
+
+
+@pytest.mark.django_db
+def test_changelist_passes_the_page_to_the_paginator(admin_client, seed_org):
+    _add_rows(0, 120)
+    response = admin_client.get(
+        reverse("admin:alerts_alert_changelist"), {"status__exact": "dismissed", "p": "2"}
+    )
+
+    assert response.context["cl"].paginator.page_number == 2
@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.functions import Collate
+from alerts.archive import archive_dismissed_alerts
+from alerts.filters import alert_querysets, parse_alert_filters
+from alerts.models import Alert, ArchivedAlert
+
+NOW = datetime(2025, 12, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def archived_org(seed_org):
+    """Seed org with A1, A3 and A6 dismissed and then archived."""
+    Alert.objects.filter(id__in=["A1", "A3"]).update(status="dismissed")
+    archive_dismissed_alerts(timedelta(days=30), batch_size=2, now=NOW)
+
+
+@pytest.mark.django_db
+def test_archive_moves_only_old_dismissed_alerts(seed_org):
+    Alert.objects.filter(id="A1").update(status="dismissed")
+    Alert.objects.filter(id="A13").update(status="dismissed", created_at=NOW)
+
+    moved = archive_dismissed_alerts(timedelta(days=30), batch_size=1, now=NOW)
+
+    assert moved == 2
+    assert set(ArchivedAlert.objects.values_list("id", flat=True)) == {"A1", "A6"}
+    assert not Alert.objects.filter(id__in=["A1", "A6"]).exists()
+    assert Alert.objects.get(id="A13").status == "dismissed"  # Too recent
+
+    archived = ArchivedAlert.objects.get(id="A6")
+    assert (archived.employee_id, archived.severity, archived.category) == (
+        "E10",
+        "high",
+        "retention",
+    )
+
+
+@pytest.mark.django_db
+def test_archive_respects_max_batches(seed_org):
+    Alert.objects.filter(id__in=["A1", "A3"]).update(status="dismissed")
+
+    moved = archive_dismissed_alerts(
+        timedelta(days=30), batch_size=1, max_batches=2, now=NOW
+    )
+    assert moved == 2
+    assert Alert.objects.filter(status="dismissed").count() == 1
+
+
+@pytest.mark.django_db
+def test_archive_command(seed_org):
+    call_command("archive_alerts", "--older-than-days", "0", "--batch-size", "10")
+    assert list(ArchivedAlert.objects.values_list("id", flat=True)) == ["A6"]
+
+
+@pytest.mark.django_db
+def test_get_alerts_excludes_archive_by_default(api_client, archived_org):
+    response = api_client.get("/api/alerts", {"manager_id": "E2", "scope": "subtree"})
+    ids = [alert["id"] for alert in response.json()]
+    assert ids == ["A13", "A12", "A11", "A7", "A5", "A4", "A2"]
+
+
+@pytest.mark.django_db
+def test_get_alerts_include_archived_merges_in_order(api_client, archived_org):
+    params = {"manager_id": "E2", "scope": "subtree", "include_archived": "true"}
+    data = api_client.get("/api/alerts", params).json()
+
+    assert [alert["id"] for alert in data] == [
+        "A13", "A12", "A11", "A7", "A6", "A5", "A4", "A3", "A2", "A1",
+    ]
+    assert data[4]["status"] == "dismissed"
+    assert data[4]["employee"] == {"id": "E10", "name": "Quinn Park"}
+
+    normalized = api_client.get("/api/alerts", {**params, "shape": "normalized"}).json()
+    assert [alert["id"] for alert in normalized["alerts"]] == [a["id"] for a in data]
+
+    sparse = api_client.get(
+        "/api/alerts", {**params, "shape": "normalized", "fields": "severity"}
+    ).json()
+    assert sparse["alerts"][4] == {"severity": "high"}
+
+
+@pytest.mark.django_db
+def test_include_archived_applies_filters(api_client, archived_org):
+    params = {
+        "manager_id": "E2",
+        "scope": "subtree",
+        "include_archived": "1",
+        "status": "dismissed",
+        "severity": "high",
+    }
+    data = api_client.get("/api/alerts", params).json()
+    assert [alert["id"] for alert in data] == ["A6", "A1"]
+
+    batch = api_client.get(
+        "/api/alerts/batch", {**params, "manager_ids": "E2,E9"}
+    ).json()
+    assert [alert["id"] for alert in batch["E2"]] == ["A6", "A1"]
+    assert [alert["id"] for alert in batch["E9"]] == ["A6"]
+
+
+@pytest.mark.django_db
+def test_invalid_include_archived(api_client, seed_org):
+    response = api_client.get(
+        "/api/alerts", {"manager_id": "E2", "include_archived": "maybe"}
+    )
+    assert response.status_code == 400
+    assert response.json() == {"detail": "invalid include_archived"}
+
+
+@pytest.mark.django_db
+def test_dismiss_archived_alert_is_idempotent(api_client, archived_org):
+    response = api_client.post("/api/alerts/A6/dismiss")
+    assert response.status_code == 200
+    assert response.json()["status"] == "dismissed"
+
+
+@pytest.mark.django_db
+def test_merged_sources_order_ids_by_code_point(seed_org, monkeypatch):
+    employees = ["E3"]
+    single = alert_querysets(employees, parse_alert_filters({}))
+    assert [qs.query.order_by for qs in single] == [()]  # Alert.Meta.ordering
+
+    monkeypatch.setattr(connection, "vendor", "postgresql")
+    merged = alert_querysets(employees, parse_alert_filters({"include_archived": "true"}))
+    for qs in merged:
+        created_at, alert_id = qs.query.order_by
+        assert created_at == "-created_at"
+        assert isinstance(alert_id, Collate) and alert_id.collation == "C"
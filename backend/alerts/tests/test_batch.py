@@ -0,0 +1,85 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from alerts.utils import get_employee_subtrees
+
+
+@pytest.mark.django_db
+def test_batch_groups_alerts_per_manager(api_client, seed_org):
+    """Each manager gets the same alerts as a single GET /api/alerts call."""
+    response = api_client.get(
+        "/api/alerts/batch", {"manager_ids": "E2,E3,E7", "scope": "subtree"}
+    )
+    assert response.status_code == 200
+
+    data = response.json()
+    assert list(data) == ["E2", "E3", "E7"]
+    for manager_id in ["E2", "E3", "E7"]:
+        single = api_client.get(
+            "/api/alerts", {"manager_id": manager_id, "scope": "subtree"}
+        ).json()
+        assert data[manager_id] == single
+
+    assert {a["id"] for a in data["E7"]} == {"A8", "A10"}  # Cycle handled
+
+
+@pytest.mark.django_db
+def test_batch_applies_shared_filters(api_client, seed_org):
+    response = api_client.get(
+        "/api/alerts/batch",
+        {"manager_ids": "E2,E9", "scope": "subtree", "status": "open", "severity": "high"},
+    )
+    assert response.status_code == 200
+
+    data = response.json()
+    assert {a["id"] for a in data["E2"]} == {"A1", "A4", "A11"}
+    assert data["E9"] == []  # A6 is dismissed
+
+
+@pytest.mark.django_db
+def test_batch_query_count_is_independent_of_manager_count(api_client, seed_org):
+    """Overlapping subtrees are walked once; alerts come from a single query."""
+    with CaptureQueriesContext(connection) as one:
+        api_client.get("/api/alerts/batch", {"manager_ids": "E1", "scope": "subtree"})
+    with CaptureQueriesContext(connection) as many:
+        api_client.get(
+            "/api/alerts/batch",
+            {"manager_ids": "E1,E2,E3,E4,E9,E10", "scope": "subtree"},
+        )
+    assert len(many) <= len(one)
+
+
+@pytest.mark.django_db
+def test_get_employee_subtrees_matches_single_traversal(seed_org):
+    result = get_employee_subtrees(["E2", "E9", "E7"], "subtree")
+    assert result == {
+        "E2": {"E3", "E4", "E5", "E9", "E10"},
+        "E9": {"E10"},
+        "E7": {"E6", "E8"},
+    }
+    assert get_employee_subtrees(["E2"], "direct") == {"E2": {"E3", "E4", "E9"}}
+
+
+@pytest.mark.django_db
+def test_batch_validation(api_client, seed_org):
+    response = api_client.get("/api/alerts/batch")
+    assert response.status_code == 400
+    assert response.json() == {"detail": "manager_ids is required"}
+
+    response = api_client.get("/api/alerts/batch", {"manager_ids": "E2,INVALID"})
+    assert response.status_code == 404
+    assert response.json() == {"detail": "manager not found"}
+
+    response = api_client.get(
+        "/api/alerts/batch", {"manager_ids": "E2", "severity": "critical"}
+    )
+    assert response.status_code == 400
+    assert response.json() == {"detail": "invalid severity"}
+
+
+@pytest.mark.django_db
+def test_batch_rejects_too_many_managers(api_client, seed_org, settings):
+    settings.ALERTS_BATCH_MAX_MANAGERS = 2
+    response = api_client.get("/api/alerts/batch", {"manager_ids": "E1,E2,E3"})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "too many manager_ids"}
@@ -0,0 +1,142 @@
+import pytest
+from django.db import connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.test.utils import CaptureQueriesContext
+from alerts import routers
+from alerts.categories import category_codes, category_name, clear_category_cache
+from alerts.models import Alert, AlertCategory, ArchivedAlert
+
+BEFORE = [("alerts", "0005_hierarchy_version")]
+AFTER = [("alerts", "0006_alert_categories")]
+
+
+@pytest.mark.django_db
+def test_categories_are_interned(seed_org):
+    assert sorted(AlertCategory.objects.values_list("name", flat=True)) == [
+        "engagement", "retention", "workload"
+    ]
+    a1 = Alert.objects.get(id="A1")
+    assert a1.category == "retention"
+    assert a1.category_ref_id == category_codes(["retention"])["retention"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("shape", ["nested", "normalized"])
+def test_responses_keep_category_names_without_join(
+    api_client, seed_org, shape, django_capture_on_commit_callbacks
+):
+    # Warm the code -> name cache (filled on commit)
+    with django_capture_on_commit_callbacks(execute=True):
+        api_client.get("/api/alerts", {"manager_id": "E2"})
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get("/api/alerts", {"manager_id": "E2", "shape": shape})
+
+    alerts = response.json() if shape == "nested" else response.json()["alerts"]
+    assert {a["id"]: a["category"] for a in alerts} == {
+        "A1": "retention", "A2": "engagement", "A5": "engagement",
+        "A7": "workload", "A11": "retention", "A12": "workload",
+    }
+    assert not any("alert_categories" in q["sql"] for q in queries.captured_queries)
+
+
+@pytest.mark.django_db
+def test_category_filter(api_client, seed_org):
+    response = api_client.get(
+        "/api/alerts", {"manager_id": "E2", "scope": "subtree", "category": "retention,workload"}
+    )
+
+    assert response.status_code == 200
+    assert [a["id"] for a in response.json()] == ["A12", "A11", "A7", "A6", "A4", "A3", "A1"]
+
+
+@pytest.mark.django_db
+def test_unknown_category_is_rejected(api_client, seed_org):
+    response = api_client.get("/api/alerts", {"manager_id": "E2", "category": "retention,pay"})
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "invalid category"}
+
+
+@pytest.mark.django_db
+def test_category_created_elsewhere_is_found_after_cache_miss(api_client, seed_org):
+    category_codes(["retention"])  # Cache loaded before the new row exists
+    AlertCategory.objects.create(name="pay")
+
+    response = api_client.get("/api/alerts", {"manager_id": "E2", "category": "pay"})
+
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+@pytest.mark.django_db
+def test_assigning_a_new_category_writes_on_save(seed_org):
+    alert = Alert.objects.get(id="A1")
+    alert.category = "pay"
+
+    assert alert.category == "pay"
+    assert not AlertCategory.objects.filter(name="pay").exists()
+
+    alert.save()
+
+    assert Alert.objects.get(id="A1").category == "pay"
+
+
+@pytest.mark.django_db
+def test_rolled_back_save_leaves_no_category(seed_org):
+    alert = Alert.objects.get(id="A1")
+    alert.category = "pay"
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            alert.save()
+            raise RuntimeError("rollback")
+
+    assert not AlertCategory.objects.filter(name="pay").exists()
+    assert category_codes(["pay"]) == {}  # Not cached either
+
+
+@pytest.mark.django_db
+def test_cache_misses_read_the_primary(monkeypatch, seed_org):
+    # Reads now route to a "replica" alias that has none of the new rows
+    # (in tests it doesn't exist at all)
+    monkeypatch.setattr(routers, "replica_configured", lambda: True)
+
+    codes = category_codes(["pay"], create=True)
+
+    assert category_name(codes["pay"]) == "pay"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_migration_moves_names_into_lookup_table():
+    executor = MigrationExecutor(connection)
+    executor.migrate(BEFORE)
+    old_apps = executor.loader.project_state(BEFORE).apps
+    OldEmployee = old_apps.get_model("alerts", "Employee")
+    OldAlert = old_apps.get_model("alerts", "Alert")
+    OldArchived = old_apps.get_model("alerts", "ArchivedAlert")
+    OldEmployee.objects.create(id="E1", name="Taylor Reed")
+    for n, category in enumerate(["retention", "workload", "retention"]):
+        OldAlert.objects.create(
+            id=f"A{n}", employee_id="E1", severity="low", category=category,
+            created_at="2025-09-01T09:00:00Z",
+        )
+    OldArchived.objects.create(
+        id="X1", employee_id="E1", severity="low", category="burnout",
+        created_at="2025-01-01T09:00:00Z",
+    )
+
+    executor = MigrationExecutor(connection)
+    executor.loader.build_graph()
+    executor.migrate(AFTER)
+    clear_category_cache()
+    try:
+        assert AlertCategory.objects.count() == 3
+        assert [a.category for a in Alert.objects.order_by("id")] == [
+            "retention", "workload", "retention"
+        ]
+        assert Alert.objects.get(id="A0").category_ref_id == Alert.objects.get(id="A2").category_ref_id
+        assert ArchivedAlert.objects.get(id="X1").category == "burnout"
+    finally:
+        # Leave the schema at the latest migration for the tests that follow
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes())
@@ -0,0 +1,141 @@
+import threading
+import time
+import pytest
+from alerts import views
+from alerts.coalesce import SingleFlight
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def _run_concurrently(flight, key, fn, callers):
+    """Start callers threads on flight.do(key, fn); returns (threads, results)."""
+    results = [None] * callers
+
+    def call(i):
+        try:
+            results[i] = flight.do(key, fn)
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    release = threading.Event()
+    executions = []
+
+    def compute():
+        executions.append(1)
+        release.wait(5)
+        return ["payload"]
+
+    threads, results = _run_concurrently(flight, "k", compute, callers=8)
+    _wait_for(lambda: flight.stats()["coalesced"] == 7)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(executions) == 1
+    assert all(result[0] is results[0][0] for result in results)
+    assert sorted(shared for _, shared in results) == [False] + [True] * 7
+    assert flight.stats() == {
+        "requests": 8, "executed": 1, "coalesced": 7, "fresh_hits": 0, "wait_timeouts": 0,
+        "saved_ratio": 0.875,
+    }
+
+
+def test_waiters_get_the_leaders_exception():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def compute():
+        release.wait(5)
+        raise RuntimeError("database went away")
+
+    threads, results = _run_concurrently(flight, "k", compute, callers=3)
+    _wait_for(lambda: flight.stats()["coalesced"] == 2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert flight.do("k", lambda: "recovered") == ("recovered", False)  # Not cached
+
+
+def test_waiter_computes_its_own_result_after_timeout():
+    flight = SingleFlight(wait_seconds=0.05)
+    release = threading.Event()
+
+    threads, results = _run_concurrently(flight, "k", lambda: release.wait(5) and "stuck", 1)
+    _wait_for(lambda: flight.stats()["executed"] == 1)
+
+    assert flight.do("k", lambda: "direct") == ("direct", False)
+    release.set()
+    threads[0].join()
+
+    assert results[0] == ("stuck", False)
+    stats = flight.stats()
+    assert (stats["executed"], stats["coalesced"], stats["wait_timeouts"]) == (2, 0, 1)
+
+
+def test_fresh_window_reuses_result_until_cleared():
+    flight = SingleFlight(fresh_seconds=60)
+
+    assert flight.do("k", lambda: 1) == (1, False)
+    assert flight.do("k", lambda: 2) == (1, True)
+
+    flight.clear()
+    assert flight.do("k", lambda: 3) == (3, False)
+    assert flight.stats()["fresh_hits"] == 1
+
+
+def test_clear_detaches_in_flight_call():
+    flight = SingleFlight(fresh_seconds=60)
+    release = threading.Event()
+
+    threads, results = _run_concurrently(flight, "k", lambda: release.wait(5) and "stale", 1)
+    _wait_for(lambda: flight.stats()["executed"] == 1)
+
+    flight.clear()  # e.g. a dismiss while the leader is still querying
+    assert flight.do("k", lambda: "fresh") == ("fresh", False)
+
+    release.set()
+    threads[0].join()
+    assert results[0] == ("stale", False)
+    assert flight.do("k", lambda: "other") == ("fresh", True)  # Stale result never stored
+
+
+@pytest.mark.django_db
+def test_get_alerts_sees_dismiss_despite_fresh_window(api_client, seed_org, monkeypatch):
+    monkeypatch.setattr(views.alert_requests, "fresh_seconds", 60)
+    views.alert_requests.clear()
+    params = {"manager_id": "E2", "status": "open"}
+
+    before = api_client.get("/api/alerts", params).json()
+    api_client.post("/api/alerts/A1/dismiss")
+    after = api_client.get("/api/alerts", params).json()
+
+    assert "A1" in {a["id"] for a in before}
+    assert "A1" not in {a["id"] for a in after}
+    views.alert_requests.clear()
+
+
+@pytest.mark.django_db
+def test_health_stats_reports_coalescing(api_client, seed_org):
+    api_client.get("/api/alerts", {"manager_id": "E2"})
+
+    coalescing = api_client.get("/api/health/stats").json()["coalescing"]
+
+    assert coalescing["requests"] >= 1
+    assert set(coalescing) == {
+        "requests", "executed", "coalesced", "fresh_hits", "wait_timeouts", "saved_ratio"
+    }
@@ -0,0 +1,243 @@
+import itertools
+import threading
+from datetime import datetime, timedelta, timezone as dt_timezone
+import pytest
+from alerts import checks, columnar as columnar_module
+from alerts.archive import archive_dismissed_alerts
+from alerts.columnar import ColumnarAlerts, alert_columns
+from alerts.models import Alert, Employee
+
+pytest.importorskip("numpy")
+
+BASE = datetime(2025, 8, 1, 9, 0, tzinfo=dt_timezone.utc)
+# ColumnarAlerts.query filters that keep every row
+ALL_ROWS = {"severity": [], "status": [], "category": [], "created_after": None,
+            "created_before": None, "q": ""}
+
+QUERIES = [
+    {"manager_id": "E1", "scope": "subtree"},
+    {"manager_id": "E2"},
+    {"manager_id": "E2", "scope": "depth", "max_depth": "2", "include_distance": "true"},
+    {"manager_id": "E7", "scope": "subtree"},
+    {"manager_id": "E1", "scope": "subtree", "severity": "high,low", "status": "open"},
+    {"manager_id": "E1", "scope": "subtree", "status": "dismissed"},
+    {"manager_id": "E1", "scope": "subtree", "category": "burnout,retention"},
+    {"manager_id": "E2", "scope": "subtree", "q": "lee"},
+    {"manager_id": "E2", "scope": "subtree", "q": "QUINN", "shape": "normalized"},
+    {"manager_id": "E1", "scope": "subtree", "created_after": "2025-08-05",
+     "created_before": "2025-08-09T12:00:00Z"},
+    {"manager_id": "E1", "scope": "subtree", "fields": "status,id,created_at"},
+    {"manager_id": "E2", "scope": "subtree", "shape": "normalized", "fields": "id,severity",
+     "include_distance": "true"},
+    {"manager_id": "E2", "scope": "subtree", "shape": "normalized", "include_distance": "true"},
+    {"manager_id": "E5", "scope": "subtree"},  # No reports
+]
+
+
+@pytest.fixture
+def columnar(settings):
+    settings.ALERTS_COLUMNAR = True
+    alert_columns.reset()
+    yield alert_columns
+    alert_columns.reset()
+
+
+@pytest.fixture
+def many_alerts(seed_org):
+    """seed_org plus alerts with shared timestamps, so id breaks the ties."""
+    employees = [f"E{n}" for n in range(1, 11)]
+    severities = itertools.cycle(["low", "medium", "high", "medium"])
+    statuses = itertools.cycle(["open", "open", "dismissed"])
+    Alert.objects.bulk_create(
+        Alert(
+            id=f"B{n}",
+            employee_id=employees[n * 7 % len(employees)],
+            severity=next(severities),
+            category=("retention", "engagement", "workload", "burnout")[n % 4],
+            created_at=BASE + timedelta(hours=n // 3 * 5, microseconds=n % 2),
+            status=next(statuses),
+        )
+        for n in range(120)
+    )
+
+
+def _responses(client, settings, params):
+    settings.ALERTS_COLUMNAR = False
+    orm = client.get("/api/alerts", params)
+    settings.ALERTS_COLUMNAR = True
+    engine = client.get("/api/alerts", params)
+    assert orm.status_code == engine.status_code == 200
+    return orm.content, engine.content
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("params", QUERIES)
+def test_columnar_matches_orm(api_client, settings, columnar, many_alerts, params):
+    orm, engine = _responses(api_client, settings, params)
+
+    assert engine == orm  # Byte-identical JSON, order included
+    assert columnar.size == Alert.objects.count()
+
+
+@pytest.mark.django_db
+def test_local_writes_update_copy_in_place(
+    api_client, settings, columnar, many_alerts, django_capture_on_commit_callbacks
+):
+    params = {"manager_id": "E1", "scope": "subtree"}
+    api_client.get("/api/alerts", params)
+    loaded_at = columnar.loaded_at
+
+    with django_capture_on_commit_callbacks(execute=True):
+        api_client.post("/api/alerts/A1/dismiss")
+        api_client.generic(
+            "POST",
+            "/api/alerts/ingest",
+            b'{"id": "N1", "employee_id": "E4", "severity": "high", "category": "pay",'
+            b' "created_at": "2025-10-01T00:00:00Z"}\n'
+            b'{"id": "B3", "employee_id": "E5", "severity": "low", "category": "workload",'
+            b' "created_at": "2025-10-02T00:00:00Z", "status": "dismissed"}\n',
+            content_type="application/x-ndjson",
+        )
+    archive_dismissed_alerts(timedelta(days=0), batch_size=10, max_batches=1)
+
+    for query in QUERIES:
+        orm, engine = _responses(api_client, settings, query)
+        assert engine == orm, query
+    orm, engine = _responses(api_client, settings, {"manager_id": "E2", "category": "pay"})
+    assert engine == orm and b'"N1"' in engine  # Category created by the ingest
+    assert columnar.loaded_at == loaded_at  # Never reloaded
+
+
+@pytest.mark.django_db
+def test_employee_rename_reloads_copy(api_client, settings, columnar, many_alerts):
+    api_client.get("/api/alerts", {"manager_id": "E1", "scope": "subtree"})
+    loaded_at = columnar.loaded_at
+
+    employee = Employee.objects.get(id="E3")
+    employee.name = "Jordan Renamed"
+    employee.save()
+    orm, engine = _responses(api_client, settings, {"manager_id": "E2", "q": "renamed"})
+
+    assert engine == orm
+    assert columnar.loaded_at != loaded_at
+
+
+@pytest.mark.django_db
+def test_other_process_writes_reload_copy(
+    api_client, settings, columnar, many_alerts, django_capture_on_commit_callbacks
+):
+    other = ColumnarAlerts()  # Another worker's copy
+    other.load()
+    open_rows = {**ALL_ROWS, "status": ["open"]}
+    assert "A1" in {row["id"] for row in other.query(["E3"], open_rows)}
+
+    with django_capture_on_commit_callbacks(execute=True):
+        api_client.post("/api/alerts/A1/dismiss")
+    other.ensure_current()
+
+    assert "A1" not in {row["id"] for row in other.query(["E3"], open_rows)}
+
+
+@pytest.mark.django_db
+def test_counted_bulk_write_reloads_copy(api_client, settings, columnar, many_alerts):
+    api_client.get("/api/alerts", {"manager_id": "E1", "scope": "subtree"})
+    Alert.objects.filter(id="A2").update(status="dismissed")  # Counted by AlertQuerySet
+
+    orm, engine = _responses(api_client, settings, {"manager_id": "E2", "status": "open"})
+
+    assert engine == orm
+
+
+@pytest.mark.django_db
+def test_load_fills_columns_in_chunks(monkeypatch, columnar, many_alerts):
+    monkeypatch.setattr(columnar_module, "LOAD_CHUNK_SIZE", 7)
+    columnar.load()
+
+    assert columnar.size == Alert.objects.count()
+    assert set(columnar._row_of) == set(Alert.objects.values_list("id", flat=True))
+    assert columnar.version == columnar_module.alerts_version()
+
+
+@pytest.mark.django_db
+def test_queries_run_while_reloading(
+    monkeypatch, columnar, many_alerts, django_capture_on_commit_callbacks
+):
+    columnar.load()
+    # Warm the category cache: the other thread can't read this test's transaction
+    with django_capture_on_commit_callbacks(execute=True):
+        columnar.query(["E3"], ALL_ROWS)
+    answered = []
+    read = ColumnarAlerts._read
+
+    def slow_read(fresh):
+        # Another thread queries the old copy mid-reload
+        thread = threading.Thread(target=lambda: answered.append(columnar.query(["E3"], ALL_ROWS)))
+        thread.start()
+        thread.join(timeout=5)
+        read(fresh)
+
+    monkeypatch.setattr(ColumnarAlerts, "_read", slow_read)
+    columnar.load()
+
+    assert len(answered) == 1 and answered[0]
+
+
+@pytest.mark.django_db
+def test_tied_timestamps_order_mixed_case_ids_like_the_orm(
+    api_client, settings, columnar, seed_org
+):
+    Alert.objects.bulk_create(
+        Alert(id=alert_id, employee_id="E3", severity="low", category="workload",
+              created_at=BASE, status="open")
+        for alert_id in ["b1", "B2", "a3", "C4", "Z5", "_6", "z7"]
+    )
+
+    orm, engine = _responses(api_client, settings, {"manager_id": "E2", "scope": "subtree"})
+
+    assert engine == orm
+    assert columnar.loaded
+
+
+@pytest.mark.django_db
+def test_other_id_collations_use_orm(monkeypatch, api_client, columnar, seed_org):
+    monkeypatch.setitem(columnar_module._code_point_order, "default", False)
+
+    response = api_client.get("/api/alerts", {"manager_id": "E2", "scope": "subtree"})
+
+    assert response.status_code == 200
+    assert not columnar.loaded
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("q", ["ss", "STRASSE", "straße", "STRAßE", "n st", "É"])
+def test_name_search_folds_case_like_the_orm(api_client, settings, columnar, seed_org, q):
+    Employee.objects.filter(id="E3").update(name="Jordan Straße")
+    Employee.objects.filter(id="E4").update(name="Élodie Ruiz")
+
+    orm, engine = _responses(api_client, settings, {"manager_id": "E1", "scope": "subtree", "q": q})
+
+    assert engine == orm
+
+
+def test_postgresql_fold_keeps_sharp_s():
+    fold = columnar_module.name_folder("postgresql")
+
+    assert fold("Straße") == "STRAßE"  # UPPER(), not casefold()'s "strasse"
+    assert columnar_module.name_folder("sqlite")("ÉLAN") == "Élan"  # LIKE folds ASCII only
+
+
+@pytest.mark.django_db
+def test_include_archived_uses_orm(api_client, columnar, seed_org):
+    response = api_client.get("/api/alerts", {"manager_id": "E2", "include_archived": "true"})
+
+    assert response.status_code == 200
+    assert not columnar.loaded
+
+
+def test_system_check_requires_numpy(monkeypatch, settings):
+    monkeypatch.setattr(columnar_module, "np", None)
+
+    settings.ALERTS_COLUMNAR = False
+    assert checks.columnar_dependencies(None) == []
+    settings.ALERTS_COLUMNAR = True
+    assert [error.id for error in checks.columnar_dependencies(None)] == ["alerts.E001"]
@@ -0,0 +1,94 @@
+import pytest
+from alerts.models import Employee
+from alerts.utils import get_employee_distances, get_employee_subtree, reports_subquery
+
+
+def _alert_employees(response):
+    return {alert["employee"]["id"] for alert in response.json()}
+
+
+@pytest.mark.django_db
+def test_reports_subquery_stops_at_max_depth(seed_org):
+    bounded = Employee.objects.filter(id__in=reports_subquery(["E1"], "depth", 2))
+
+    assert set(bounded.values_list("id", flat=True)) == {"E2", "E3", "E4", "E9"}
+
+
+@pytest.mark.django_db
+def test_depth_scope_traversal_matches_subquery(seed_org):
+    assert get_employee_subtree("E1", "depth", 1) == get_employee_subtree("E1", "direct")
+    assert get_employee_subtree("E1", "depth", 2) == {"E2", "E3", "E4", "E9"}
+    assert get_employee_subtree("E1", "depth", 10) == get_employee_subtree("E1", "subtree")
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("manager_id", ["E6", "E7", "E8"])
+def test_depth_scope_is_cycle_safe(seed_org, manager_id):
+    subtree = get_employee_subtree(manager_id, "subtree")
+
+    assert get_employee_subtree(manager_id, "depth", 50) == subtree
+    bounded = Employee.objects.filter(id__in=reports_subquery([manager_id], "depth", 50))
+    assert set(bounded.exclude(id=manager_id).values_list("id", flat=True)) == subtree
+
+
+@pytest.mark.django_db
+def test_employee_distances(seed_org):
+    assert get_employee_distances("E1", "subtree") == {
+        "E2": 1, "E3": 2, "E4": 2, "E9": 2, "E5": 3, "E10": 3,
+    }
+    assert get_employee_distances("E1", "depth", 2) == {"E2": 1, "E3": 2, "E4": 2, "E9": 2}
+    assert get_employee_distances("E2", "direct") == {"E3": 1, "E4": 1, "E9": 1}
+    assert get_employee_distances("E6", "subtree") == {"E8": 1, "E7": 2}
+
+
+@pytest.mark.django_db
+def test_get_alerts_depth_scope(api_client, seed_org):
+    params = {"manager_id": "E1", "scope": "depth", "max_depth": 2}
+
+    response = api_client.get("/api/alerts", params)
+
+    assert response.status_code == 200
+    assert _alert_employees(response) == {"E2", "E3", "E4", "E9"}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "params, detail",
+    [
+        ({"scope": "depth"}, "max_depth is required"),
+        ({"scope": "depth", "max_depth": "0"}, "invalid max_depth"),
+        ({"scope": "depth", "max_depth": "two"}, "invalid max_depth"),
+        ({"include_distance": "maybe"}, "invalid include_distance"),
+    ],
+)
+def test_get_alerts_depth_validation(api_client, seed_org, params, detail):
+    response = api_client.get("/api/alerts", {"manager_id": "E1", **params})
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": detail}
+
+
+@pytest.mark.django_db
+def test_get_alerts_include_distance(api_client, seed_org):
+    params = {"manager_id": "E2", "scope": "subtree", "include_distance": "true"}
+
+    nested = api_client.get("/api/alerts", params).json()
+    sparse = api_client.get("/api/alerts", {**params, "fields": "id"}).json()
+    normalized = api_client.get("/api/alerts", {**params, "shape": "normalized"}).json()
+
+    expected = {"A13": 2, "A12": 1, "A11": 1, "A6": 2, "A4": 2, "A3": 2, "A1": 1}
+    assert {a["id"]: a["distance"] for a in nested if a["id"] in expected} == expected
+    assert sparse[0] == {"id": "A13", "distance": 2}
+    assert normalized["alerts"][0]["distance"] == 2
+    assert "distance" not in api_client.get("/api/alerts", {"manager_id": "E2"}).json()[0]
+
+
+@pytest.mark.django_db
+def test_batch_depth_scope(api_client, seed_org):
+    response = api_client.get(
+        "/api/alerts/batch", {"manager_ids": "E1,E2", "scope": "depth", "max_depth": "1"}
+    )
+
+    data = response.json()
+    assert {a["employee"]["id"] for a in data["E1"]} == {"E2"}
+    assert {a["employee"]["id"] for a in data["E2"]} == {"E3", "E4", "E9"}
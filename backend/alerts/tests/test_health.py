@@ -1,10 +1,20 @@
 import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
 from alerts.models import Employee, Alert
 
 
+@pytest.fixture(autouse=True)
+def clear_stats_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.mark.django_db
 def test_health_check_success(client):
     """Test health check returns 200 when database is accessible"""
@@ -15,13 +25,47 @@ def test_health_check_success(client):
     data = response.json()
     assert data["status"] == "healthy"
     assert data["database"] == "connected"
-    assert "employees" in data
-    assert "alerts" in data
 
 
 @pytest.mark.django_db
-def test_health_check_returns_counts(client):
-    """Test health check returns correct employee and alert counts"""
+def test_health_live_does_not_touch_database(client):
+    """Test liveness probe answers without any query"""
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse("health_live"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"status": "alive"}
+    assert len(queries) == 0
+
+
+@pytest.mark.django_db
+def test_health_ready_runs_select_one(client):
+    """Test readiness probe is a single SELECT 1, no table scans"""
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse("health_ready"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {"status": "healthy", "database": "connected"}
+    assert [q["sql"] for q in queries] == ["SELECT 1"]
+
+
+@pytest.mark.django_db
+def test_health_ready_reports_database_failure(client, monkeypatch):
+    """Test readiness probe returns 503 when the database is unreachable"""
+
+    def fail(timeout_ms):
+        raise RuntimeError("connection refused")
+
+    monkeypatch.setattr("alerts.views.ping_database", fail)
+    response = client.get(reverse("health_ready"))
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.json() == {"status": "unhealthy", "error": "connection refused"}
+
+
+@pytest.mark.django_db
+def test_health_stats_returns_counts(client):
+    """Test stats endpoint returns correct employee and alert counts"""
     # Create test data
     e1 = Employee.objects.create(id="E1", name="Test Manager")
     e2 = Employee.objects.create(id="E2", name="Test Employee", reports_to=e1)
@@ -35,10 +79,25 @@ def test_health_check_returns_counts(client):
         status="open",
     )
 
-    url = reverse("health_check")
+    url = reverse("health_stats")
     response = client.get(url)
 
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
     assert data["employees"] == 2
     assert data["alerts"] == 1
+    assert data["archived_alerts"] == 0
+    assert data["estimated"] is False
+
+
+@pytest.mark.django_db
+def test_health_stats_are_cached(client):
+    """Test repeated stats calls are served from cache"""
+    client.get(reverse("health_stats"))
+    Employee.objects.create(id="E1", name="Test Manager")
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse("health_stats"))
+
+    assert len(queries) == 0
+    assert response.json()["employees"] == 0
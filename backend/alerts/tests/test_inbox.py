@@ -0,0 +1,176 @@
+import io
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from alerts.inbox import inbox_drift, rebuild_inboxes, subtree_sizes
+from alerts.models import Alert, Employee, InboxEntry, ManagerInbox
+
+OPEN_SUBTREE = {"manager_id": "E2", "scope": "subtree", "status": "open"}
+
+
+@pytest.fixture
+def inboxes(settings, seed_org):
+    settings.MANAGER_INBOX_MIN_SUBTREE = 3
+    rebuild_inboxes(3)
+
+
+def _entries(manager_id):
+    return set(InboxEntry.objects.filter(manager_id=manager_id).values_list("alert_id", flat=True))
+
+
+def _get(client, params):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/api/alerts", params)
+    assert response.status_code == 200
+    used_inbox = any("manager_inbox_entries" in q["sql"] for q in queries.captured_queries)
+    return response.json(), used_inbox
+
+
+@pytest.mark.django_db
+def test_subtree_sizes_handle_cycles(seed_org):
+    sizes = subtree_sizes()
+
+    assert (sizes["E1"], sizes["E2"], sizes["E3"], sizes["E9"]) == (6, 5, 1, 1)
+    assert (sizes["E6"], sizes["E7"], sizes["E8"]) == (2, 2, 2)
+    assert "E5" not in sizes
+
+
+@pytest.mark.django_db
+def test_rebuild_covers_only_large_managers(inboxes):
+    assert set(ManagerInbox.objects.values_list("manager_id", flat=True)) == {"E1", "E2"}
+    assert _entries("E2") == {"A1", "A2", "A3", "A4", "A5", "A7", "A11", "A12", "A13"}
+    assert _entries("E1") == _entries("E2") | {"A14"}
+
+    rebuild_inboxes(0)
+    assert not ManagerInbox.objects.exists() and not InboxEntry.objects.exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("extra", [{}, {"severity": "high"}, {"q": "lee", "shape": "normalized"},
+                                   {"created_after": "2025-09-05", "category": "workload"}])
+def test_inbox_answers_like_the_tree_query(api_client, settings, inboxes, extra):
+    params = {**OPEN_SUBTREE, **extra}
+    from_inbox, used_inbox = _get(api_client, params)
+
+    settings.MANAGER_INBOX_MIN_SUBTREE = 0
+    expected, _ = _get(api_client, params)
+
+    assert used_inbox
+    assert from_inbox == expected
+
+
+@pytest.mark.django_db
+def test_other_requests_skip_the_inbox(api_client, inboxes):
+    for params in (
+        {"manager_id": "E2", "scope": "subtree"},  # Status: all
+        {"manager_id": "E2", "status": "open"},  # Direct
+        {**OPEN_SUBTREE, "include_archived": "true"},
+        {"manager_id": "E3", "scope": "subtree", "status": "open"},  # No inbox
+    ):
+        assert not _get(api_client, params)[1], params
+
+
+@pytest.mark.django_db
+def test_writes_fan_out_to_inboxes(api_client, inboxes):
+    api_client.post("/api/alerts/A1/dismiss")
+    api_client.generic(
+        "POST",
+        "/api/alerts/ingest",
+        b'{"id": "N1", "employee_id": "E10", "severity": "high", "category": "pay",'
+        b' "created_at": "2025-10-01T00:00:00Z"}\n'
+        b'{"id": "A14", "employee_id": "E5", "severity": "low", "category": "workload",'
+        b' "created_at": "2025-09-14T09:00:00Z"}\n'
+        b'{"id": "A8", "employee_id": "E4", "severity": "medium", "category": "engagement",'
+        b' "created_at": "2025-09-08T09:00:00Z"}\n',
+        content_type="application/x-ndjson",
+    )
+
+    # A1 dismissed; N1 new; A14 moved from E2 into E2's subtree; A8 moved in from E6
+    assert _entries("E2") == {"A2", "A3", "A4", "A5", "A7", "A8", "A11", "A12", "A13", "A14", "N1"}
+    assert _entries("E1") == _entries("E2")
+    assert all(
+        drift == {"stale": False, "missing": [], "extra": []}
+        for drift in map(inbox_drift, ManagerInbox.objects.all())
+    )
+
+
+@pytest.mark.django_db
+def test_hierarchy_change_makes_inbox_stale(api_client, inboxes):
+    employee = Employee.objects.get(id="E9")
+    employee.reports_to_id = "E5"
+    employee.save()
+
+    assert not _get(api_client, OPEN_SUBTREE)[1]  # Stale: falls back to the tree query
+
+    rebuild_inboxes(3)
+    response, used_inbox = _get(api_client, OPEN_SUBTREE)
+    assert used_inbox
+    assert {a["id"] for a in response} == _entries("E2")
+
+
+@pytest.mark.django_db
+def test_check_command_reports_and_fixes_drift(inboxes):
+    InboxEntry.objects.filter(manager_id="E2", alert_id="A3").delete()
+
+    with pytest.raises(CommandError, match="1 inboxes drifted"):
+        call_command("check_manager_inboxes", stdout=io.StringIO())
+
+    with connection.cursor() as cursor:  # Raw SQL bypasses the fan-out
+        cursor.execute("UPDATE alerts SET status = 'dismissed' WHERE id IN ('A4', 'A7')")
+    out = io.StringIO()
+    with pytest.raises(CommandError, match="2 inboxes drifted"):
+        call_command("check_manager_inboxes", stdout=out)
+    assert "E2: stale=False, missing=1 ['A3'], extra=2 ['A4', 'A7']" in out.getvalue()
+
+    call_command("check_manager_inboxes", "--fix", stdout=io.StringIO())
+    call_command("check_manager_inboxes", stdout=io.StringIO())  # Clean now
+
+
+@pytest.mark.django_db
+def test_bulk_writes_reach_the_inbox(api_client, inboxes):
+    Alert.objects.bulk_create([Alert(id="N1", employee_id="E10", severity="high",
+                                     category="pay", created_at="2025-10-01T00:00:00Z")])
+    response, used_inbox = _get(api_client, OPEN_SUBTREE)
+    assert used_inbox and "N1" in {a["id"] for a in response}
+
+    Alert.objects.filter(id__in=["N1", "A3"]).update(status="dismissed")
+    response, used_inbox = _get(api_client, OPEN_SUBTREE)
+    assert used_inbox and not {"N1", "A3"} & {a["id"] for a in response}
+    call_command("check_manager_inboxes", stdout=io.StringIO())  # No drift
+
+
+@pytest.mark.django_db
+def test_fix_drops_inboxes_below_the_threshold(settings, inboxes):
+    settings.MANAGER_INBOX_MIN_SUBTREE = 6  # E2 has 5 below now
+    employee = Employee.objects.get(id="E9")
+    employee.reports_to_id = "E5"
+    employee.save()  # Every inbox is stale
+
+    out = io.StringIO()
+    call_command("check_manager_inboxes", "--fix", stdout=out)
+
+    assert "E2: dropped, below the threshold" in out.getvalue()
+    assert list(ManagerInbox.objects.values_list("manager_id", flat=True)) == ["E1"]
+    assert not InboxEntry.objects.filter(manager_id="E2").exists()
+
+
+@pytest.mark.django_db
+def test_writes_skip_inboxes_when_off(settings, inboxes):
+    settings.MANAGER_INBOX_MIN_SUBTREE = 0
+    alert = Alert.objects.get(id="A1")
+    alert.status = "dismissed"
+
+    with CaptureQueriesContext(connection) as queries:
+        alert.save()
+
+    assert not any("manager_inbox" in q["sql"] for q in queries.captured_queries)
+
+
+@pytest.mark.django_db
+def test_rebuild_command_for_one_manager(seed_org):
+    out = io.StringIO()
+    call_command("rebuild_manager_inboxes", "--min-subtree", "3", "--manager", "E2", stdout=out)
+
+    assert "Rebuilt 1 inboxes (9 entries), removed 0" in out.getvalue()
+    assert list(ManagerInbox.objects.values_list("manager_id", flat=True)) == ["E2"]
@@ -0,0 +1,149 @@
+import io
+import json
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from alerts.ingest import iter_lines
+from alerts.models import Alert, ArchivedAlert
+
+INGEST_URL = "/api/alerts/ingest"
+
+
+def _ndjson(*rows):
+    return "\n".join(row if isinstance(row, str) else json.dumps(row) for row in rows) + "\n"
+
+
+def _alert(alert_id, employee_id="E3", **overrides):
+    row = {
+        "id": alert_id,
+        "employee_id": employee_id,
+        "severity": "high",
+        "category": "retention",
+        "created_at": "2025-10-01T09:00:00Z",
+    }
+    row.update(overrides)
+    return row
+
+
+def _post(api_client, body):
+    return api_client.generic(
+        "POST", INGEST_URL, body.encode(), content_type="application/x-ndjson"
+    )
+
+
+@pytest.mark.django_db
+def test_ingest_creates_alerts(api_client, seed_org):
+    response = _post(api_client, _ndjson(_alert("N1"), _alert("N2", "E5", status="dismissed")))
+
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["accepted"], data["rejected"], data["errors"]) == (2, 0, [])
+    assert data["batch_count"] == 1
+    assert data["batches"] == [
+        {"batch": 1, "first_line": 1, "last_line": 2, "accepted": 2, "rejected": 0}
+    ]
+
+    n2 = Alert.objects.get(id="N2")
+    assert (n2.employee_id, n2.status) == ("E5", "dismissed")
+    assert Alert.objects.get(id="N1").status == "open"  # Default
+
+
+@pytest.mark.django_db
+def test_ingest_upserts_existing_ids(api_client, seed_org):
+    body = _ndjson(
+        _alert("A1", severity="low", category="workload"),
+        _alert("A1", status="dismissed"),
+    )
+
+    response = _post(api_client, body)
+    response_again = _post(api_client, body)
+
+    assert response.json()["accepted"] == 2
+    assert response_again.json()["accepted"] == 2  # Idempotent replay
+    a1 = Alert.objects.get(id="A1")
+    assert (a1.severity, a1.status) == ("high", "dismissed")  # Last line wins
+    assert Alert.objects.count() == 14
+
+
+@pytest.mark.django_db
+def test_ingest_rejects_invalid_lines(api_client, seed_org):
+    ArchivedAlert.objects.create(
+        id="OLD", employee_id="E3", severity="low", category="workload",
+        created_at="2025-01-01T00:00:00Z",
+    )
+    body = _ndjson(
+        _alert("N1"),
+        "{not json",
+        _alert("N2", severity="critical"),
+        _alert("N3", employee_id="NOPE"),
+        _alert("N4", created_at="yesterday"),
+        _alert("N5", category="x" * 51),
+        _alert("OLD"),
+        "[1, 2]",
+    )
+
+    data = _post(api_client, body).json()
+
+    assert (data["accepted"], data["rejected"]) == (1, 7)
+    assert data["errors"] == [
+        {"line": 2, "detail": "invalid json"},
+        {"line": 3, "detail": "invalid severity"},
+        {"line": 4, "detail": "employee not found"},
+        {"line": 5, "detail": "invalid created_at"},
+        {"line": 6, "detail": "invalid category"},
+        {"line": 7, "detail": "alert is archived"},
+        {"line": 8, "detail": "invalid json"},
+    ]
+    assert Alert.objects.filter(id__startswith="N").count() == 1
+
+
+@pytest.mark.django_db
+def test_ingest_batches_with_bounded_queries(api_client, seed_org, settings):
+    settings.ALERT_INGEST_BATCH_SIZE = 2
+    settings.ALERT_INGEST_MAX_ERRORS = 1
+    body = _ndjson(_alert("N1"), _alert("N2"), _alert("N3"), "bad", "bad")
+
+    with CaptureQueriesContext(connection) as queries:
+        data = _post(api_client, body).json()
+
+    batches = [
+        (b["first_line"], b["last_line"], b["accepted"], b["rejected"]) for b in data["batches"]
+    ]
+    assert batches == [
+        (1, 2, 2, 0),
+        (3, 4, 1, 1),
+        (5, 5, 0, 1),
+    ]
+    assert data["rejected"] == 2
+    assert data["errors"] == [{"line": 4, "detail": "invalid json"}]  # Capped
+    assert data["batch_count"] == 3
+    # The all-invalid last batch never reaches the database
+    upserts = [q for q in queries.captured_queries if q["sql"].startswith('INSERT INTO "alerts"')]
+    assert len(upserts) == 2
+
+
+@pytest.mark.django_db
+def test_ingest_caps_batch_entries(api_client, seed_org, settings):
+    settings.ALERT_INGEST_BATCH_SIZE = 1
+    settings.ALERT_INGEST_MAX_BATCHES = 2
+
+    data = _post(api_client, _ndjson(_alert("N1"), _alert("N2"), _alert("N3"), "bad")).json()
+
+    assert (data["accepted"], data["rejected"], data["batch_count"]) == (3, 1, 4)
+    assert [b["batch"] for b in data["batches"]] == [1, 2]
+
+
+@pytest.mark.django_db
+def test_ingest_requires_body(api_client, seed_org):
+    response = _post(api_client, "")
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "request body is required"}
+
+
+def test_iter_lines_skips_blank_and_flags_long_lines():
+    stream = io.BytesIO(b'{"a": 1}\n\n' + b"x" * 50 + b'\n{"b": 2}')
+
+    lines = list(iter_lines(stream, max_line_bytes=20))
+
+    assert lines == [(1, b'{"a": 1}\n'), (3, b""), (4, b'{"b": 2}')]
@@ -0,0 +1,81 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from alerts.models import Employee, Alert
+from alerts.utils import get_employee_subtree
+
+# Above SQLite's default host-parameter limit (32,766), so a bound IN list fails
+SUBTREE_SIZE = 33_000
+
+
+@pytest.fixture
+def large_org(db):
+    """BIG manages LEAD, who manages SUBTREE_SIZE - 1 reports; R0 also manages BIG."""
+    Employee.objects.create(id="BIG", name="Big Boss")
+    Employee.objects.create(id="LEAD", name="Team Lead", reports_to_id="BIG")
+    Employee.objects.bulk_create(
+        [
+            Employee(id=f"R{i}", name=f"Report {i}", reports_to_id="LEAD")
+            for i in range(SUBTREE_SIZE - 1)
+        ],
+        batch_size=900,
+    )
+    # Cycle through the top of the tree
+    Employee.objects.filter(id="BIG").update(reports_to_id="R0")
+
+    now = timezone.now()
+    Alert.objects.bulk_create(
+        [
+            Alert(id="AB", employee_id="BIG", severity="high", category="workload",
+                  created_at=now, status="open"),
+            Alert(id="AL", employee_id="LEAD", severity="low", category="workload",
+                  created_at=now, status="open"),
+            Alert(id="A0", employee_id="R0", severity="high", category="retention",
+                  created_at=now, status="open"),
+            Alert(id="AN", employee_id=f"R{SUBTREE_SIZE - 2}", severity="medium",
+                  category="engagement", created_at=now, status="dismissed"),
+        ]
+    )
+
+
+@pytest.mark.django_db
+def test_get_alerts_over_sqlite_parameter_limit(api_client, large_org):
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(
+            "/api/alerts", {"manager_id": "BIG", "scope": "subtree"}
+        )
+    assert response.status_code == 200
+    assert {alert["id"] for alert in response.json()} == {"AL", "A0", "AN"}
+
+    # The subtree never reaches Python: no query binds the member IDs
+    assert all("R123" not in str(q["sql"]) for q in queries.captured_queries)
+
+
+@pytest.mark.django_db
+def test_filters_apply_on_large_subtree(api_client, large_org):
+    response = api_client.get(
+        "/api/alerts",
+        {"manager_id": "LEAD", "scope": "direct", "severity": "high"},
+    )
+    assert [alert["id"] for alert in response.json()] == ["A0"]
+
+
+@pytest.mark.django_db
+def test_batch_over_sqlite_parameter_limit(api_client, large_org):
+    response = api_client.get(
+        "/api/alerts/batch", {"manager_ids": "BIG,LEAD", "scope": "subtree"}
+    )
+    assert response.status_code == 200
+
+    data = response.json()
+    assert {alert["id"] for alert in data["BIG"]} == {"AL", "A0", "AN"}
+    # BIG is on LEAD's subtree through the R0 -> BIG edge
+    assert {alert["id"] for alert in data["LEAD"]} == {"AB", "A0", "AN"}
+
+
+@pytest.mark.django_db
+def test_get_employee_subtree_over_sqlite_parameter_limit(large_org):
+    result = get_employee_subtree("BIG", "subtree")
+    assert len(result) == SUBTREE_SIZE  # LEAD and every R
+    assert "BIG" not in result
@@ -0,0 +1,72 @@
+import logging
+import threading
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from alerts import log_handlers
+from alerts.log_handlers import SamplingFilter, install_queue_logging
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self.records = []
+        self.threads = set()
+
+    def emit(self, record):
+        self.records.append(record)
+        self.threads.add(threading.current_thread().name)
+
+
+def _record(level):
+    return logging.LogRecord("alerts", level, __file__, 1, "msg", None, None)
+
+
+def test_sampling_filter_keeps_fraction_of_info(monkeypatch):
+    sampler = SamplingFilter(rate=0.25)
+
+    monkeypatch.setattr(log_handlers.random, "random", lambda: 0.1)
+    assert sampler.filter(_record(logging.INFO))
+
+    monkeypatch.setattr(log_handlers.random, "random", lambda: 0.9)
+    assert not sampler.filter(_record(logging.INFO))
+    assert sampler.filter(_record(logging.WARNING))  # Never sampled
+    assert sampler.filter(_record(logging.ERROR))
+
+
+def test_sampling_filter_rate_one_keeps_everything():
+    assert SamplingFilter(rate=1.0).filter(_record(logging.DEBUG))
+
+
+def test_queue_logging_writes_on_background_thread(monkeypatch):
+    monkeypatch.setattr(log_handlers, "_installed", [])
+    logger = logging.getLogger("alerts.tests.queued")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    everything = RecordingHandler()
+    errors_only = RecordingHandler(level=logging.ERROR)
+    logger.addHandler(everything)
+    logger.addHandler(errors_only)
+
+    try:
+        install_queue_logging(["alerts.tests.queued"])
+        assert not any(isinstance(h, RecordingHandler) for h in logger.handlers)
+
+        logger.info("queued info")
+        logger.error("queued error")
+        log_handlers.stop_queue_logging()  # Flushes the queue
+
+        assert [r.getMessage() for r in everything.records] == ["queued info", "queued error"]
+        assert [r.getMessage() for r in errors_only.records] == ["queued error"]
+        assert threading.current_thread().name not in everything.threads
+    finally:
+        logger.handlers.clear()
+
+
+@pytest.mark.django_db
+def test_get_alerts_logs_without_count_query(api_client, seed_org):
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get("/api/alerts", {"manager_id": "E2", "scope": "subtree"})
+
+    assert response.status_code == 200
+    assert not any("COUNT(" in q["sql"] for q in queries.captured_queries)
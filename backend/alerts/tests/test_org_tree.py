@@ -0,0 +1,88 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from alerts.models import Employee
+from alerts.utils import get_employee_subtree
+
+
+def _tree(api_client, employee_id, **params):
+    return api_client.get(f"/api/employees/{employee_id}/tree", params)
+
+
+def _ids(node):
+    return [node["id"]] + [i for child in node["children"] for i in _ids(child)]
+
+
+@pytest.mark.django_db
+def test_tree_nests_reports_with_open_alert_counts(api_client, seed_org):
+    response = _tree(api_client, "E2", depth=1)
+
+    assert response.status_code == 200
+    root = response.json()
+    assert (root["id"], root["name"], root["open_alerts"], root["reports"]) == (
+        "E2", "Alex Morgan", 1, 3
+    )
+    # Children sorted by name; one level deep, deeper reports left for later
+    children = [(c["id"], c["open_alerts"], c["reports"], c["has_more"]) for c in root["children"]]
+    assert children == [
+        ("E9", 2, 1, True),  # Avery Brooks; A5, A12 (A6 is E10's)
+        ("E4", 2, 0, False),  # Casey Kim
+        ("E3", 2, 1, True),  # Jordan Lee
+    ]
+    assert all(c["children"] == [] for c in root["children"])
+    assert root["has_more"] is False
+
+
+@pytest.mark.django_db
+def test_tree_expands_lazily_from_a_node(api_client, seed_org):
+    full = _tree(api_client, "E2", depth=2).json()
+    expanded = _tree(api_client, "E9", depth=1).json()
+
+    e9 = next(c for c in full["children"] if c["id"] == "E9")
+    assert e9 == expanded
+    assert expanded["children"][0]["id"] == "E10"
+    assert expanded["children"][0]["open_alerts"] == 1  # A13; A6 is dismissed
+
+
+@pytest.mark.django_db
+def test_tree_uses_two_queries(api_client, seed_org):
+    with CaptureQueriesContext(connection) as queries:
+        _tree(api_client, "E1", depth=5)
+
+    assert len(queries) == 2
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("manager_id", ["E6", "E7", "E8"])
+def test_tree_is_cycle_safe(api_client, seed_org, manager_id):
+    root = _tree(api_client, manager_id, depth=5).json()
+
+    ids = _ids(root)
+    assert len(ids) == len(set(ids))
+    assert set(ids) - {manager_id} == get_employee_subtree(manager_id, "subtree")
+
+
+@pytest.mark.django_db
+def test_tree_depth_limit_matches_subtree(api_client, seed_org):
+    Employee.objects.create(id="E11", name="Deep Report", reports_to_id="E10")
+
+    root = _tree(api_client, "E1", depth=5).json()
+
+    assert set(_ids(root)) - {"E1"} == get_employee_subtree("E1", "subtree")
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("depth", ["0", "-1", "abc", "6"])
+def test_tree_rejects_invalid_depth(api_client, seed_org, depth):
+    response = _tree(api_client, "E2", depth=depth)
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "invalid depth"}
+
+
+@pytest.mark.django_db
+def test_tree_unknown_employee(api_client, seed_org):
+    response = _tree(api_client, "NOPE")
+
+    assert response.status_code == 404
+    assert response.json() == {"detail": "employee not found"}
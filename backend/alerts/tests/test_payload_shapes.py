@@ -0,0 +1,63 @@
+import pytest
+
+
+@pytest.mark.django_db
+def test_sparse_fieldset(api_client, seed_org):
+    response = api_client.get(
+        "/api/alerts",
+        {"manager_id": "E2", "scope": "direct", "fields": "id,severity"},
+    )
+    assert response.status_code == 200
+
+    data = response.json()
+    assert [alert["id"] for alert in data] == ["A12", "A11", "A7", "A5", "A2", "A1"]
+    assert all(set(alert) == {"id", "severity"} for alert in data)
+
+
+@pytest.mark.django_db
+def test_normalized_shape_dedupes_employees(api_client, seed_org):
+    nested = api_client.get(
+        "/api/alerts", {"manager_id": "E2", "scope": "subtree"}
+    ).json()
+    response = api_client.get(
+        "/api/alerts", {"manager_id": "E2", "scope": "subtree", "shape": "normalized"}
+    )
+    assert response.status_code == 200
+
+    data = response.json()
+    assert set(data["employees"]) == {"E3", "E4", "E5", "E9", "E10"}
+    assert data["employees"]["E3"] == {"id": "E3", "name": "Jordan Lee"}
+
+    # Same alerts, same order, same values once the employee is joined back in
+    rebuilt = [
+        {**{k: v for k, v in alert.items() if k != "employee_id"},
+         "employee": data["employees"][alert["employee_id"]]}
+        for alert in data["alerts"]
+    ]
+    assert rebuilt == nested
+
+
+@pytest.mark.django_db
+def test_normalized_shape_with_sparse_fields(api_client, seed_org):
+    response = api_client.get(
+        "/api/alerts",
+        {"manager_id": "E2", "shape": "normalized", "fields": "id,created_at"},
+    )
+    data = response.json()
+    assert data["employees"] == {}
+    assert data["alerts"][0] == {"id": "A12", "created_at": "2025-09-12T09:00:00Z"}
+
+
+@pytest.mark.django_db
+def test_invalid_response_options(api_client, seed_org):
+    response = api_client.get("/api/alerts", {"manager_id": "E2", "fields": "id,salary"})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "invalid fields"}
+
+    response = api_client.get("/api/alerts", {"manager_id": "E2", "fields": ""})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "invalid fields"}
+
+    response = api_client.get("/api/alerts", {"manager_id": "E2", "shape": "flat"})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "invalid shape"}
@@ -0,0 +1,89 @@
+import os
+import pstats
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework.test import APIClient
+from alerts.middleware import ProfilingMiddleware
+from alerts.profiling import rotate_profiles
+
+
+@pytest.fixture
+def profiling(settings, tmp_path):
+    settings.PROFILING_ENABLED = True
+    settings.PROFILING_SAMPLE_RATE = 0
+    settings.PROFILING_DIR = tmp_path
+    return tmp_path
+
+
+def _client(is_staff):
+    user = get_user_model().objects.create_user(
+        "staff" if is_staff else "member", password="pw", is_staff=is_staff
+    )
+    client = APIClient()
+    client.force_login(user)
+    return client
+
+
+def test_profiling_middleware_unused_when_disabled(settings):
+    settings.PROFILING_ENABLED = False
+
+    with pytest.raises(MiddlewareNotUsed):
+        ProfilingMiddleware(lambda request: None)
+
+
+@pytest.mark.django_db
+def test_staff_header_writes_profile_and_sql_summary(profiling, seed_org):
+    response = _client(is_staff=True).get(
+        "/api/alerts", {"manager_id": "E2", "scope": "subtree"}, HTTP_X_PROFILE="1"
+    )
+
+    assert response.status_code == 200
+    assert len(response.json()) > 0
+    profile_id = response["X-Profile-Id"]
+    assert "-get_alerts-" in profile_id
+
+    pstats.Stats(str(profiling / f"{profile_id}.prof"))  # Loadable
+    summary = (profiling / f"{profile_id}.txt").read_text()
+    assert summary.startswith("GET /api/alerts?manager_id=E2&scope=subtree\n")
+    assert "status=200" in summary
+    assert "[default]" in summary and "SELECT" in summary
+    assert "'E2'" in summary  # Parameters filled in
+    assert "function calls" in summary
+
+
+@pytest.mark.django_db
+def test_header_from_non_staff_is_ignored(profiling, seed_org):
+    response = _client(is_staff=False).get(
+        "/api/alerts", {"manager_id": "E2"}, HTTP_X_PROFILE="1"
+    )
+
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response
+    assert os.listdir(profiling) == []
+
+
+@pytest.mark.django_db
+def test_sample_rate_profiles_only_selected_views(profiling, seed_org, settings):
+    settings.PROFILING_SAMPLE_RATE = 1.0
+    client = APIClient()
+
+    dismissed = client.post("/api/alerts/A1/dismiss")
+    health = client.get("/api/health/live")
+
+    assert dismissed.json()["status"] == "dismissed"
+    assert "-dismiss_alert-" in dismissed["X-Profile-Id"]
+    assert "X-Profile-Id" not in health
+    assert len(os.listdir(profiling)) == 2
+
+
+def test_rotate_profiles_removes_oldest_first(tmp_path):
+    for n in range(5):
+        path = tmp_path / f"p{n}.prof"
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (n, n))
+    (tmp_path / "keep.log").write_bytes(b"x" * 1000)  # Not a profile file
+
+    rotate_profiles(tmp_path, max_bytes=250)
+
+    assert sorted(os.listdir(tmp_path)) == ["keep.log", "p3.prof", "p4.prof"]
@@ -0,0 +1,77 @@
+import gzip
+import json
+from datetime import datetime, timezone
+import pytest
+from rest_framework.renderers import JSONRenderer
+from alerts import renderers
+from alerts.renderers import FastJSONRenderer
+from alerts.serializers import AlertSerializer
+from alerts.models import Alert
+
+
+@pytest.mark.django_db
+def test_fast_renderer_matches_stock_renderer(seed_org):
+    data = AlertSerializer(Alert.objects.all(), many=True).data
+
+    fast = FastJSONRenderer().render(data)
+    stock = JSONRenderer().render(data)
+    assert json.loads(fast) == json.loads(stock)
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_fast_renderer_encodes_datetimes_like_drf(monkeypatch, use_orjson):
+    if not use_orjson:
+        monkeypatch.setattr(renderers, "orjson", None)
+    elif renderers.orjson is None:
+        pytest.skip("orjson not installed")
+
+    data = {
+        "created_at": datetime(2025, 9, 1, 9, 0, tzinfo=timezone.utc),
+        "note": "line\u2028break",
+    }
+    rendered = json.loads(FastJSONRenderer().render(data))
+    assert rendered == json.loads(JSONRenderer().render(data))
+    assert rendered["created_at"] == "2025-09-01T09:00:00Z"
+    assert b"\\u2028" in FastJSONRenderer().render(data)
+
+
+def test_fast_renderer_handles_none():
+    assert FastJSONRenderer().render(None) == b""
+
+
+@pytest.mark.django_db
+def test_large_responses_are_gzipped(api_client, seed_org, settings):
+    settings.RESPONSE_COMPRESSION = {
+        "MIN_SIZE": 200,
+        "GZIP_LEVEL": 6,
+        "BROTLI_QUALITY": 5,
+    }
+    params = {"manager_id": "E2", "scope": "subtree"}
+    plain = api_client.get("/api/alerts", params)
+    compressed = api_client.get("/api/alerts", params, HTTP_ACCEPT_ENCODING="gzip")
+
+    assert compressed["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed["Vary"]
+    assert len(compressed.content) < len(plain.content)
+    assert gzip.decompress(compressed.content) == plain.content
+
+
+@pytest.mark.django_db
+def test_small_responses_and_refused_encodings_are_not_compressed(
+    api_client, seed_org, settings
+):
+    settings.RESPONSE_COMPRESSION = {
+        "MIN_SIZE": 100_000,
+        "GZIP_LEVEL": 6,
+        "BROTLI_QUALITY": 5,
+    }
+    response = api_client.get(
+        "/api/alerts", {"manager_id": "E2"}, HTTP_ACCEPT_ENCODING="gzip"
+    )
+    assert not response.has_header("Content-Encoding")
+
+    settings.RESPONSE_COMPRESSION = {**settings.RESPONSE_COMPRESSION, "MIN_SIZE": 0}
+    response = api_client.get(
+        "/api/alerts", {"manager_id": "E2"}, HTTP_ACCEPT_ENCODING="gzip;q=0"
+    )
+    assert not response.has_header("Content-Encoding")
@@ -0,0 +1,154 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+import pytest
+from django.test import RequestFactory
+from django.http import HttpResponse
+from alerts import middleware, routers
+from alerts.middleware import ReplicaPinningMiddleware
+from alerts.models import Alert
+from alerts.routers import (
+    LAST_WRITE_COOKIE,
+    LAST_WRITE_HEADER,
+    ReadReplicaRouter,
+    pinned_to_primary,
+)
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+
+@pytest.fixture
+def with_replica(monkeypatch):
+    """Behave as if a "replica" alias were configured."""
+    monkeypatch.setattr(routers, "replica_configured", lambda: True)
+    monkeypatch.setattr(middleware, "replica_configured", lambda: True)
+
+
+def test_without_replica_everything_uses_default():
+    router = ReadReplicaRouter()
+    assert router.db_for_read(Alert) == "default"
+    assert router.db_for_write(Alert) == "default"
+
+
+def test_reads_go_to_replica_and_writes_to_primary(with_replica):
+    router = ReadReplicaRouter()
+    assert router.db_for_read(Alert) == "replica"
+    assert router.db_for_write(Alert) == "default"
+    assert router.allow_migrate("default", "alerts")
+    assert not router.allow_migrate("replica", "alerts")
+
+
+def _routed(request):
+    """Run the middleware around a view that records where reads would go."""
+    seen = {}
+
+    def view(req):
+        seen["alias"] = ReadReplicaRouter().db_for_read(Alert)
+        seen["pinned"] = pinned_to_primary()
+        return HttpResponse(status=200)
+
+    response = ReplicaPinningMiddleware(view)(request)
+    return seen["alias"], response
+
+
+def test_writes_pin_only_the_writing_client(with_replica, settings):
+    factory = RequestFactory()
+    assert _routed(factory.get("/api/alerts"))[0] == "replica"
+
+    # The dismiss itself reads from the primary and stamps the response
+    alias, response = _routed(factory.post("/api/alerts/A1/dismiss"))
+    assert alias == "default"
+    stamp = response[LAST_WRITE_HEADER]
+    assert response.cookies[LAST_WRITE_COOKIE].value == stamp
+    assert response.cookies[LAST_WRITE_COOKIE]["max-age"] == settings.REPLICA_STICKY_SECONDS
+
+    # That client's refetch (cookie or echoed header) reads from the primary
+    with_cookie = factory.get("/api/alerts")
+    with_cookie.COOKIES[LAST_WRITE_COOKIE] = stamp
+    assert _routed(with_cookie)[0] == "default"
+    assert _routed(factory.get("/api/alerts", HTTP_X_ALERTS_LAST_WRITE=stamp))[0] == "default"
+    assert not pinned_to_primary()  # Only while the request runs
+
+    # Everyone else keeps using the replica
+    assert _routed(factory.get("/api/alerts"))[0] == "replica"
+
+    expired = f"{time.time() - settings.REPLICA_STICKY_SECONDS - 1:.3f}"
+    assert _routed(factory.get("/api/alerts", HTTP_X_ALERTS_LAST_WRITE=expired))[0] == "replica"
+    assert _routed(factory.get("/api/alerts", HTTP_X_ALERTS_LAST_WRITE="soon"))[0] == "replica"
+
+
+def test_failed_writes_do_not_pin(with_replica):
+    def failing_view(request):
+        return HttpResponse(status=404)
+
+    response = ReplicaPinningMiddleware(failing_view)(RequestFactory().post("/api/alerts/X/dismiss"))
+    assert LAST_WRITE_HEADER not in response
+    assert LAST_WRITE_COOKIE not in response.cookies
+
+
+@pytest.mark.django_db
+def test_dismiss_then_read_shows_dismissed(api_client, seed_org):
+    """Through the full stack (replica mirrors default in tests)."""
+    api_client.post("/api/alerts/A1/dismiss")
+    data = api_client.get("/api/alerts", {"manager_id": "E2"}).json()
+    assert {a["id"]: a["status"] for a in data}["A1"] == "dismissed"
+
+
+# Runs in a fresh interpreter: a primary and a replica as two real SQLite
+# files, the replica copied before the dismiss and therefore stale.
+TWO_FILE_SCRIPT = """
+import json, sqlite3, sys
+import django
+django.setup()
+from django.core.management import call_command
+from django.db import connections
+from django.test import Client
+from alerts.routers import pin_to_primary
+
+call_command("migrate", verbosity=0)
+with pin_to_primary():  # The replica file is still empty
+    call_command("load_seed_data", verbosity=0)
+connections.close_all()
+with sqlite3.connect(sys.argv[1]) as primary, sqlite3.connect(sys.argv[2]) as replica:
+    primary.backup(replica)
+
+def statuses(client, **headers):
+    response = client.get("/api/alerts", {"manager_id": "E2"}, **headers)
+    return {a["id"]: a["status"] for a in response.json()}
+
+writer = Client()
+dismiss = writer.post("/api/alerts/A1/dismiss")
+print(json.dumps({
+    "writer": statuses(writer)["A1"],
+    "echoed_header": statuses(Client(), HTTP_X_ALERTS_LAST_WRITE=dismiss["X-Alerts-Last-Write"])["A1"],
+    "other_client": statuses(Client())["A1"],
+}))
+"""
+
+
+def test_dismiss_then_read_against_stale_sqlite_replica(tmp_path):
+    primary, replica = tmp_path / "primary.sqlite3", tmp_path / "replica.sqlite3"
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": "config.settings",
+        "SQLITE_PATH": str(primary),
+        "SQLITE_REPLICA_PATH": str(replica),
+        "ALLOWED_HOSTS": "testserver",
+        "HIERARCHY_SNAPSHOT_PATH": "",
+    }
+    env.pop("DATABASE_URL", None)
+
+    result = subprocess.run(
+        [sys.executable, "-c", TWO_FILE_SCRIPT, str(primary), str(replica)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=120,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == {
+        "writer": "dismissed",  # Cookie from the dismiss response
+        "echoed_header": "dismissed",
+        "other_client": "open",  # Proves reads really go to the stale replica
+    }
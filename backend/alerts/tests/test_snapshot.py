@@ -0,0 +1,137 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from alerts import snapshot as snapshot_module
+from alerts.models import Employee
+from alerts.snapshot import HierarchySnapshot, build_snapshot, fresh_snapshot, hierarchy_stamp
+from alerts.utils import (
+    _load_children,
+    _walk,
+    get_employee_distances,
+    get_employee_subtrees,
+)
+
+
+@pytest.fixture
+def snapshot_path(settings, tmp_path):
+    path = tmp_path / "hierarchy.snap"
+    settings.HIERARCHY_SNAPSHOT_PATH = str(path)
+    snapshot_module.reset_snapshot()
+    yield path
+    snapshot_module.reset_snapshot()
+
+
+@pytest.fixture
+def built(seed_org, snapshot_path):
+    build_snapshot(snapshot_path)
+    snap = HierarchySnapshot(snapshot_path)
+    yield snap
+    snap.close()
+
+
+@pytest.mark.django_db
+def test_snapshot_layout(built):
+    assert built.count == 10
+    assert [built.id_at(i) for i in range(built.count)] == sorted(
+        Employee.objects.values_list("id", flat=True)
+    )
+    assert built.index_of("E10") == 1  # Sorted as strings
+    assert built.index_of("NOPE") is None
+
+    e2 = built.index_of("E2")
+    assert built.id_at(built.parent(e2)) == "E1"
+    assert built.parent(built.index_of("E1")) == -1
+    assert {built.id_at(i) for i in built.children(e2)} == {"E3", "E4", "E9"}
+
+    on_cycle = {built.id_at(i) for i in range(built.count) if built.on_cycle(i)}
+    assert on_cycle == {"E6", "E7", "E8"}
+    assert built.matches(hierarchy_stamp())
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("scope, max_depth", [("direct", None), ("subtree", None), ("depth", 2)])
+def test_snapshot_walk_matches_database(built, scope, max_depth):
+    for manager_id in Employee.objects.values_list("id", flat=True):
+        children = _load_children([manager_id], scope, max_depth)
+        expected = _walk(manager_id, children, 1 if scope == "direct" else max_depth)
+
+        got = built.distances(manager_id, scope, max_depth)
+
+        assert {built.id_at(i): d for i, d in got.items()} == expected, manager_id
+
+
+@pytest.mark.django_db
+def test_fresh_snapshot_serves_traversal_without_edge_query(built):
+    with CaptureQueriesContext(connection) as queries:
+        result = get_employee_subtrees(["E2", "E7"], "subtree")
+        distances = get_employee_distances("E1", "depth", 2)
+
+    assert result == {"E2": {"E3", "E4", "E5", "E9", "E10"}, "E7": {"E6", "E8"}}
+    assert distances == {"E2": 1, "E3": 2, "E4": 2, "E9": 2}
+    # Only the stamp lookups: no recursive CTE, no edge rows
+    assert all("hierarchy_version" in q["sql"] for q in queries.captured_queries)
+
+
+@pytest.mark.django_db
+def test_employee_change_makes_snapshot_stale(built):
+    assert fresh_snapshot() is not None
+
+    Employee.objects.create(id="E11", name="New Hire", reports_to_id="E9")
+
+    assert fresh_snapshot() is None
+    assert get_employee_subtrees(["E9"], "subtree") == {"E9": {"E10", "E11"}}  # Database path
+
+
+@pytest.mark.django_db
+def test_rename_keeps_snapshot_fresh(built):
+    employee = Employee.objects.get(id="E3")
+    employee.name = "Jordan Lee-Park"
+    employee.save()
+    Employee.objects.filter(id="E4").update(name="Casey Kim-Ng")
+
+    assert fresh_snapshot() is not None
+
+    employee.reports_to_id = "E4"
+    employee.save()
+
+    assert fresh_snapshot() is None
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("bulk_write", [
+    lambda: Employee.objects.filter(id__in=["E3", "E4"]).update(reports_to_id="E9"),
+    lambda: Employee.objects.bulk_update(
+        [Employee(id="E3", reports_to_id="E9")], ["reports_to"]
+    ),
+    lambda: Employee.objects.bulk_create([Employee(id="E11", name="New", reports_to_id="E9")]),
+])
+def test_bulk_hierarchy_writes_make_snapshot_stale(built, bulk_write):
+    assert fresh_snapshot() is not None
+
+    bulk_write()
+
+    assert fresh_snapshot() is None
+
+
+@pytest.mark.django_db
+def test_snapshot_from_another_database_is_stale(built, snapshot_path):
+    assert fresh_snapshot() is not None
+
+    snapshot_module.HierarchyVersion.objects.all().delete()
+    snapshot_module.bump_hierarchy_version()  # New row, new token, same version
+
+    assert fresh_snapshot() is None
+
+
+@pytest.mark.django_db
+def test_build_command_replaces_mapped_snapshot(seed_org, snapshot_path):
+    call_command("build_hierarchy_snapshot")
+    first = fresh_snapshot()
+    assert first is not None and first.count == 10
+
+    Employee.objects.create(id="E11", name="New Hire", reports_to_id="E9")
+    call_command("build_hierarchy_snapshot")
+
+    second = fresh_snapshot()
+    assert second is not first and second.count == 11
@@ -0,0 +1,30 @@
+import pytest
+from django.conf import settings
+from django.db import connection
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != "sqlite"
+    or getattr(settings, "SQLITE_PROFILE", None) != "concurrent",
+    reason="concurrent SQLite profile not active",
+)
+
+
+def _pragma(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db
+def test_concurrent_profile_pragmas_applied_per_connection():
+    assert _pragma("busy_timeout") == 5000
+    assert _pragma("synchronous") == 1  # NORMAL
+    assert _pragma("cache_size") == -20000
+    assert _pragma("temp_store") == 2  # MEMORY
+
+
+def test_concurrent_profile_settings():
+    db = settings.DATABASES["default"]
+    assert db["CONN_MAX_AGE"] > 0
+    assert db["OPTIONS"]["transaction_mode"] == "IMMEDIATE"
+    assert "PRAGMA journal_mode=WAL" in db["OPTIONS"]["init_command"]
@@ -0,0 +1,190 @@
+import io
+import time
+from datetime import timedelta
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+from alerts import tasks
+from alerts.models import Alert, Employee, ManagerInbox, Task
+from alerts.tasks import Worker, claim_task, enqueue, requeue_stale_tasks, run_task, task_stats
+
+
+@pytest.fixture
+def flaky_task(settings):
+    """Registered task that fails until its second attempt."""
+    settings.TASK_RETRY_BACKOFF_SECONDS = 10
+    calls = []
+
+    def flaky(fail_times=1):
+        calls.append(fail_times)
+        if len(calls) <= fail_times:
+            raise RuntimeError("boom")
+        return {"calls": len(calls)}
+
+    tasks.TASKS["flaky"] = flaky
+    yield calls
+    del tasks.TASKS["flaky"]
+
+
+@pytest.mark.django_db
+def test_enqueue_dedupes_pending_tasks():
+    first = enqueue("archive_alerts", older_than_days=30)
+
+    assert enqueue("archive_alerts", older_than_days=30).pk == first.pk
+    assert enqueue("archive_alerts", older_than_days=60).pk != first.pk
+    assert enqueue("archive_alerts", dedupe=False, older_than_days=30).pk != first.pk
+
+    claim_task()  # First is running now: the next one queues again
+    assert enqueue("archive_alerts", older_than_days=30).pk != first.pk
+
+    with pytest.raises(ValueError, match="unknown task"):
+        enqueue("nope")
+
+
+@pytest.mark.django_db
+def test_claim_respects_run_after_and_order():
+    later = enqueue("archive_alerts", delay=60)
+    first = enqueue("build_hierarchy_snapshot")
+    second = enqueue("reconcile_manager_inboxes")
+
+    assert [claim_task().pk, claim_task().pk, claim_task()] == [first.pk, second.pk, None]
+    assert claim_task(now=timezone.now() + timedelta(seconds=61)).pk == later.pk
+    assert Task.objects.get(pk=first.pk).attempts == 1
+
+
+@pytest.mark.django_db
+def test_failed_attempts_retry_with_backoff_then_fail(flaky_task):
+    queued = enqueue("flaky", fail_times=5)
+
+    assert run_task(claim_task()) == "pending"
+    retried = Task.objects.get(pk=queued.pk)
+    assert retried.last_error == "RuntimeError: boom"
+    assert retried.run_after >= timezone.now() + timedelta(seconds=9)
+    assert claim_task() is None  # Not due yet
+
+    later = timezone.now() + timedelta(seconds=60)
+    assert run_task(claim_task(now=later)) == "pending"  # Attempt 2, next backoff is 20s
+    assert run_task(claim_task(now=later + timedelta(seconds=60))) == "failed"
+    assert Task.objects.get(pk=queued.pk).attempts == 3
+
+
+@pytest.mark.django_db
+def test_success_records_result_and_timing(flaky_task):
+    enqueue("flaky", fail_times=1)
+    run_task(claim_task())
+    done = run_task(claim_task(now=timezone.now() + timedelta(seconds=60)))
+
+    finished = Task.objects.get()
+    assert done == "done"
+    assert finished.result == {"calls": 2}
+    assert finished.duration_ms >= 0 and finished.finished_at is not None
+    assert finished.last_error == ""
+    assert task_stats()["flaky"]["done"] == 1
+
+
+@pytest.mark.django_db
+def test_tasks_without_heartbeat_are_requeued():
+    enqueue("archive_alerts")
+    enqueue("reconcile_manager_inboxes")
+    lost, beating = claim_task(), claim_task()
+    two_hours_ago = timezone.now() - timedelta(hours=2)
+    Task.objects.update(started_at=two_hours_ago)
+    Task.objects.filter(pk=lost.pk).update(heartbeat_at=two_hours_ago)
+
+    assert requeue_stale_tasks(3600) == 1
+    assert Task.objects.get(pk=lost.pk).status == "pending"
+    assert Task.objects.get(pk=beating.pk).status == "running"  # Long, but alive
+
+
+@pytest.mark.django_db
+def test_worker_beat_refreshes_own_tasks_and_requeues_lost_ones():
+    enqueue("archive_alerts")
+    enqueue("reconcile_manager_inboxes")
+    mine, lost = claim_task(), claim_task()
+    Task.objects.update(heartbeat_at=timezone.now() - timedelta(hours=2))
+
+    Worker(stale_seconds=60)._beat([mine.pk])
+
+    assert Task.objects.get(pk=mine.pk).heartbeat_at > timezone.now() - timedelta(seconds=60)
+    assert Task.objects.get(pk=mine.pk).status == "running"
+    assert Task.objects.get(pk=lost.pk).status == "pending"
+    assert Task.objects.get(pk=lost.pk).last_error == "no heartbeat for 60s"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_worker_beats_while_tasks_run(monkeypatch):
+    beats = []
+    monkeypatch.setattr(Worker, "_beat", lambda self, task_ids: beats.append(list(task_ids)))
+    tasks.TASKS["nap"] = lambda: time.sleep(0.3)
+    try:
+        enqueue("nap")
+        Worker(poll_seconds=0.02, heartbeat_seconds=0.05).run(once=True)
+    finally:
+        del tasks.TASKS["nap"]
+
+    assert beats[0] == []  # Requeues stale tasks before the first claim
+    assert sum(1 for task_ids in beats if task_ids) >= 3  # The running task, repeatedly
+
+
+@pytest.mark.django_db
+def test_employee_change_queues_rebuilds_once(settings, seed_org, tmp_path):
+    settings.BACKGROUND_TASKS = True
+    settings.MANAGER_INBOX_MIN_SUBTREE = 3
+    settings.HIERARCHY_SNAPSHOT_PATH = str(tmp_path / "hierarchy.snap")
+
+    for employee_id in ("E9", "E4"):
+        employee = Employee.objects.get(id=employee_id)
+        employee.reports_to_id = "E3"
+        employee.save()
+
+    assert sorted(Task.objects.values_list("name", "status")) == [
+        ("build_hierarchy_snapshot", "pending"), ("rebuild_manager_inboxes", "pending"),
+    ]
+
+
+@pytest.mark.django_db
+def test_hierarchy_tasks_run(settings, seed_org, tmp_path):
+    settings.MANAGER_INBOX_MIN_SUBTREE = 3
+    settings.HIERARCHY_SNAPSHOT_PATH = str(tmp_path / "hierarchy.snap")
+    enqueue("build_hierarchy_snapshot")
+    enqueue("rebuild_manager_inboxes")
+
+    while (claimed := claim_task()) is not None:
+        assert run_task(claimed) == "done"
+
+    assert (tmp_path / "hierarchy.snap").exists()
+    assert set(ManagerInbox.objects.values_list("manager_id", flat=True)) == {"E1", "E2"}
+    assert Task.objects.get(name="rebuild_manager_inboxes").result["built"]["E2"] == 9
+
+
+@pytest.mark.django_db(transaction=True)
+def test_run_worker_drains_queue(seed_org):
+    Alert.objects.filter(id="A6").update(created_at="2020-01-01T00:00:00Z")
+    enqueue("archive_alerts")
+    enqueue("reconcile_manager_inboxes")
+
+    out = io.StringIO()
+    # One thread: the in-memory test database has table locks, not busy waits
+    call_command("run_worker", "--once", "--threads", "1", stdout=out)
+
+    assert "Worker stopped after 2 tasks" in out.getvalue()
+    assert not Alert.objects.filter(id="A6").exists()
+    assert set(Task.objects.values_list("status", flat=True)) == {"done"}
+
+    out = io.StringIO()
+    call_command("run_worker", "--stats", stdout=out)
+    assert "archive_alerts: 0 pending, 0 running, 1 done, 0 failed, avg" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_enqueue_task_command():
+    out = io.StringIO()
+    call_command(
+        "enqueue_task", "rebuild_manager_inboxes", "--kwargs", '{"manager_ids": ["E2"]}', stdout=out
+    )
+
+    assert Task.objects.get().kwargs == {"manager_ids": ["E2"]}
+    with pytest.raises(CommandError, match="unknown task"):
+        call_command("enqueue_task", "nope")
+    with pytest.raises(CommandError, match="JSON object"):
+        call_command("enqueue_task", "archive_alerts", "--kwargs", "[1]")
@@ -0,0 +1,63 @@
+import pytest
+
+
+@pytest.mark.django_db
+def test_created_after_and_before_window(api_client, seed_org):
+    response = api_client.get(
+        "/api/alerts",
+        {
+            "manager_id": "E2",
+            "scope": "subtree",
+            "created_after": "2025-09-03T09:00:00Z",
+            "created_before": "2025-09-11T09:00:00Z",
+        },
+    )
+    assert response.status_code == 200
+    # After is inclusive (A3), before is exclusive (A11)
+    assert [alert["id"] for alert in response.json()] == ["A7", "A6", "A5", "A4", "A3"]
+
+
+@pytest.mark.django_db
+def test_date_only_and_naive_values_are_utc(api_client, seed_org):
+    response = api_client.get(
+        "/api/alerts",
+        {"manager_id": "E2", "scope": "subtree", "created_after": "2025-09-12"},
+    )
+    assert [alert["id"] for alert in response.json()] == ["A13", "A12"]
+
+    response = api_client.get(
+        "/api/alerts",
+        {"manager_id": "E2", "scope": "direct", "created_before": "2025-09-02T09:00:00"},
+    )
+    assert [alert["id"] for alert in response.json()] == ["A1"]
+
+
+@pytest.mark.django_db
+def test_offset_timestamps(api_client, seed_org):
+    response = api_client.get(
+        "/api/alerts",
+        {"manager_id": "E2", "created_after": "2025-09-12T11:00:00+02:00"},
+    )
+    assert [alert["id"] for alert in response.json()] == ["A12"]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("param", ["created_after", "created_before"])
+@pytest.mark.parametrize("value", ["yesterday", "2025-13-01", "2025-09-01T25:00:00"])
+def test_invalid_timestamps(api_client, seed_org, param, value):
+    response = api_client.get("/api/alerts", {"manager_id": "E2", param: value})
+    assert response.status_code == 400
+    assert response.json() == {"detail": f"invalid {param}"}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("after, before", [
+    ("2025-09-10", "2025-09-10"),
+    ("2025-09-11T00:00:00Z", "2025-09-10"),
+])
+def test_empty_window_is_rejected(api_client, seed_org, after, before):
+    response = api_client.get(
+        "/api/alerts", {"manager_id": "E2", "created_after": after, "created_before": before}
+    )
+    assert response.status_code == 400
+    assert response.json() == {"detail": "created_after must be before created_before"}
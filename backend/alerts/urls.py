@@ -3,6 +3,13 @@ from . import views
 
 urlpatterns = [
     path("health", views.health_check, name="health_check"),
+    path("health/live", views.health_live, name="health_live"),
+    path("health/ready", views.health_ready, name="health_ready"),
+    path("health/stats", views.health_stats, name="health_stats"),
     path("alerts", views.get_alerts, name="get_alerts"),
+    path("alerts/batch", views.get_alerts_batch, name="get_alerts_batch"),
+    path("alerts/export", views.export_alerts, name="export_alerts"),
+    path("alerts/ingest", views.ingest_alerts_view, name="ingest_alerts"),
     path("alerts/<str:alert_id>/dismiss", views.dismiss_alert, name="dismiss_alert"),
+    path("employees/<str:employee_id>/tree", views.get_employee_tree, name="employee_tree"),
 ]
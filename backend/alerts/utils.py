@@ -1,44 +1,169 @@
-from typing import Set
-from collections import deque
+from typing import Dict, Iterable, List, Optional, Set
+from django.db.models.expressions import RawSQL
 from .models import Employee
+from .snapshot import fresh_snapshot
 
 
-def get_employee_subtree(manager_id: str, scope: str) -> Set[str]:
+def get_employee_subtree(manager_id: str, scope: str, max_depth: Optional[int] = None) -> Set[str]:
     """
     Returns set of employee IDs under a manager (excluding manager).
     Args:
         manager_id: The manager's employee ID
-        scope: "direct" for direct reports only, "subtree" for full tree
+        scope: "direct" for direct reports only, "subtree" for full tree,
+               "depth" for reports down to max_depth levels
+        max_depth: Levels below the manager for "depth" (1 = direct reports)
     Returns:
         Set of employee IDs (excluding manager_id)
     Time Complexity: O(n) where n is number of employees
     Space Complexity: O(n) for visited set and queue
     """
+    return get_employee_subtrees([manager_id], scope, max_depth)[manager_id]
+
+
+def get_employee_subtrees(
+    manager_ids: Iterable[str], scope: str, max_depth: Optional[int] = None
+) -> Dict[str, Set[str]]:
+    """
+    Returns employee IDs under each of several managers (excluding each manager).
+    The reporting edges below all managers are loaded in one query (see
+    reports_subquery), so a branch shared by several managers (e.g. a
+    skip-level and their directs) is fetched once.
+    Args:
+        manager_ids: The managers' employee IDs
+        scope: "direct", "subtree" or "depth" (with max_depth)
+        max_depth: Levels below each manager for "depth"
+    Returns:
+        Dict of manager_id -> set of employee IDs (excluding that manager)
+    Time Complexity: O(n + k*s) where s is the largest subtree of k managers
+    Space Complexity: O(n) for the shared children map
+    """
+    roots = list(dict.fromkeys(manager_ids))
+
+    # Prebuilt snapshot when it matches the database: no edge query at all
+    snapshot = fresh_snapshot()
+    if snapshot is not None:
+        return {root: snapshot.subtree(root, scope, max_depth) for root in roots}
+
+    children = _load_children(roots, scope, max_depth)
+
     if scope == "direct":
-        # Simple case: just get direct reports
-        direct_reports = Employee.objects.filter(reports_to_id=manager_id).values_list(
-            "id", flat=True
-        )
-        return set(direct_reports)
+        return {root: set(children.get(root, ())) - {root} for root in roots}
+
+    return {root: set(_walk(root, children, max_depth)) for root in roots}
+
+
+def get_employee_distances(
+    manager_id: str, scope: str, max_depth: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    Like get_employee_subtree, but maps each employee ID to its distance
+    from the manager (1 = direct report). On a reporting cycle the
+    shortest distance wins.
+    """
+    snapshot = fresh_snapshot()
+    if snapshot is not None:
+        distances = snapshot.distances(manager_id, scope, max_depth)
+        return {snapshot.id_at(i): distance for i, distance in distances.items()}
+
+    children = _load_children([manager_id], scope, max_depth)
+    if scope == "direct":
+        reports = children.get(manager_id, ())
+        return {report_id: 1 for report_id in reports if report_id != manager_id}
+    return _walk(manager_id, children, max_depth)
+
+
+def _load_children(
+    roots: List[str], scope: str, max_depth: Optional[int]
+) -> Dict[str, List[str]]:
+    """Children map (parent ID -> report IDs) of everything below roots, in one query."""
+    children: Dict[str, List[str]] = {}
+    edges = Employee.objects.filter(
+        id__in=reports_subquery(roots, scope, max_depth)
+    ).values_list("id", "reports_to_id")
+    for report_id, parent_id in edges:
+        children.setdefault(parent_id, []).append(report_id)
+    return children
+
 
-    # Subtree case: BFS with cycle detection
-    result: Set[str] = set()
-    visited: Set[str] = set()
-    queue = deque([manager_id])
-    visited.add(manager_id)
+def reports_subquery(manager_ids: Iterable[str], scope: str, max_depth: Optional[int] = None):
+    """
+    Subquery selecting the IDs of every employee below any of manager_ids.
+    Meant for ``employee_id__in=...`` so the database resolves the hierarchy
+    itself: no ID list is bound as parameters, whatever the subtree size.
+    "subtree" is a recursive CTE; UNION (not UNION ALL) drops rows already
+    seen, which makes it terminate on reporting cycles. A manager can be in
+    the result if it sits below another manager or on a cycle; use
+    scope_subquery for a single manager's scope.
+    Args:
+        manager_ids: The managers' employee IDs
+        scope: "direct" for direct reports only, "subtree" for full tree,
+               "depth" for reports down to max_depth levels
+        max_depth: Stop the recursion after this many levels (1 = direct
+                   reports) instead of walking the whole tree; required
+                   for "depth", optional for "subtree"
+    """
+    roots = list(manager_ids)
+    if scope == "direct" or max_depth == 1:
+        return Employee.objects.filter(reports_to_id__in=roots).values("id")
 
-    while queue:
-        current_id = queue.popleft()
+    table = Employee._meta.db_table
+    parent = Employee._meta.get_field("reports_to").column
+    placeholders = ", ".join(["%s"] * len(roots))
 
-        # Get all direct reports of current employee
-        reports = Employee.objects.filter(reports_to_id=current_id).values_list(
-            "id", flat=True
+    if max_depth is None:
+        sql = (
+            f"WITH RECURSIVE subtree(id) AS ("
+            f"SELECT id FROM {table} WHERE {parent} IN ({placeholders}) "
+            f"UNION "
+            f"SELECT e.id FROM {table} e JOIN subtree s ON e.{parent} = s.id"
+            f") SELECT id FROM subtree"
         )
+        return RawSQL(sql, roots)
+
+    # Rows carry their depth, so UNION no longer collapses a cycle; the
+    # depth bound is what ends the recursion
+    sql = (
+        f"WITH RECURSIVE subtree(id, depth) AS ("
+        f"SELECT id, 1 FROM {table} WHERE {parent} IN ({placeholders}) "
+        f"UNION "
+        f"SELECT e.id, s.depth + 1 FROM {table} e JOIN subtree s ON e.{parent} = s.id "
+        f"WHERE s.depth < %s"
+        f") SELECT id FROM subtree"
+    )
+    return RawSQL(sql, [*roots, max_depth])
+
+
+def scope_subquery(manager_id: str, scope: str, max_depth: Optional[int] = None):
+    """
+    Subquery selecting the IDs in get_employee_subtree(manager_id, scope),
+    evaluated by the database. Excludes the manager, like the BFS does.
+    """
+    return Employee.objects.filter(
+        id__in=reports_subquery([manager_id], scope, max_depth)
+    ).exclude(id=manager_id).values("id")
+
+
+def _walk(
+    manager_id: str, children: Dict[str, List[str]], max_depth: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    Level-order BFS with cycle detection over a preloaded children map.
+    Stops after max_depth levels. Returns employee ID -> distance.
+    """
+    distances: Dict[str, int] = {}
+    visited: Set[str] = {manager_id}
+    level = [manager_id]
+    depth = 0
 
-        for report_id in reports:
-            if report_id not in visited:
-                visited.add(report_id)
-                result.add(report_id)  # Exclude manager, add all descendants
-                queue.append(report_id)
+    while level and (max_depth is None or depth < max_depth):
+        depth += 1
+        next_level = []
+        for current_id in level:
+            for report_id in children.get(current_id, ()):
+                if report_id not in visited:
+                    visited.add(report_id)
+                    distances[report_id] = depth  # Exclude manager, add all descendants
+                    next_level.append(report_id)
+        level = next_level
 
-    return result
+    return distances
@@ -1,132 +1,383 @@
 import logging
+import re
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from django.db import connection
-from django.http import JsonResponse
-from django.db.models import Q
-from .models import Employee, Alert
-from .serializers import AlertSerializer
-from .utils import get_employee_subtree
+from django.http import JsonResponse, StreamingHttpResponse
+from django.conf import settings
+from django.db import router
+from .models import Employee, Alert, ArchivedAlert
+from .archive import merge_alert_streams
+from .serializers import AlertSerializer, serialize_alert_rows, serialize_alerts_normalized
+from .coalesce import SingleFlight
+from .columnar import columnar_alerts
+from .export import iter_csv, iter_export_rows
+from .inbox import inbox_alerts
+from .filters import (
+    InvalidFilter,
+    parse_alert_filters,
+    parse_depth,
+    parse_response_options,
+    alert_querysets,
+)
+from .ingest import ingest_alerts, iter_lines
+from .routers import pinned_to_primary
+from .stats import ping_database, table_row_counts
+from .tree import build_org_tree
+from .utils import (
+    get_employee_distances,
+    get_employee_subtrees,
+    reports_subquery,
+    scope_subquery,
+)
 
 logger = logging.getLogger("alerts")
 
+# In-flight (and, with ALERTS_COALESCE_FRESH_SECONDS, just-finished)
+# get_alerts computations; cleared by every alert write in this process
+alert_requests = SingleFlight(
+    fresh_seconds=settings.ALERTS_COALESCE_FRESH_SECONDS,
+    wait_seconds=settings.ALERTS_COALESCE_WAIT_SECONDS,
+)
+
 
 @api_view(["GET", "HEAD"])
 def health_check(request):
     """
     Health check endpoint for monitoring.
-    Returns 200 if database is accessible.
+    Returns 200 if database is accessible. Same as /api/health/ready.
+    """
+    return _readiness_response()
+
+
+@api_view(["GET", "HEAD"])
+def health_live(request):
+    """
+    Liveness probe: the process is up and serving requests.
+    Never touches the database.
+    """
+    return JsonResponse({"status": "alive"})
+
+
+@api_view(["GET", "HEAD"])
+def health_ready(request):
+    """
+    Readiness probe: the database answers SELECT 1 within
+    HEALTH_READY_TIMEOUT_MS. Returns 503 otherwise.
+    """
+    return _readiness_response()
+
+
+@api_view(["GET"])
+def health_stats(request):
+    """
+    Table row counts, cached for HEALTH_STATS_CACHE_SECONDS.
+    On PostgreSQL these are planner estimates ("estimated": true).
+    "coalescing" holds this process's get_alerts single-flight counters.
     """
     try:
-        # Check database connection
-        connection.ensure_connection()
-
-        # Simple query to verify DB works
-        employee_count = Employee.objects.count()
-        alert_count = Alert.objects.count()
-
-        return JsonResponse(
-            {
-                "status": "healthy",
-                "database": "connected",
-                "employees": employee_count,
-                "alerts": alert_count,
-            }
-        )
+        return JsonResponse({**table_row_counts(), "coalescing": alert_requests.stats()})
+    except Exception as e:
+        logger.error(f"Stats failed: {str(e)}")
+        return JsonResponse({"status": "unhealthy", "error": str(e)}, status=503)
+
+
+def _readiness_response():
+    try:
+        ping_database(settings.HEALTH_READY_TIMEOUT_MS)
+        return JsonResponse({"status": "healthy", "database": "connected"})
     except Exception as e:
         logger.error(f"Health check failed: {str(e)}")
         return JsonResponse({"status": "unhealthy", "error": str(e)}, status=503)
 
 
+def _manager_error(manager_id, view_name):
+    """400/404 response when manager_id is missing or unknown, else None."""
+    # Validate manager_id (required)
+    if not manager_id:
+        logger.warning(f"{view_name} called without manager_id")
+        return Response(
+            {"detail": "manager_id is required"}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    # Check if manager exists
+    if not Employee.objects.filter(id=manager_id).exists():
+        logger.warning(f"Manager not found: {manager_id}")
+        return Response(
+            {"detail": "manager not found"}, status=status.HTTP_404_NOT_FOUND
+        )
+
+    return None
+
+
 @api_view(["GET"])
 def get_alerts(request):
     """
     GET /api/alerts
     Query params:
     - manager_id (required): Employee ID
-    - scope (optional, default: direct): 'direct' or 'subtree'
+    - scope (optional, default: direct): 'direct', 'subtree' or 'depth'
+    - max_depth (required for scope=depth): levels below the manager, 1 = direct
     - severity (optional): comma-separated list of 'low', 'medium', 'high'
     - status (optional, default: all): comma-separated list of 'open', 'dismissed'
+    - category (optional): comma-separated category names
     - q (optional): case-insensitive search on employee name
-    Returns: List of alerts sorted by created_at DESC, id ASC
+    - include_archived (optional, default: false): also return archived alerts
+    - created_after (optional): ISO-8601 datetime or date, inclusive
+    - created_before (optional): ISO-8601 datetime or date, exclusive
+    - fields (optional): comma-separated sparse fieldset, e.g. 'id,severity,status'
+    - shape (optional, default: nested): 'nested' or 'normalized'
+    - include_distance (optional, default: false): add each alert's
+      'distance', the employee's level below the manager
+    Returns: List of alerts sorted by created_at DESC, id ASC, or for
+             shape=normalized {"alerts": [... employee_id ...], "employees": {id: {id, name}}}
     """
-    # Validate manager_id (required)
     manager_id = request.GET.get("manager_id")
-    if not manager_id:
-        logger.warning("get_alerts called without manager_id")
+    error = _manager_error(manager_id, "get_alerts")
+    if error is not None:
+        return error
+
+    try:
+        filters = parse_alert_filters(request.GET)
+        options = parse_response_options(request.GET)
+    except InvalidFilter as e:
+        logger.warning(f"Invalid filter for get_alerts: {e}")
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    # Identical concurrent requests in this process share one computation
+    if settings.ALERTS_COALESCE:
+        key = (manager_id, pinned_to_primary(), _freeze(filters), _freeze(options))
+        data, shared = alert_requests.do(
+            key, lambda: _compute_alerts(manager_id, filters, options)
+        )
+    else:
+        data, shared = _compute_alerts(manager_id, filters, options), False
+
+    # Counted from the fetched rows, not with an extra COUNT query
+    results = len(data["alerts"]) if options["shape"] == "normalized" else len(data)
+    logger.info(
+        f"get_alerts: manager={manager_id}, scope={filters['scope']}, results={results}, "
+        f"shared={shared}"
+    )
+    return Response(data)
+
+
+def _compute_alerts(manager_id, filters, options):
+    """Serialized get_alerts payload for already-validated params."""
+    # One edge query and a level BFS, bounded by max_depth like the scope
+    distances = None
+    if options["include_distance"]:
+        distances = get_employee_distances(manager_id, filters["scope"], filters["max_depth"])
+
+    # In-memory columnar copy of the alerts table, when enabled
+    rows = columnar_alerts(manager_id, filters)
+    if rows is not None:
+        return serialize_alert_rows(rows, options["fields"], distances, options["shape"])
+
+    # Heaviest managers' open subtree alerts, precomputed by fan-out on write
+    inbox = inbox_alerts(manager_id, filters)
+    if inbox is not None:
+        sources = [inbox]
+    else:
+        # Employees in scope (excluding manager), resolved by the database as a
+        # subquery instead of a bound list of IDs
+        employees = scope_subquery(manager_id, filters["scope"], filters["max_depth"])
+
+        # Base query: alerts for employees in scope (plus the archive if asked)
+        sources = alert_querysets(employees, filters)
+
+    # Sort is handled by Alert.Meta.ordering: ['-created_at', 'id']
+    if options["shape"] == "normalized":
+        return serialize_alerts_normalized(sources, options["fields"], distances)
+
+    if options["fields"] is None or "employee" in options["fields"]:
+        sources = [qs.select_related("employee") for qs in sources]
+    return AlertSerializer(
+        merge_alert_streams(*sources),
+        many=True,
+        fields=options["fields"],
+        context={"distances": distances},
+    ).data
+
+
+def _freeze(params):
+    """Hashable, order-insensitive form of parsed params for coalescing keys."""
+    return tuple(
+        sorted(
+            (name, tuple(sorted(value)) if isinstance(value, list) else value)
+            for name, value in params.items()
+        )
+    )
+
+
+@api_view(["GET"])
+def export_alerts(request):
+    """
+    GET /api/alerts/export
+    Query params: manager_id, scope, severity, status, category, q,
+    include_archived, created_after, created_before - same as GET /api/alerts
+    Returns: text/csv attachment streamed in created_at DESC, id ASC order
+    """
+    manager_id = request.GET.get("manager_id")
+    error = _manager_error(manager_id, "export_alerts")
+    if error is not None:
+        return error
+
+    try:
+        filters = parse_alert_filters(request.GET)
+    except InvalidFilter as e:
+        logger.warning(f"Invalid filter for export_alerts: {e}")
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    employees = scope_subquery(manager_id, filters["scope"], filters["max_depth"])
+    # The body streams after ReplicaPinningMiddleware has returned: route it
+    # now, while this request's pin still applies
+    using = router.db_for_read(Alert)
+    sources = [qs.using(using) for qs in alert_querysets(employees, filters)]
+    rows = iter_export_rows(sources, settings.ALERT_EXPORT_CHUNK_SIZE)
+
+    filename = re.sub(r"[^\w-]", "_", f"alerts-{manager_id}-{filters['scope']}")
+    response = StreamingHttpResponse(iter_csv(rows), content_type="text/csv")
+    response["Content-Disposition"] = f'attachment; filename="{filename}.csv"'
+
+    logger.info(f"export_alerts: manager={manager_id}, scope={filters['scope']}")
+    return response
+
+
+@api_view(["GET"])
+def get_alerts_batch(request):
+    """
+    GET /api/alerts/batch
+    Query params:
+    - manager_ids (required): comma-separated Employee IDs
+    - scope, severity, status, category, q, include_archived, created_after,
+      created_before: same as GET /api/alerts, shared by all managers
+    Returns: Object mapping each manager_id to its list of alerts,
+             each list sorted by created_at DESC, id ASC
+    """
+    manager_ids = list(
+        dict.fromkeys(
+            m.strip() for m in request.GET.get("manager_ids", "").split(",") if m.strip()
+        )
+    )
+    if not manager_ids:
+        logger.warning("get_alerts_batch called without manager_ids")
         return Response(
-            {"detail": "manager_id is required"}, status=status.HTTP_400_BAD_REQUEST
+            {"detail": "manager_ids is required"}, status=status.HTTP_400_BAD_REQUEST
         )
 
-    # Check if manager exists
-    if not Employee.objects.filter(id=manager_id).exists():
-        logger.warning(f"Manager not found: {manager_id}")
+    if len(manager_ids) > settings.ALERTS_BATCH_MAX_MANAGERS:
+        logger.warning(f"get_alerts_batch called with {len(manager_ids)} managers")
+        return Response(
+            {"detail": "too many manager_ids"}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    # Check all managers exist in one query
+    found = set(Employee.objects.filter(id__in=manager_ids).values_list("id", flat=True))
+    missing = [m for m in manager_ids if m not in found]
+    if missing:
+        logger.warning(f"Managers not found: {', '.join(missing)}")
         return Response(
             {"detail": "manager not found"}, status=status.HTTP_404_NOT_FOUND
         )
 
-    # Validate scope
-    scope = request.GET.get("scope", "direct")
-    if scope not in ["direct", "subtree"]:
-        logger.warning(f"Invalid scope: {scope}")
-        return Response({"detail": "invalid scope"}, status=status.HTTP_400_BAD_REQUEST)
-
-    # Validate severity
-    severity_param = request.GET.get("severity")
-    severity_filter = []
-    if severity_param:
-        severity_filter = [s.strip() for s in severity_param.split(",")]
-        valid_severities = {"low", "medium", "high"}
-        if not all(s in valid_severities for s in severity_filter):
-            logger.warning(f"Invalid severity: {severity_param}")
-            return Response(
-                {"detail": "invalid severity"}, status=status.HTTP_400_BAD_REQUEST
-            )
-
-    # Validate status
-    status_param = request.GET.get("status")
-    status_filter = []
-    if status_param:
-        status_filter = [s.strip() for s in status_param.split(",")]
-        valid_statuses = {"open", "dismissed"}
-        if not all(s in valid_statuses for s in status_filter):
-            logger.warning(f"Invalid status: {status_param}")
-            return Response(
-                {"detail": "invalid status"}, status=status.HTTP_400_BAD_REQUEST
-            )
-
-    # Get employee IDs in scope (excluding manager)
     try:
-        employee_ids = get_employee_subtree(manager_id, scope)
-    except Exception as e:
-        logger.error(f"Error in get_employee_subtree: {str(e)}")
-        raise
+        filters = parse_alert_filters(request.GET)
+    except InvalidFilter as e:
+        logger.warning(f"Invalid filter for get_alerts_batch: {e}")
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-    # Base query: alerts for employees in scope
-    alerts = Alert.objects.filter(employee_id__in=employee_ids)
+    # Resolve all subtrees together, sharing overlapping branches
+    subtrees = get_employee_subtrees(manager_ids, filters["scope"], filters["max_depth"])
 
-    # Apply severity filter
-    if severity_filter:
-        alerts = alerts.filter(severity__in=severity_filter)
+    # Which requested managers each employee's alerts belong to
+    owners = {}
+    for manager_id, employee_ids in subtrees.items():
+        for employee_id in employee_ids:
+            owners.setdefault(employee_id, []).append(manager_id)
 
-    # Apply status filter (default: all)
-    if status_filter:
-        alerts = alerts.filter(status__in=status_filter)
+    # One query for the union of all scopes (plus the archive if asked). The
+    # subquery can include a requested manager that sits on a reporting cycle;
+    # such alerts have no owner and are dropped below.
+    sources = [
+        qs.select_related("employee")
+        for qs in alert_querysets(
+            reports_subquery(manager_ids, filters["scope"], filters["max_depth"]), filters
+        )
+    ]
 
-    # Apply employee name search
-    q = request.GET.get("q")
-    if q:
-        alerts = alerts.filter(employee__name__icontains=q)
+    # Serialize each alert once, then fan out; query order is kept per group
+    results = {manager_id: [] for manager_id in manager_ids}
+    for alert in AlertSerializer(merge_alert_streams(*sources), many=True).data:
+        for manager_id in owners.get(alert["employee"]["id"], ()):
+            results[manager_id].append(alert)
 
     logger.info(
-        f"get_alerts: manager={manager_id}, scope={scope}, results={alerts.count()}"
+        f"get_alerts_batch: managers={len(manager_ids)}, scope={filters['scope']}, "
+        f"employees={len(owners)}, results={sum(map(len, results.values()))}"
     )
 
-    # Sort is handled by Alert.Meta.ordering: ['-created_at', 'id']
-    # Serialize and return
-    serializer = AlertSerializer(alerts, many=True)
-    return Response(serializer.data)
+    return Response(results)
+
+
+@api_view(["GET"])
+def get_employee_tree(request, employee_id):
+    """
+    GET /api/employees/{employee_id}/tree
+    Query params:
+    - depth (optional, default: EMPLOYEE_TREE_DEFAULT_DEPTH): levels of
+      reports to include, 1 to EMPLOYEE_TREE_MAX_DEPTH
+    Returns: Nested org {id, name, open_alerts, reports, has_more, children};
+             expand a node with has_more by requesting its own tree
+    """
+    try:
+        depth = parse_depth(
+            request.GET.get("depth"),
+            "depth",
+            default=settings.EMPLOYEE_TREE_DEFAULT_DEPTH,
+            maximum=settings.EMPLOYEE_TREE_MAX_DEPTH,
+        )
+    except InvalidFilter as e:
+        logger.warning(f"Invalid filter for get_employee_tree: {e}")
+        return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    tree = build_org_tree(employee_id, depth)
+    if tree is None:
+        logger.warning(f"Employee not found: {employee_id}")
+        return Response({"detail": "employee not found"}, status=status.HTTP_404_NOT_FOUND)
+
+    logger.info(f"get_employee_tree: employee={employee_id}, depth={depth}")
+    return Response(tree)
+
+
+@api_view(["POST"])
+def ingest_alerts_view(request):
+    """
+    POST /api/alerts/ingest
+    Body: NDJSON, one alert object per line (id, employee_id, severity,
+    category, created_at, optional status). Read as a stream and upserted
+    by id in batches of ALERT_INGEST_BATCH_SIZE, one transaction per batch.
+    Returns: Accepted/rejected totals, per-batch counts and line errors
+    """
+    stream = request.stream
+    if stream is None:
+        return Response({"detail": "request body is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+    summary = ingest_alerts(
+        iter_lines(stream, settings.ALERT_INGEST_MAX_LINE_BYTES),
+        batch_size=settings.ALERT_INGEST_BATCH_SIZE,
+        max_errors=settings.ALERT_INGEST_MAX_ERRORS,
+        max_batches=settings.ALERT_INGEST_MAX_BATCHES,
+    )
+    if summary["accepted"]:
+        alert_requests.clear()
+
+    logger.info(
+        f"ingest_alerts: batches={summary['batch_count']}, "
+        f"accepted={summary['accepted']}, rejected={summary['rejected']}"
+    )
+
+    return Response(summary, status=status.HTTP_200_OK)
 
 
 @api_view(["POST"])
@@ -139,12 +390,18 @@ def dismiss_alert(request, alert_id):
     try:
         alert = Alert.objects.get(id=alert_id)
     except Alert.DoesNotExist:
+        # Archived alerts are already dismissed: return them unchanged
+        archived = ArchivedAlert.objects.filter(id=alert_id).first()
+        if archived is not None:
+            return Response(AlertSerializer(archived).data, status=status.HTTP_200_OK)
+
         logger.warning(f"Alert not found: {alert_id}")
         return Response({"detail": "alert not found"}, status=status.HTTP_404_NOT_FOUND)
 
     # Set status to dismissed (idempotent)
     alert.status = "dismissed"
     alert.save()
+    alert_requests.clear()
 
     logger.info(f"Alert dismissed: {alert_id}")
 
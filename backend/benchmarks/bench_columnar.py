@@ -0,0 +1,92 @@
+"""GET /api/alerts latency: ORM path vs the columnar in-memory copy.
+
+Both paths return the same JSON. Selective queries (one severity, a short
+time window) are where masks over the columns pay off; queries returning
+most of the table are bound by serialization either way.
+
+    python -m benchmarks.bench_columnar [--alerts 200000]
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.common import (
+    best_of,
+    build_org,
+    create_test_database,
+    print_table,
+    setup_django,
+)
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.test import Client  # noqa: E402
+from alerts.columnar import alert_columns  # noqa: E402
+from alerts.models import Alert  # noqa: E402
+
+EMPLOYEES = 2000
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+QUERIES = [
+    ("M1 subtree", {"manager_id": "M1", "scope": "subtree"}),
+    ("M0 subtree, high+open", {"manager_id": "M0", "scope": "subtree",
+                               "severity": "high", "status": "open"}),
+    ("M0 subtree, last 2 days", {"manager_id": "M0", "scope": "subtree",
+                                 "created_after": (NOW - timedelta(days=2)).isoformat()}),
+    ("M12 direct", {"manager_id": "M12"}),
+]
+
+
+def create_alerts(count: int):
+    Alert.objects.bulk_create(
+        (
+            Alert(
+                id=f"C{n}",
+                employee_id=f"M{1 + n % (EMPLOYEES - 1)}",
+                severity=("low", "medium", "high")[n % 3],
+                category=("retention", "engagement", "workload")[n % 3],
+                created_at=NOW - timedelta(minutes=n),
+                status="dismissed" if n % 4 == 0 else "open",
+            )
+            for n in range(count)
+        ),
+        batch_size=5000,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--alerts", type=int, default=200000)
+    args = parser.parse_args()
+
+    create_test_database()
+    build_org(EMPLOYEES)
+    create_alerts(args.alerts)
+    client = Client()
+
+    settings.ALERTS_COLUMNAR = True
+    start = time.perf_counter()
+    alert_columns.load()
+    print(f"columnar load: {(time.perf_counter() - start) * 1000:.0f} ms for {args.alerts:,} alerts\n")
+
+    rows = []
+    for label, params in QUERIES:
+        timings = {}
+        for enabled in (False, True):
+            settings.ALERTS_COLUMNAR = enabled
+            timings[enabled] = best_of(lambda: client.get("/api/alerts", params), repeat=3)
+        results = len(client.get("/api/alerts", params).json())
+        rows.append([
+            label,
+            results,
+            f"{timings[False] * 1000:.1f}",
+            f"{timings[True] * 1000:.1f}",
+            f"{timings[False] / timings[True]:.1f}x",
+        ])
+
+    print_table(["query", "results", "orm ms", "columnar ms", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()
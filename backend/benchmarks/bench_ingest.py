@@ -0,0 +1,74 @@
+"""POST /api/alerts/ingest throughput by batch size.
+
+Each run streams the same NDJSON body twice: the first pass inserts every
+row, the second upserts them all over existing ids.
+
+    python -m benchmarks.bench_ingest [--rows 50000] [--batch-sizes 100,1000,5000]
+"""
+import argparse
+import json
+import time
+
+from benchmarks.common import build_org, create_test_database, print_table, setup_django
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.test import Client  # noqa: E402
+from alerts.models import Alert  # noqa: E402
+
+EMPLOYEES = 1000
+
+
+def ndjson_body(rows: int) -> bytes:
+    return "".join(
+        json.dumps(
+            {
+                "id": f"I{n}",
+                "employee_id": f"M{1 + n % (EMPLOYEES - 1)}",
+                "severity": ("low", "medium", "high")[n % 3],
+                "category": "workload",
+                "created_at": f"2025-10-{1 + n % 28:02d}T09:00:00Z",
+            }
+        )
+        + "\n"
+        for n in range(rows)
+    ).encode()
+
+
+def timed_post(client, body) -> float:
+    start = time.perf_counter()
+    response = client.generic(
+        "POST", "/api/alerts/ingest", body, content_type="application/x-ndjson"
+    )
+    elapsed = time.perf_counter() - start
+    assert response.json()["rejected"] == 0, response.json()["errors"]
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--batch-sizes", default="100,1000,5000")
+    args = parser.parse_args()
+
+    create_test_database()
+    build_org(EMPLOYEES)
+    client = Client()
+    body = ndjson_body(args.rows)
+
+    rows = []
+    for batch_size in (int(b) for b in args.batch_sizes.split(",")):
+        settings.ALERT_INGEST_BATCH_SIZE = batch_size
+        Alert.objects.all().delete()
+        insert = timed_post(client, body)
+        upsert = timed_post(client, body)
+        rows.append(
+            [batch_size, f"{args.rows / insert:,.0f}", f"{args.rows / upsert:,.0f}"]
+        )
+
+    print_table(["batch size", "insert rows/s", "upsert rows/s"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Encode time and bytes on the wire for large alert lists.
+
+Compares DRF's stock JSONRenderer with FastJSONRenderer, then the size and
+cost of gzip/brotli at the levels configured in RESPONSE_COMPRESSION.
+
+    python -m benchmarks.bench_render [--sizes 1000,10000,100000]
+"""
+import argparse
+import zlib
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.common import best_of, print_table, setup_django
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from alerts import renderers  # noqa: E402
+from alerts.renderers import FastJSONRenderer  # noqa: E402
+from alerts.middleware import brotli  # noqa: E402
+
+SEVERITIES = ["low", "medium", "high"]
+CATEGORIES = ["retention", "engagement", "workload"]
+
+
+def make_alerts(n: int):
+    """Alert dicts shaped like AlertSerializer output."""
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": f"A{i}",
+            "employee": {"id": f"E{i % 5000}", "name": f"Employee Number {i % 5000}"},
+            "severity": SEVERITIES[i % 3],
+            "category": CATEGORIES[i % 3],
+            "created_at": (start + timedelta(minutes=i)).isoformat().replace("+00:00", "Z"),
+            "status": "open" if i % 4 else "dismissed",
+        }
+        for i in range(n)
+    ]
+
+
+def gzip_compress(body: bytes, level: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000")
+    args = parser.parse_args()
+
+    config = settings.RESPONSE_COMPRESSION
+    print(f"orjson: {'yes' if renderers.orjson else 'no (stdlib fallback)'}")
+    print(f"brotli: {'yes' if brotli else 'no'}")
+    print()
+
+    rows = []
+    for n in (int(s) for s in args.sizes.split(",")):
+        data = make_alerts(n)
+        body = JSONRenderer().render(data)
+        stock = best_of(lambda: JSONRenderer().render(data))
+        fast = best_of(lambda: FastJSONRenderer().render(data))
+
+        level = config["GZIP_LEVEL"]
+        gz_time = best_of(lambda: gzip_compress(body, level), repeat=3)
+        gz_size = len(gzip_compress(body, level))
+        row = [
+            n,
+            f"{stock * 1000:.1f}",
+            f"{fast * 1000:.1f}",
+            f"{stock / fast:.1f}x",
+            f"{len(body) / 1024:.0f}",
+            f"{gz_size / 1024:.0f} ({gz_time * 1000:.1f}ms)",
+        ]
+        if brotli:
+            quality = config["BROTLI_QUALITY"]
+            br_time = best_of(lambda: brotli.compress(body, quality=quality), repeat=3)
+            br_size = len(brotli.compress(body, quality=quality))
+            row.append(f"{br_size / 1024:.0f} ({br_time * 1000:.1f}ms)")
+        rows.append(row)
+
+    headers = ["alerts", "stock ms", "fast ms", "speedup", "raw KiB",
+               f"gzip-{config['GZIP_LEVEL']} KiB"]
+    if brotli:
+        headers.append(f"br-{config['BROTLI_QUALITY']} KiB")
+    print_table(headers, rows)
+
+
+if __name__ == "__main__":
+    main()
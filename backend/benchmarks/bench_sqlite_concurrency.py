@@ -0,0 +1,138 @@
+"""Read/write throughput of the SQLite profiles under concurrent workers.
+
+Spawns reader processes looping on GET /api/alerts and writer processes
+looping on POST /api/alerts/<id>/dismiss against a fresh database file,
+once per SQLITE_PROFILE, and reports requests/second plus how many
+requests failed with "database is locked".
+
+    python -m benchmarks.bench_sqlite_concurrency [--readers 6 --writers 2 --seconds 5]
+"""
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+
+from benchmarks.common import print_table, setup_django
+
+EMPLOYEES = 500
+ALERTS = 20_000
+
+
+def _setup(profile: str, path: str):
+    os.environ["SQLITE_PROFILE"] = profile
+    os.environ["SQLITE_PATH"] = path
+    os.environ.pop("DATABASE_URL", None)
+    setup_django()
+
+    import logging
+
+    logging.getLogger("alerts").setLevel(logging.WARNING)
+    logging.getLogger("django").setLevel(logging.ERROR)
+
+
+def prepare(profile: str, path: str):
+    _setup(profile, path)
+
+    from datetime import datetime, timedelta, timezone
+    from django.core.management import call_command
+    from alerts.models import Alert
+    from benchmarks.common import build_org
+
+    call_command("migrate", verbosity=0)
+    build_org(EMPLOYEES)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    Alert.objects.bulk_create(
+        [
+            Alert(
+                id=f"B{i}",
+                employee_id=f"M{1 + i % (EMPLOYEES - 1)}",
+                severity=("low", "medium", "high")[i % 3],
+                category="workload",
+                created_at=start + timedelta(minutes=i),
+                status="open",
+            )
+            for i in range(ALERTS)
+        ],
+        batch_size=2000,
+    )
+
+
+def worker(profile: str, path: str, role: str, seed: int, seconds: float, results):
+    _setup(profile, path)
+
+    import random
+    from django.db import OperationalError
+    from django.test import Client
+
+    client = Client(SERVER_NAME="localhost")
+    rng = random.Random(seed)
+    ok = locked = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            if role == "reader":
+                manager = f"M{rng.randrange(5, 50)}"
+                response = client.get(
+                    "/api/alerts", {"manager_id": manager, "scope": "subtree"}
+                )
+            else:
+                response = client.post(f"/api/alerts/B{rng.randrange(ALERTS)}/dismiss")
+            ok += response.status_code == 200
+        except OperationalError as e:
+            if "locked" not in str(e):
+                raise
+            locked += 1
+    results.put((role, ok, locked))
+
+
+def run(profile: str, readers: int, writers: int, seconds: float):
+    ctx = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.sqlite3")
+        prep = ctx.Process(target=prepare, args=(profile, path))
+        prep.start()
+        prep.join()
+
+        results = ctx.Queue()
+        procs = [
+            ctx.Process(target=worker, args=(profile, path, role, i, seconds, results))
+            for i, role in enumerate(["reader"] * readers + ["writer"] * writers)
+        ]
+        for p in procs:
+            p.start()
+        totals = {"reader": [0, 0], "writer": [0, 0]}
+        for _ in procs:
+            role, ok, locked = results.get()
+            totals[role][0] += ok
+            totals[role][1] += locked
+        for p in procs:
+            p.join()
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--readers", type=int, default=6)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    rows = []
+    for profile in ["default", "concurrent"]:
+        totals = run(profile, args.readers, args.writers, args.seconds)
+        rows.append(
+            [
+                profile,
+                f"{totals['reader'][0] / args.seconds:.0f}",
+                f"{totals['writer'][0] / args.seconds:.0f}",
+                totals["reader"][1] + totals["writer"][1],
+            ]
+        )
+
+    print(f"{args.readers} readers, {args.writers} writers, {args.seconds:.0f}s each")
+    print_table(["profile", "reads/s", "writes/s", "locked errors"], rows)
+
+
+if __name__ == "__main__":
+    main()
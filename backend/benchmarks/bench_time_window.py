@@ -0,0 +1,77 @@
+"""GET /api/alerts latency for a 7-day window as alert history grows.
+
+Without a time bound every request resolves and serializes the manager's
+full history; with created_after the (employee, -created_at) index keeps
+the work proportional to the window.
+
+    python -m benchmarks.bench_time_window [--history-days 30,365,1825]
+"""
+import argparse
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.common import (
+    best_of,
+    build_org,
+    create_test_database,
+    print_table,
+    setup_django,
+)
+
+setup_django()
+
+from django.test import Client  # noqa: E402
+from alerts.models import Alert  # noqa: E402
+
+EMPLOYEES = 200
+ALERTS_PER_DAY = 100
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def extend_history(start_day: int, end_day: int):
+    """Add ALERTS_PER_DAY alerts for each day in [start_day, end_day) before NOW."""
+    alerts = []
+    for day in range(start_day, end_day):
+        for n in range(ALERTS_PER_DAY):
+            alerts.append(
+                Alert(
+                    id=f"H{day}-{n}",
+                    employee_id=f"M{1 + (day * ALERTS_PER_DAY + n) % (EMPLOYEES - 1)}",
+                    severity=("low", "medium", "high")[n % 3],
+                    category="workload",
+                    created_at=NOW - timedelta(days=day, minutes=n),
+                    status="open",
+                )
+            )
+    Alert.objects.bulk_create(alerts, batch_size=2000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--history-days", default="30,365,1825")
+    args = parser.parse_args()
+
+    create_test_database()
+    build_org(EMPLOYEES)
+    client = Client()
+
+    week_ago = (NOW - timedelta(days=7)).isoformat()
+    rows = []
+    loaded = 0
+    for days in sorted(int(d) for d in args.history_days.split(",")):
+        extend_history(loaded, days)
+        loaded = days
+
+        params = {"manager_id": "M0", "scope": "subtree"}
+        full = best_of(lambda: client.get("/api/alerts", params), repeat=3)
+        window = best_of(
+            lambda: client.get("/api/alerts", {**params, "created_after": week_ago})
+        )
+        rows.append(
+            [days, Alert.objects.count(), f"{full * 1000:.1f}", f"{window * 1000:.1f}"]
+        )
+
+    print_table(["history days", "alerts", "full history ms", "last 7 days ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Shared helpers for the scripts in this directory.
+
+Run a benchmark from the backend directory, e.g.:
+
+    python -m benchmarks.bench_render
+"""
+import os
+import time
+
+import django
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    django.setup()
+
+
+def create_test_database():
+    """Create a throwaway test database (in-memory for SQLite) and migrate it."""
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+
+def build_org(n_employees: int, fanout: int = 10):
+    """
+    Insert a balanced org of n_employees under "M0" (which is excluded from
+    its own scope), each reporting to employee (i - 1) // fanout.
+    """
+    from alerts.models import Employee
+
+    Employee.objects.bulk_create(
+        [Employee(id=f"M{i}", name=f"Employee {i}") for i in range(n_employees)],
+        batch_size=2000,
+    )
+    Employee.objects.bulk_update(
+        [
+            Employee(id=f"M{i}", reports_to_id=f"M{(i - 1) // fanout}")
+            for i in range(1, n_employees)
+        ],
+        ["reports_to"],
+        batch_size=2000,
+    )
+
+
+def best_of(fn, repeat: int = 5) -> float:
+    """Fastest wall time of fn() in seconds over repeat runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def print_table(headers, rows):
+    widths = [
+        max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)
+    ]
+    print("  ".join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    print("  ".join("-" * w for w in widths))
+    for row in rows:
+        print("  ".join(str(c).ljust(w) for c, w in zip(row, widths)))
@@ -5,3 +5,4 @@ pip install -r requirements.txt
 python manage.py collectstatic --no-input
 python manage.py migrate
 python manage.py load_seed_data
+python manage.py build_hierarchy_snapshot
@@ -1,6 +1,7 @@
 from pathlib import Path
 import os
 import dj_database_url
+from corsheaders.defaults import default_headers
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -25,6 +26,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "alerts.middleware.CompressionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -33,6 +35,8 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "alerts.middleware.ReplicaPinningMiddleware",
+    "alerts.middleware.ProfilingMiddleware",
 ]
 
 # CORS
@@ -40,13 +44,93 @@ cors_origins = os.environ.get(
     "CORS_ALLOWED_ORIGINS", "http://localhost:3000,http://localhost:5173"
 )
 CORS_ALLOWED_ORIGINS = [origin.strip() for origin in cors_origins.split(",")]
+# Cross-origin clients read the last-write stamp and echo it (see READ REPLICA)
+CORS_ALLOW_HEADERS = (*default_headers, "x-alerts-last-write")
+CORS_EXPOSE_HEADERS = ["X-Alerts-Last-Write"]
 
 REST_FRAMEWORK = {
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
+        "alerts.renderers.FastJSONRenderer",
     ],
 }
 
+# RESPONSE COMPRESSION
+# brotli is used when the package is installed and the client accepts it, else gzip
+RESPONSE_COMPRESSION = {
+    "MIN_SIZE": int(os.environ.get("COMPRESSION_MIN_SIZE", "1024")),
+    "GZIP_LEVEL": int(os.environ.get("COMPRESSION_GZIP_LEVEL", "6")),
+    "BROTLI_QUALITY": int(os.environ.get("COMPRESSION_BROTLI_QUALITY", "5")),
+}
+
+# ALERTS
+# Upper bound on manager_ids accepted by GET /api/alerts/batch
+ALERTS_BATCH_MAX_MANAGERS = int(os.environ.get("ALERTS_BATCH_MAX_MANAGERS", "100"))
+
+# Identical concurrent GET /api/alerts requests in one process share a single
+# computation; a fresh window > 0 also reuses a finished result that long
+ALERTS_COALESCE = os.environ.get("ALERTS_COALESCE", "True") == "True"
+ALERTS_COALESCE_FRESH_SECONDS = float(os.environ.get("ALERTS_COALESCE_FRESH_SECONDS", "0"))
+# Longest a request waits on an identical one before computing its own result
+ALERTS_COALESCE_WAIT_SECONDS = float(os.environ.get("ALERTS_COALESCE_WAIT_SECONDS", "10"))
+
+# Answer GET /api/alerts from an in-process NumPy copy of the alerts table
+# (needs numpy). Alert writes bump a shared counter; a process whose copy
+# is behind it reloads before answering
+ALERTS_COLUMNAR = os.environ.get("ALERTS_COLUMNAR", "False") == "True"
+
+# Managers with at least this many employees below them get a materialized
+# inbox of open subtree alerts (`manage.py rebuild_manager_inboxes`); 0 = off
+MANAGER_INBOX_MIN_SUBTREE = int(os.environ.get("MANAGER_INBOX_MIN_SUBTREE", "0"))
+
+# Background tasks (`manage.py run_worker`): with BACKGROUND_TASKS on,
+# Employee changes queue a snapshot and inbox rebuild, deduplicated and
+# delayed so a burst of edits runs them once
+BACKGROUND_TASKS = os.environ.get("BACKGROUND_TASKS", "False") == "True"
+TASK_HIERARCHY_DELAY_SECONDS = float(os.environ.get("TASK_HIERARCHY_DELAY_SECONDS", "5"))
+TASK_WORKER_THREADS = int(os.environ.get("TASK_WORKER_THREADS", "2"))
+TASK_POLL_SECONDS = float(os.environ.get("TASK_POLL_SECONDS", "1"))
+# Attempts per task; a failed attempt is retried after BACKOFF * 2^(attempt - 1)
+TASK_MAX_ATTEMPTS = int(os.environ.get("TASK_MAX_ATTEMPTS", "3"))
+TASK_RETRY_BACKOFF_SECONDS = float(os.environ.get("TASK_RETRY_BACKOFF_SECONDS", "30"))
+# Workers refresh their running tasks' heartbeat_at every HEARTBEAT seconds
+# and requeue tasks whose heartbeat is older than STALE (lost with a worker)
+TASK_HEARTBEAT_SECONDS = float(os.environ.get("TASK_HEARTBEAT_SECONDS", "15"))
+TASK_STALE_SECONDS = float(os.environ.get("TASK_STALE_SECONDS", "120"))
+
+# GET /api/employees/<id>/tree: default and largest accepted depth
+EMPLOYEE_TREE_DEFAULT_DEPTH = int(os.environ.get("EMPLOYEE_TREE_DEFAULT_DEPTH", "2"))
+EMPLOYEE_TREE_MAX_DEPTH = int(os.environ.get("EMPLOYEE_TREE_MAX_DEPTH", "5"))
+
+# Admin changelists and row-count stats: longest exact COUNT(*) on PostgreSQL
+# before falling back (to counting through the requested page, or to the
+# statistics collector's estimate for a never-analyzed table)
+ADMIN_COUNT_TIMEOUT_MS = int(os.environ.get("ADMIN_COUNT_TIMEOUT_MS", "200"))
+
+# Health probes: /api/health/ready query timeout, /api/health/stats cache TTL
+HEALTH_READY_TIMEOUT_MS = int(os.environ.get("HEALTH_READY_TIMEOUT_MS", "1000"))
+HEALTH_STATS_CACHE_SECONDS = int(os.environ.get("HEALTH_STATS_CACHE_SECONDS", "60"))
+
+# Binary reporting-graph snapshot written by `manage.py build_hierarchy_snapshot`
+# (see build.sh) and memory-mapped by every worker; empty disables it
+HIERARCHY_SNAPSHOT_PATH = os.environ.get(
+    "HIERARCHY_SNAPSHOT_PATH", str(BASE_DIR / "hierarchy.snap")
+)
+
+# Defaults for `manage.py archive_alerts`
+ALERT_ARCHIVE_MIN_AGE_DAYS = int(os.environ.get("ALERT_ARCHIVE_MIN_AGE_DAYS", "90"))
+ALERT_ARCHIVE_BATCH_SIZE = int(os.environ.get("ALERT_ARCHIVE_BATCH_SIZE", "1000"))
+
+# POST /api/alerts/ingest: rows per upsert transaction, longest accepted
+# NDJSON line, and how many per-line errors and per-batch entries the
+# response lists
+ALERT_INGEST_BATCH_SIZE = int(os.environ.get("ALERT_INGEST_BATCH_SIZE", "1000"))
+ALERT_INGEST_MAX_LINE_BYTES = int(os.environ.get("ALERT_INGEST_MAX_LINE_BYTES", "4096"))
+ALERT_INGEST_MAX_ERRORS = int(os.environ.get("ALERT_INGEST_MAX_ERRORS", "100"))
+ALERT_INGEST_MAX_BATCHES = int(os.environ.get("ALERT_INGEST_MAX_BATCHES", "100"))
+
+# Rows fetched per cursor round trip by the CSV export (endpoint and command)
+ALERT_EXPORT_CHUNK_SIZE = int(os.environ.get("ALERT_EXPORT_CHUNK_SIZE", "2000"))
+
 ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
@@ -79,10 +163,61 @@ else:
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
-            "NAME": BASE_DIR / "db.sqlite3",
+            "NAME": os.environ.get("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
         }
     }
 
+    # SQLITE_PROFILE=concurrent (default) tunes SQLite for several gunicorn
+    # workers: WAL lets readers run alongside the single writer, busy_timeout
+    # makes writers queue instead of failing with "database is locked", and
+    # BEGIN IMMEDIATE takes the write lock up front so two transactions never
+    # deadlock upgrading read locks. SQLITE_PROFILE=default is plain SQLite.
+    SQLITE_PROFILE = os.environ.get("SQLITE_PROFILE", "concurrent")
+    SQLITE_CONCURRENT_PRAGMAS = [
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA busy_timeout=5000",
+        "PRAGMA cache_size=-20000",
+        "PRAGMA mmap_size=134217728",
+        "PRAGMA temp_store=MEMORY",
+    ]
+    if SQLITE_PROFILE == "concurrent":
+        DATABASES["default"].update(
+            {
+                "CONN_MAX_AGE": 600,
+                "CONN_HEALTH_CHECKS": True,
+                "OPTIONS": {
+                    "timeout": 5,
+                    "transaction_mode": "IMMEDIATE",
+                    "init_command": ";".join(SQLITE_CONCURRENT_PRAGMAS),
+                },
+            }
+        )
+
+# READ REPLICA
+# DATABASE_REPLICA_URL (or SQLITE_REPLICA_PATH, e.g. a copied snapshot of the
+# SQLite file) adds a "replica" alias: alerts.routers.ReadReplicaRouter sends
+# reads there and writes to "default". After a write, that client's reads
+# stay on the primary for REPLICA_STICKY_SECONDS: the write response carries
+# its time in a cookie and the X-Alerts-Last-Write header, which the client
+# sends back (no shared state between workers needed).
+if os.environ.get("DATABASE_REPLICA_URL"):
+    DATABASES["replica"] = dj_database_url.config(
+        env="DATABASE_REPLICA_URL",
+        conn_max_age=600,
+        conn_health_checks=True,
+    )
+elif os.environ.get("SQLITE_REPLICA_PATH") and not os.environ.get("DATABASE_URL"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": os.environ["SQLITE_REPLICA_PATH"],
+    }
+if "replica" in DATABASES:
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+
+DATABASE_ROUTERS = ["alerts.routers.ReadReplicaRouter"]
+REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", "5"))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -111,9 +246,22 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 LOGS_DIR = BASE_DIR / "logs"
 LOGS_DIR.mkdir(exist_ok=True)
 
+# Request threads only enqueue log records; a background QueueListener
+# thread writes them to the handlers below (see alerts.log_handlers)
+LOGGING_QUEUE = os.environ.get("LOGGING_QUEUE", "True") == "True"
+LOGGING_QUEUE_LOGGERS = ["django", "django.request", "alerts"]
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
+    "filters": {
+        # Fraction of alerts INFO records kept; warnings and errors are never sampled
+        "sample_alerts_info": {
+            "()": "alerts.log_handlers.SamplingFilter",
+            "rate": float(os.environ.get("ALERTS_LOG_SAMPLE_RATE", "1.0")),
+            "max_level": "INFO",
+        },
+    },
     "formatters": {
         "verbose": {
             "format": "{levelname} {asctime} {module} {process:d} {thread:d} {message}",
@@ -160,6 +308,7 @@ LOGGING = {
         },
         "alerts": {
             "handlers": ["console", "file", "error_file"],
+            "filters": ["sample_alerts_info"],
             "level": "INFO",
             "propagate": False,
         },
@@ -170,4 +319,15 @@ LOGGING = {
     },
 }
 
+# PROFILING
+# Off: ProfilingMiddleware removes itself at startup. On: profile a
+# PROFILING_VIEWS request when a staff user sends "X-Profile: 1", or at
+# random with PROFILING_SAMPLE_RATE. Dumps rotate at PROFILING_MAX_BYTES.
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "False") == "True"
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_HEADER = "HTTP_X_PROFILE"
+PROFILING_VIEWS = ["get_alerts", "dismiss_alert"]
+PROFILING_DIR = LOGS_DIR / "profiles"
+PROFILING_MAX_BYTES = int(os.environ.get("PROFILING_MAX_BYTES", str(50 * 1024 * 1024)))
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
@@ -2,7 +2,12 @@ import type { Alert, Filters, ApiError } from '../types';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://127.0.0.1:8000/api';
 
+// Time of our last write, echoed so reads right after it skip a lagging replica
+const LAST_WRITE_HEADER = 'X-Alerts-Last-Write';
+
 export class ApiClient {
+  private static lastWrite: string | null = null;
+
   private static buildQueryParams(filters: Filters): string {
     const params = new URLSearchParams();
     
@@ -26,7 +31,11 @@ export class ApiClient {
 
   static async getAlerts(filters: Filters): Promise<Alert[]> {
     const queryString = this.buildQueryParams(filters);
-    const response = await fetch(`${API_BASE_URL}/alerts?${queryString}`);
+    const headers: Record<string, string> = {};
+    if (this.lastWrite) {
+      headers[LAST_WRITE_HEADER] = this.lastWrite;
+    }
+    const response = await fetch(`${API_BASE_URL}/alerts?${queryString}`, { headers });
     
     if (!response.ok) {
       const error: ApiError = await response.json();
@@ -46,6 +55,7 @@ export class ApiClient {
       throw new Error(error.detail);
     }
     
+    this.lastWrite = response.headers?.get(LAST_WRITE_HEADER) ?? this.lastWrite;
     return response.json();
   }
 }
\ No newline at end of file